@@ -0,0 +1,6 @@
+"""
+Micro-benchmarks for hot pure-Python code paths.
+
+Benchmarks are plain scripts run from the repository root, e.g.:
+    python -m benchmarks.bench_itscope_availability
+"""
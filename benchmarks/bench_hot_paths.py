@@ -0,0 +1,265 @@
+"""
+Micro-benchmark suite for per-row hot paths.
+
+Times the pure-Python code that runs for every spreadsheet row on
+realistic generated inputs:
+- Price text standardization and parsing
+- ITScope supplier filtering (_get_suppliers) and availability getters
+- ITScope date formatting (_format_date)
+- SKU variant token comparison (shares_sku_token)
+- repeatCell request builders of utils/formatters.py
+
+Before timing, the price parsers are checked against known results
+(EXPECTED_PRICES), so a faster but wrong parser fails the run as well.
+
+Results (nanoseconds per call, fastest of several repeats) can be saved to
+a JSON file and compared against a saved baseline; cases that got slower
+than the threshold allows are reported and make the script exit with
+status 1, so per-row CPU regressions are caught before a release.
+
+Usage:
+    python -m benchmarks.bench_hot_paths --save benchmarks/baseline.json
+    python -m benchmarks.bench_hot_paths --baseline benchmarks/baseline.json
+"""
+
+import sys
+import json
+import random
+import timeit
+import argparse
+import platform
+from utils import (
+    standardize_price_format,
+    parse_price,
+    price_column_format_requests,
+    availability_format_request,
+    itscope_availability_format_request
+)
+from scrapers.ITScope.getters import (
+    DEFAULT_DISTRIBUTORS,
+    get_availability_for_distributors,
+    get_availability_for_ingram,
+    get_availability_for_also,
+    get_availability_for_tdsynnex,
+    _format_date
+)
+from processors import shares_sku_token
+from .bench_itscope_availability import make_supplier_data
+
+# Price texts as scraped from the shops, including status strings
+PRICE_TEXTS = ["867,22€", "€ 1.039,00", "1039.00 EUR", "€\xa01.234,56", "ab € 99,90", "N/A", "No listings", "2.499,-"]
+
+# Known parse results (amount in euro, None for status strings) of price texts
+EXPECTED_PRICES = {
+    "867,22€": "867.22",
+    "€ 1.039,00": "1039.00",
+    "1039.00 EUR": "1039.00",
+    "€\xa01.234,56": "1234.56",
+    "ab € 99,90": "99.90",
+    "N/A": None,
+    "No listings": None,
+    "2.499,-": "2499.00",
+    "1.039,-": "1039.00",
+    "ab € 1.299,-": "1299.00",
+    "1.039": "1039.00",
+    "1.039,–": "1039.00",
+    "12.5": "12.50",
+    "0.999": "1.00",
+    "0,99 €": "0.99",
+    "1,039": "1039.00",
+    "1,039,000": "1039000.00"
+}
+
+# Allowed slowdown against the baseline before a case counts as a regression
+DEFAULT_THRESHOLD = 0.25
+
+def make_itscope_response(supplier_names, other_suppliers=40, seed=42):
+    """
+    Generate an unfiltered ITScope product response.
+
+    Args:
+        supplier_names (iterable): Names of the distributors the bot keeps
+        other_suppliers (int): Number of additional suppliers that are filtered out
+        seed (int): Random seed for reproducible data
+
+    Returns:
+        dict: Response with one product and its supplier items
+    """
+    rng = random.Random(seed)
+    names = list(supplier_names) + [f"Supplier {i}" for i in range(other_suppliers)]
+    items = []
+    for name in names:
+        items.append({
+            "supplier": {"id": rng.randint(1000, 9999), "name": name, "country": "AT"},
+            "price": rng.uniform(10, 2000),
+            "supplierSku": f"SKU{rng.randint(10000, 99999)}",
+            "supplierStockInfo": [
+                {
+                    "stockStatus": rng.choice("1268"),
+                    "stockStatusText": f"{rng.randint(0, 500)} auf Lager",
+                    "stockAvailabilityDate": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00",
+                    "stock": rng.randint(0, 500),
+                    "lastUpdate": "2025-01-01T08:00:00"
+                }
+                for _ in range(2)
+            ]
+        })
+    rng.shuffle(items)
+    return {"product": [{"puid": 123456, "supplierItems": items}]}
+
+
+def make_skus(count=500, seed=42):
+    """Generate SKU pairs as consecutive spreadsheet rows contain them."""
+    rng = random.Random(seed)
+    bases = [f"MX{rng.randint(100, 999)}{rng.choice('ABCDEFGH')}" for _ in range(count // 4)]
+    skus = [f"{rng.choice(bases)}-{rng.choice(['DE', 'AT', 'CH', 'EDU'])}" for _ in range(count)]
+    return list(zip(skus, skus[1:]))
+
+
+def build_cases():
+    """
+    Build the benchmark cases.
+
+    Returns:
+        dict: Case name -> zero-argument callable processing one row's worth of input
+    """
+    supplier_data = make_supplier_data(DEFAULT_DISTRIBUTORS.values())
+    sku_pairs = make_skus()
+    availability_values = ["Ja", "Nein", "Vorbestellbar", "24/12/25"]
+    itscope_values = ["126 auf Lager", "24/12/25", "nicht verfügbar", "no data", "Invalid date: x"]
+    price_columns = ["G", "H", "I", "J", "K"]
+
+    cases = {
+        "standardize_price_format": lambda: [standardize_price_format(text) for text in PRICE_TEXTS],
+        "parse_price": lambda: [parse_price(text) for text in PRICE_TEXTS],
+        "itscope_getters": lambda: (get_availability_for_ingram(supplier_data),
+                                    get_availability_for_also(supplier_data),
+                                    get_availability_for_tdsynnex(supplier_data)),
+        "itscope_single_pass": lambda: get_availability_for_distributors(supplier_data),
+        "format_date": lambda: (_format_date("2025-03-14T00:00:00"), _format_date(""), _format_date("not a date")),
+        "shares_sku_token": lambda: [shares_sku_token(sku, other) for sku, other in sku_pairs],
+        "availability_requests": lambda: [availability_format_request(0, 5, value, 2) for value in availability_values],
+        "itscope_availability_requests": lambda: [itscope_availability_format_request(0, 5, value, 4) for value in itscope_values],
+        "price_column_requests": lambda: price_column_format_requests(0, price_columns)
+    }
+
+    try:
+        # The client needs the ITScope credentials module, skip the case without it
+        from scrapers.ITScope.client import ITscopeClient
+    except ImportError as e:
+        print(f"Skipping get_suppliers: {e}")
+    else:
+        client = ITscopeClient.__new__(ITscopeClient)
+        response = make_itscope_response(DEFAULT_DISTRIBUTORS.values())
+        cases["get_suppliers"] = lambda: client._get_suppliers(response)
+
+    return cases
+
+
+def check_prices():
+    """
+    Check parse_price() and standardize_price_format() against EXPECTED_PRICES.
+
+    Returns:
+        list[str]: Descriptions of wrong results, empty if all are correct
+    """
+    errors = []
+    for text, expected in EXPECTED_PRICES.items():
+        price = parse_price(text)
+        amount = str(price.amount) if price is not None else None
+        if amount != expected:
+            errors.append(f"parse_price({text!r}) = {amount}, expected {expected}")
+        if expected is not None and parse_price(standardize_price_format(text)) != price:
+            errors.append(f"standardize_price_format({text!r}) = {standardize_price_format(text)!r}")
+    return errors
+
+
+def run(cases, repeat=5, min_time=0.2):
+    """
+    Time every case.
+
+    Args:
+        cases (dict): Case name -> callable
+        repeat (int): Timed repeats per case, the fastest is reported
+        min_time (float): Minimum duration of one repeat in seconds
+
+    Returns:
+        dict: Case name -> nanoseconds per call
+    """
+    results = {}
+    for name, func in cases.items():
+        timer = timeit.Timer(func)
+        number, elapsed = timer.autorange()
+        number = max(number, int(number * min_time / elapsed)) if elapsed else number
+        best = min(timer.repeat(repeat=repeat, number=number))
+        results[name] = best / number * 1e9
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare results against a baseline.
+
+    Args:
+        results (dict): Case name -> nanoseconds per call of this run
+        baseline (dict): Case name -> nanoseconds per call of the baseline
+        threshold (float): Allowed relative slowdown, e.g. 0.25 for 25 %
+
+    Returns:
+        list[str]: Names of the cases slower than the threshold allows
+    """
+    regressions = []
+    for name, nanoseconds in results.items():
+        reference = baseline.get(name)
+        if reference and nanoseconds > reference * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-row hot paths and compare against a baseline.")
+    parser.add_argument("--save", metavar="FILE", help="store the results as JSON in this file")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against results stored with --save")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"allowed relative slowdown against the baseline (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--repeat", type=int, default=5, help="timed repeats per case (default: 5)")
+    parser.add_argument("cases", nargs="*", help="only run these cases")
+    args = parser.parse_args(argv)
+
+    # Wrong results are a regression no matter how fast they are computed
+    errors = check_prices()
+    if errors:
+        print("Wrong price parsing results:")
+        for error in errors:
+            print(f"  {error}")
+        sys.exit(1)
+
+    cases = build_cases()
+    if args.cases:
+        cases = {name: func for name, func in cases.items() if name in args.cases}
+
+    results = run(cases, repeat=args.repeat)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    for name, nanoseconds in results.items():
+        line = f"  {name:<32} {nanoseconds / 1000:10.2f} µs/call"
+        if name in baseline:
+            line += f"  ({(nanoseconds / baseline[name] - 1) * 100:+6.1f} % vs. baseline)"
+        print(line)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "results": results}, f, indent=2, sort_keys=True)
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"Regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
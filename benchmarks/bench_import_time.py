@@ -0,0 +1,72 @@
+"""
+Startup import-time benchmark.
+
+Measures how long importing each entry module takes in a fresh interpreter,
+and which heavy third-party libraries the import pulls in. Each target is
+imported several times in separate processes and the fastest run is
+reported, with the bare interpreter startup subtracted.
+
+Usage:
+    python -m benchmarks.bench_import_time
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+# Entry modules of full and partial runs
+TARGETS = ["main", "processors", "scrapers", "scrapers.ITScope.getters", "scrapers.ITScope.client", "google_sheets.client", "utils"]
+
+# Libraries that should only be imported by the subsystems using them
+HEAVY_MODULES = ["playwright", "bs4", "gspread", "google.oauth2", "requests"]
+
+_PROBE = """
+import sys, json, time
+start = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def measure_import(target, repeat=5):
+    """
+    Measure the import time of a module in fresh interpreters.
+    
+    Args:
+        target (str): Module to import
+        repeat (int): Number of separate processes, the fastest is reported
+        
+    Returns:
+        dict: {"seconds": fastest import time, "heavy": heavy libraries loaded}
+              or {"error": message} if the import failed
+    """
+    best = None
+    for _ in range(repeat):
+        ret = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(target=target, heavy=HEAVY_MODULES)],
+            cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        if ret.returncode != 0:
+            return {"error": ret.stderr.strip().splitlines()[-1] if ret.stderr else "import failed"}
+
+        result = json.loads(ret.stdout.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def main():
+    for target in TARGETS:
+        result = measure_import(target)
+        if "error" in result:
+            print(f"{target:28s} error: {result['error']}")
+        else:
+            heavy = ", ".join(result["heavy"]) or "-"
+            print(f"{target:28s} {result['seconds'] * 1000:8.1f} ms   heavy: {heavy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Micro-benchmark for the ITScope availability parsers.
+
+Compares the per-distributor getters (one scan of the supplier list per
+distributor) with the table-driven single-pass parser on generated
+supplier data, for the three default distributors and for a larger
+distributor table.
+
+Usage:
+    python -m benchmarks.bench_itscope_availability
+"""
+
+import random
+import timeit
+from scrapers.ITScope.getters import (
+    DEFAULT_DISTRIBUTORS,
+    get_availability_for_distributors,
+    get_availability_for_ingram,
+    get_availability_for_also,
+    get_availability_for_tdsynnex
+)
+
+def make_supplier_data(supplier_names, items_per_supplier=2, seed=42):
+    """
+    Generate filtered ITScope supplier data as returned by ITscopeClient.
+    
+    Args:
+        supplier_names (iterable): Supplier names to include
+        items_per_supplier (int): Supplier items generated per supplier
+        seed (int): Random seed for reproducible data
+        
+    Returns:
+        list: Supplier items with cached and real-time supplierStockInfo
+    """
+    rng = random.Random(seed)
+    data = []
+    for name in supplier_names:
+        for _ in range(items_per_supplier):
+            data.append({
+                "supplier_id": rng.randint(1000, 9999),
+                "supplier_name": name,
+                "supplierStockInfo": [
+                    {
+                        "stockStatus": rng.choice("1268"),
+                        "stockStatusText": f"{rng.randint(0, 500)} auf Lager",
+                        "stockAvailabilityDate": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00"
+                    }
+                    for _ in range(2)
+                ]
+            })
+    rng.shuffle(data)
+    return data
+
+
+def main(number=20000):
+    data = make_supplier_data(DEFAULT_DISTRIBUTORS.values())
+
+    legacy = timeit.timeit(
+        lambda: (get_availability_for_ingram(data), get_availability_for_also(data), get_availability_for_tdsynnex(data)),
+        number=number
+    )
+    single_pass = timeit.timeit(lambda: get_availability_for_distributors(data), number=number)
+
+    print(f"3 distributors, {len(data)} supplier items, {number} runs")
+    print(f"  per-distributor getters: {legacy / number * 1e6:8.2f} µs/row")
+    print(f"  single-pass parser:      {single_pass / number * 1e6:8.2f} µs/row")
+
+    # A larger table shows how the single pass scales with more distributors
+    distributors = dict(DEFAULT_DISTRIBUTORS, **{f"DIST{i}": f"Distributor {i}" for i in range(9)})
+    data = make_supplier_data(distributors.values())
+    single_pass = timeit.timeit(lambda: get_availability_for_distributors(data, distributors), number=number)
+
+    print(f"{len(distributors)} distributors, {len(data)} supplier items, {number} runs")
+    print(f"  single-pass parser:      {single_pass / number * 1e6:8.2f} µs/row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Parser benchmark on a recorded snapshot archive.
+
+Runs the HTML and JSON parsers of the scrapers over every snapshot of an
+archive recorded with --record, without a browser or network access:
+- Geizhals product pages: parse_offer_list + summarize_offers
+- Campuspoint listing pages: parse_listing_page
+- ITScope responses: supplier filtering of ITscopeClient
+
+Prints the time per snapshot for each parser. With --output the parsed
+results are written as JSON, so two versions of a parser can be compared
+on the same frozen corpus by diffing their outputs.
+
+Usage:
+    python -m benchmarks.bench_replay_parsers run.zip
+    python -m benchmarks.bench_replay_parsers run.zip --output before.json
+"""
+
+import io
+import json
+import time
+import argparse
+from urllib.parse import urlsplit
+from utils import SnapshotArchive
+from scrapers.geizhals import parse_offer_list, summarize_offers
+from scrapers.campuspoint import parse_listing_page
+
+def _parse_geizhals(html, url):
+    offers = parse_offer_list(html)
+    return summarize_offers(offers) if offers else "No listings"
+
+
+def _parse_campuspoint(html, url):
+    found, next_url = parse_listing_page(html, url)
+    return {"found": found, "next": next_url}
+
+
+# HTML parsers by host, product pages of other shops are only inspected in the browser
+HTML_PARSERS = {
+    "geizhals.at": _parse_geizhals,
+    "campuspoint.de": _parse_campuspoint
+}
+
+
+def _host(url):
+    host = urlsplit(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def run(archive, repeat=3):
+    """
+    Time every parser over the matching snapshots of an archive.
+
+    Args:
+        archive (SnapshotArchive): Archive opened in replay mode
+        repeat (int): Timed passes over the corpus, the fastest one is reported
+
+    Returns:
+        tuple: (timings dict of parser name to (snapshots, best seconds), parsed results by URL)
+    """
+    jobs = {}
+    for name, url in archive.entries("html"):
+        parser = HTML_PARSERS.get(_host(url))
+        if parser is not None:
+            jobs.setdefault(parser.__name__.lstrip("_"), []).append((parser, archive.read(name).decode("utf-8"), url))
+
+    json_entries = [(archive.read(name), url) for name, url in archive.entries("json")]
+    if json_entries:
+        # Imported only when needed, the client requires the ITScope credentials module
+        from scrapers.ITScope import ITscopeClient
+        client = ITscopeClient()
+        jobs["parse_itscope"] = [(lambda data, url: client._parse_response(io.BytesIO(data)), data, url)
+                                 for data, url in json_entries]
+
+    timings = {}
+    results = {}
+    for job_name, snapshots in jobs.items():
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for parser, data, url in snapshots:
+                try:
+                    results[url] = parser(data, url)
+                except Exception as e:
+                    results[url] = f"{type(e).__name__}: {e}"
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[job_name] = (len(snapshots), best)
+
+    return timings, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scraper parsers on a recorded snapshot archive.")
+    parser.add_argument("archive", help="zip archive recorded with --record")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes over the corpus (default: 3)")
+    parser.add_argument("--output", help="write the parsed results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    archive = SnapshotArchive(args.archive, "replay")
+    try:
+        timings, results = run(archive, args.repeat)
+    finally:
+        archive.close()
+
+    for job_name, (count, seconds) in sorted(timings.items()):
+        per_snapshot = seconds / count * 1e3 if count else 0.0
+        print(f"  {job_name:<20} {count:6d} snapshots  {per_snapshot:8.2f} ms/snapshot")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1, sort_keys=True, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,23 +2,51 @@
 Google Sheets integration modules.
 
 This package provides integration with Google Sheets API for:
-- Authentication and worksheet setup
+- Authentication and worksheet setup, for one or several target worksheets
 - Data reading and writing operations
 - SKU list management and processing
+- Paged streaming of large worksheets as compact row records
+- Quota-aware scheduling, retrying and batching of API requests
+- Background writing of updates off the asyncio event loop
+- Conditional format rules for the availability columns (one-time setup)
 
 The module handles Google Sheets authentication using service account
 credentials and provides utilities for reading product data and 
 updating price information in the spreadsheet.
 """
 
-from .client import setup_google_worksheet
-from .data_manager import get_data, get_sku_list
+from utils.lazy import lazy_exports
+
+# gspread and google-auth are only imported when the spreadsheet is used
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "setup_google_worksheet": ".client",
+    "setup_google_worksheets": ".client",
+    "get_data": ".data_manager",
+    "get_sku_list": ".data_manager",
+    "iter_rows": ".data_manager",
+    "SheetRow": ".data_manager",
+    "SheetsScheduler": ".scheduler",
+    "get_sheets_scheduler": ".scheduler",
+    "SheetWriter": ".writer",
+    "install_availability_formatting": ".conditional_formats"
+})
 
 __all__ = [
     # Google Sheets client setup
     "setup_google_worksheet",    # Sets up authenticated Google Sheets worksheet connection
+    "setup_google_worksheets",   # Sets up all target worksheets of a run with one client
     
     # Data management operations
     "get_data",                  # Retrieves all data from the worksheet as dictionary
-    "get_sku_list"              # Extracts SKU list from worksheet for processing
+    "get_sku_list",             # Extracts SKU list from worksheet for processing
+    "iter_rows",                # Streams the worksheet page by page as compact rows
+    "SheetRow",                 # Slotted row record with the columns the pipeline reads
+
+    # Request scheduling
+    "SheetsScheduler",          # Quota pacing, 429 retries and merged batch writes
+    "get_sheets_scheduler",     # Returns the scheduler shared by all Sheets calls of the run
+    "SheetWriter",              # Background thread sending queued updates off the event loop
+
+    # One-time sheet setup
+    "install_availability_formatting"  # Installs conditional format rules on availability columns
 ]
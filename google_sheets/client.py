@@ -4,14 +4,24 @@ Google Sheets client integration module for authentication and worksheet setup.
 Handles Google Sheets API authentication using service account credentials
 and provides worksheet connection functionality for the price bot application.
 Manages OAuth2 scopes and credential authorization for spreadsheet access.
+
+A run can update several worksheets (GOOGLE_SHEETS_TARGETS), which share one
+authorized client; every spreadsheet is opened only once.
 """
 
 import gspread
 from google.oauth2.service_account import Credentials
 from utils.colors import Colors
 from utils.timing import get_timestamp
+from utils.settings import get_setting
 from config import GOOGLE_SHEETS_CONFIG
 
+# Required Google API scopes for spreadsheet and drive access
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",  # Read/write spreadsheet data
+    "https://www.googleapis.com/auth/drive"          # Access drive files
+]
+
 def setup_google_worksheet():
     """
     Set up authenticated Google Sheets worksheet connection.
@@ -31,23 +41,61 @@ def setup_google_worksheet():
         data = worksheet.get_all_records()
     """
 
-    # Define required Google API scopes for spreadsheet and drive access
-    SCOPES = [
-        "https://www.googleapis.com/auth/spreadsheets",  # Read/write spreadsheet data
-        "https://www.googleapis.com/auth/drive"          # Access drive files
-    ]
-
-    # Load service account credentials from JSON file
-    credentials = Credentials.from_service_account_file(
-        filename=GOOGLE_SHEETS_CONFIG["credentials_file"],
-        scopes=SCOPES
-    )
-
     # Authorize client and open target spreadsheet and worksheet
-    client = gspread.authorize(credentials)
+    client = _authorize()
     spreadsheet = client.open(GOOGLE_SHEETS_CONFIG["spreadsheet_name"])
     worksheet = spreadsheet.worksheet(GOOGLE_SHEETS_CONFIG["worksheet_name"])
 
     print(f"[{get_timestamp()}] {Colors.YELLOW}Worksheet set up: {worksheet}{Colors.END}")
 
     return worksheet
+
+
+def setup_google_worksheets(targets=None):
+    """
+    Set up authenticated connections to all target worksheets of a run.
+
+    Targets are read from the GOOGLE_SHEETS_TARGETS setting, a list of
+    {"spreadsheet_name": ..., "worksheet_name": ...} entries. Without it the
+    single worksheet of GOOGLE_SHEETS_CONFIG is the only target. All targets
+    use the credentials of GOOGLE_SHEETS_CONFIG and the column layout of
+    COLUMN_MAP.
+
+    Args:
+        targets (list, optional): Target entries, defaults to GOOGLE_SHEETS_TARGETS
+
+    Returns:
+        list[gspread.Worksheet]: Worksheets in target order, duplicates removed
+
+    Raises:
+        Exception: If authentication fails or a worksheet cannot be accessed
+
+    Usage:
+        for worksheet in setup_google_worksheets():
+            rows = iter_rows(worksheet)
+    """
+    targets = targets or get_setting("GOOGLE_SHEETS_TARGETS") or [GOOGLE_SHEETS_CONFIG]
+
+    client = _authorize()
+    spreadsheets = {}
+    worksheets = {}
+    for target in targets:
+        name, title = target["spreadsheet_name"], target["worksheet_name"]
+        if name not in spreadsheets:
+            spreadsheets[name] = client.open(name)
+        if (name, title) not in worksheets:
+            worksheets[(name, title)] = spreadsheets[name].worksheet(title)
+
+    for worksheet in worksheets.values():
+        print(f"[{get_timestamp()}] {Colors.YELLOW}Worksheet set up: {worksheet}{Colors.END}")
+
+    return list(worksheets.values())
+
+
+def _authorize():
+    # Load service account credentials from JSON file and authorize a client
+    credentials = Credentials.from_service_account_file(
+        filename=GOOGLE_SHEETS_CONFIG["credentials_file"],
+        scopes=SCOPES
+    )
+    return gspread.authorize(credentials)
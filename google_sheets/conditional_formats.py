@@ -0,0 +1,189 @@
+"""
+Sheet-level conditional formatting of the availability columns.
+
+The availability colors are static rules, so instead of computing a color
+in Python and sending a repeatCell request for every cell of every row, the
+rules are installed once as conditional format rules on whole columns and
+Google Sheets colors the cells itself:
+- edustore availability: "Ja" green, "Vorbestellbar" light green,
+  "Nein" light red, anything else light yellow
+- ITScope availability: "auf Lager" green, a DD/MM/YY date light green,
+  "nicht verfügbar" or "no data" light red, anything else light yellow
+
+Installing is idempotent: rules previously installed on the same columns
+(same range, condition and color as a generated rule) are replaced, all
+other conditional format rules of the sheet, including rules users added
+to the managed columns, are kept.
+
+Usage:
+    python main.py --setup-formatting
+"""
+
+from utils import Colors, get_timestamp
+from utils.formatters import GREEN, LIGHT_GREEN, LIGHT_RED, LIGHT_YELLOW
+from .scheduler import get_sheets_scheduler
+
+def availability_rules(sheet_id, column_index):
+    """
+    Build the conditional format rules of an edustore availability column.
+
+    Args:
+        sheet_id (int): Worksheet ID
+        column_index (int): 0-based column index
+
+    Returns:
+        list[dict]: Rules in evaluation order (the first matching rule wins)
+    """
+    column = column_range(sheet_id, column_index)
+    return [
+        _rule(column, "TEXT_EQ", GREEN, "Ja"),
+        _rule(column, "TEXT_EQ", LIGHT_GREEN, "Vorbestellbar"),
+        _rule(column, "TEXT_EQ", LIGHT_RED, "Nein"),
+        _rule(column, "NOT_BLANK", LIGHT_YELLOW)
+    ]
+
+
+def itscope_availability_rules(sheet_id, column_index):
+    """
+    Build the conditional format rules of an ITScope distributor column.
+
+    Args:
+        sheet_id (int): Worksheet ID
+        column_index (int): 0-based column index
+
+    Returns:
+        list[dict]: Rules in evaluation order (the first matching rule wins)
+    """
+    column = column_range(sheet_id, column_index)
+
+    # Relative reference to the first data cell, evaluated for every cell of the range
+    first_cell = f"{_column_letter(column_index)}2"
+
+    return [
+        _rule(column, "TEXT_CONTAINS", GREEN, "auf Lager"),
+        _rule(column, "CUSTOM_FORMULA", LIGHT_GREEN, f'=REGEXMATCH(TO_TEXT({first_cell}), "^\\d{{2}}/\\d{{2}}/\\d{{2}}")'),
+        _rule(column, "TEXT_EQ", LIGHT_RED, "nicht verfügbar"),
+        _rule(column, "TEXT_EQ", LIGHT_RED, "no data"),
+        _rule(column, "NOT_BLANK", LIGHT_YELLOW)
+    ]
+
+
+def column_range(sheet_id, column_index):
+    """Grid range of a whole column below the header row."""
+    return {
+        "sheetId": sheet_id,
+        "startRowIndex": 1,  # Skip header row
+        "startColumnIndex": column_index,
+        "endColumnIndex": column_index + 1
+    }
+
+
+def install_availability_formatting(worksheet, availability_columns=(), itscope_columns=()):
+    """
+    Install (or replace) the availability conditional format rules of a worksheet.
+
+    Rules already installed on the given columns are deleted and added
+    again in the current form, so running the setup repeatedly leaves the
+    sheet in the same state. Other rules on the columns are left alone.
+    The columns are also centered once, which conditional formatting
+    cannot do.
+
+    Args:
+        worksheet (gspread.Worksheet): Worksheet to format
+        availability_columns (iterable): 0-based indexes of edustore availability columns
+        itscope_columns (iterable): 0-based indexes of ITScope distributor columns
+
+    Returns:
+        int: Number of rules installed
+
+    Usage:
+        install_availability_formatting(worksheet, [2], [3, 4, 5])
+    """
+    scheduler = get_sheets_scheduler()
+    spreadsheet = worksheet.spreadsheet
+
+    rules = []
+    for column_index in availability_columns:
+        rules.extend(availability_rules(worksheet.id, column_index))
+    for column_index in itscope_columns:
+        rules.extend(itscope_availability_rules(worksheet.id, column_index))
+
+    managed_columns = list(availability_columns) + list(itscope_columns)
+    managed_ranges = [column_range(worksheet.id, column_index) for column_index in managed_columns]
+
+    # Rules an earlier install may have left on a managed column, including the other column kind's rules
+    installed = {_rule_signature(rule)
+                 for column_index in managed_columns
+                 for rule in availability_rules(worksheet.id, column_index) + itscope_availability_rules(worksheet.id, column_index)}
+
+    metadata = scheduler.call("read", spreadsheet.fetch_sheet_metadata,
+                              {"fields": "sheets(properties(sheetId),conditionalFormats(ranges,booleanRule))"})
+    existing = []
+    for sheet in metadata.get("sheets", []):
+        if sheet["properties"]["sheetId"] == worksheet.id:
+            existing = sheet.get("conditionalFormats", [])
+
+    stale = [index for index, rule in enumerate(existing) if _rule_signature(rule) in installed]
+
+    # Delete from the back so the remaining indexes stay valid, then add in evaluation order
+    requests = [{"deleteConditionalFormatRule": {"sheetId": worksheet.id, "index": index}}
+                for index in reversed(stale)]
+    requests.extend({"addConditionalFormatRule": {"rule": rule, "index": index}}
+                    for index, rule in enumerate(rules))
+    requests.extend({
+        "repeatCell": {
+            "range": column,
+            "cell": {"userEnteredFormat": {"horizontalAlignment": "CENTER"}},
+            "fields": "userEnteredFormat.horizontalAlignment"
+        }
+    } for column in managed_ranges)
+
+    if requests:
+        scheduler.call("write", spreadsheet.batch_update, {"requests": requests})
+
+    print(f"[{get_timestamp()}] {Colors.GREEN}Installed {len(rules)} availability formatting rules ({len(stale)} replaced){Colors.END}")
+
+    return len(rules)
+
+
+def _rule(column, condition_type, background_color, value=None):
+    condition = {"type": condition_type}
+    if value is not None:
+        condition["values"] = [{"userEnteredValue": value}]
+
+    return {
+        "ranges": [column],
+        "booleanRule": {
+            "condition": condition,
+            "format": {"backgroundColor": background_color}
+        }
+    }
+
+
+def _rule_signature(rule):
+    # Range, condition and color of a single-range boolean rule, None for any other rule.
+    # The API omits zero indexes, unset bounds and zero color components and returns colors
+    # as single-precision floats, so compare with defaults and rounded
+    ranges = rule.get("ranges", [])
+    boolean_rule = rule.get("booleanRule")
+    if len(ranges) != 1 or boolean_rule is None:
+        return None
+
+    bounds = tuple(ranges[0].get(field, 0) for field in ("sheetId", "startRowIndex", "endRowIndex", "startColumnIndex", "endColumnIndex"))
+    condition = boolean_rule.get("condition", {})
+    values = tuple(value.get("userEnteredValue") for value in condition.get("values", []))
+    rule_format = boolean_rule.get("format", {})
+    if set(rule_format) - {"backgroundColor", "backgroundColorStyle"}:
+        return None
+    color = rule_format.get("backgroundColor", {})
+    return bounds, condition.get("type"), values, tuple(round(color.get(channel, 0), 3) for channel in ("red", "green", "blue"))
+
+
+def _column_letter(column_index):
+    # 0-based column index -> column letter, e.g. 0 -> "A", 26 -> "AA"
+    letters = ""
+    column_index += 1
+    while column_index:
+        column_index, remainder = divmod(column_index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
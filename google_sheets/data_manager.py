@@ -4,9 +4,17 @@ Google Sheets data management utilities for reading and processing spreadsheet d
 Provides functions for extracting structured data from Google Sheets including
 row-by-row data conversion and SKU lookup table generation for efficient
 data processing and updates.
+
+Large catalogs are streamed with iter_rows(), which reads the sheet in
+fixed-size pages and keeps only the columns the pipeline needs in compact
+SheetRow records.
 """
 
 import gspread
+from gspread.utils import rowcol_to_a1
+from utils.settings import get_setting
+from utils.timing import LAST_UPDATED_KEY
+from .scheduler import get_sheets_scheduler
 
 def get_data(worksheet: gspread.Worksheet) -> dict:
     """
@@ -64,3 +72,117 @@ def get_sku_list(worksheet: gspread.Worksheet) -> dict:
     }
 
     return sku_to_index
+
+
+# Sheet headers read by the pipeline and the SheetRow slots they are stored in
+ROW_FIELDS = {
+    "SKU": "sku",
+    "Geizhals link": "geizhals_link",
+    "Campuspoint link": "campuspoint_link",
+    "edustore link": "edustore_link",
+    LAST_UPDATED_KEY: "last_updated"  # Optional, used by --max-age
+}
+
+class SheetRow:
+    """
+    Compact spreadsheet row holding only the columns the pipeline reads.
+
+    Supports the dictionary access of rows returned by get_data()
+    (row["SKU"], row.get("edustore link")), so it can be passed to the
+    processors unchanged.
+
+    Attributes:
+        row_number (int): Spreadsheet row number (1-based, first data row is 2)
+        sku (str): Product SKU
+        geizhals_link (str): Geizhals product URL
+        campuspoint_link (str): Campuspoint product URL
+        edustore_link (str): edustore product URL
+        last_updated (str): Time of the row's last refresh, empty if unknown
+    """
+    __slots__ = ("row_number",) + tuple(ROW_FIELDS.values())
+
+    def __init__(self, row_number, sku="", geizhals_link="", campuspoint_link="", edustore_link="", last_updated=""):
+        self.row_number = row_number
+        self.sku = sku
+        self.geizhals_link = geizhals_link
+        self.campuspoint_link = campuspoint_link
+        self.edustore_link = edustore_link
+        self.last_updated = last_updated
+
+    def __getitem__(self, header):
+        try:
+            return getattr(self, ROW_FIELDS[header])
+        except KeyError:
+            raise KeyError(header) from None
+
+    def get(self, header, default=None):
+        """Return the value of a header column, or default for unknown headers."""
+        field = ROW_FIELDS.get(header)
+        return getattr(self, field) if field else default
+
+    def __repr__(self):
+        return f"SheetRow({self.row_number}, {self.sku!r})"
+
+
+def iter_rows(worksheet: gspread.Worksheet, page_size=None, first_row=2):
+    """
+    Stream the worksheet as SheetRow records, reading it in fixed-size pages.
+
+    Only the columns in ROW_FIELDS are requested, one range per column and
+    page in a single batch_get call paced by the Sheets scheduler. Rows are
+    yielded as soon as their page has arrived, so processing starts before
+    the whole sheet is loaded and memory use does not grow with the number
+    of rows. Reading stops at the first completely empty page or the end of
+    the sheet.
+
+    Args:
+        worksheet (gspread.Worksheet): Authenticated Google Sheets worksheet
+        page_size (int, optional): Rows per page, defaults to the SHEET_PAGE_SIZE setting (500)
+        first_row (int): First spreadsheet row to read (default: 2, the first data row)
+
+    Yields:
+        SheetRow: Data rows in spreadsheet order
+
+    Raises:
+        KeyError: If the header row has no SKU column
+
+    Usage:
+        for row in iter_rows(worksheet):
+            print(row.row_number, row["SKU"])
+    """
+    page_size = page_size or get_setting("SHEET_PAGE_SIZE", 500)
+    scheduler = get_sheets_scheduler()
+
+    # Column letters of the projected headers, missing optional columns stay empty
+    headers = scheduler.call("read", worksheet.row_values, 1)
+    if "SKU" not in headers:
+        raise KeyError("SKU")
+    columns = {
+        field: rowcol_to_a1(1, headers.index(header) + 1).rstrip("1")
+        for header, field in ROW_FIELDS.items() if header in headers
+    }
+
+    start = max(first_row, 2)
+    while start <= worksheet.row_count:
+        end = min(start + page_size - 1, worksheet.row_count)
+        ranges = [f"{letter}{start}:{letter}{end}" for letter in columns.values()]
+        page = dict(zip(columns, scheduler.call("read", worksheet.batch_get, ranges)))
+
+        # Trailing empty cells are omitted by the API, so columns can differ in length
+        length = max((len(values) for values in page.values()), default=0)
+        if length == 0:
+            return
+
+        for offset in range(length):
+            yield SheetRow(start + offset, **{
+                field: _cell(values, offset) for field, values in page.items()
+            })
+
+        start = end + 1
+
+
+def _cell(values, offset):
+    # Value of a single-column range at the given row offset, "" for omitted cells
+    if offset < len(values) and values[offset]:
+        return values[offset][0]
+    return ""
@@ -0,0 +1,325 @@
+"""
+Quota-aware request scheduler for the Google Sheets API.
+
+Google Sheets limits read and write requests per minute and answers with
+HTTP 429 once a budget is used up. The scheduler keeps every API call of a
+run inside these budgets instead of letting rows fail:
+- Token buckets pace read and write requests to the configured quotas
+- Calls failing with 429 or a transient server error are retried with
+  exponential backoff, honoring Retry-After
+- Cell updates and formatting requests are queued and merged while the
+  write budget is exhausted, then sent as one batch per worksheet
+- Batches rejected for good (a 4xx other than 429, e.g. a bad range) are
+  dropped and logged, so they do not block the writes queued after them
+
+Quotas are read from the SHEETS_READ_QUOTA and SHEETS_WRITE_QUOTA settings
+(requests per minute, default 60 each, the per-user Sheets API limit).
+"""
+
+import time
+import json
+import random
+import threading
+import requests
+from gspread.exceptions import APIError
+from utils import Colors, get_timestamp, get_setting, span, SPAN_KIND_CLIENT
+
+# HTTP status codes worth retrying: quota exhausted and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    Token bucket allowing a number of requests per minute.
+
+    Starts full, so a run can use its whole budget at once and is paced to
+    the refill rate afterwards.
+
+    Attributes:
+        capacity (float): Maximum number of tokens (requests per minute)
+        rate (float): Tokens added per second
+    """
+
+    def __init__(self, per_minute):
+        """Create a full bucket for per_minute requests per minute."""
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self, tokens=1):
+        """Return True if tokens could be taken right now without waiting."""
+        with self._lock:
+            self._refill()
+            return self._tokens >= tokens
+
+    def acquire(self, tokens=1):
+        """
+        Take tokens, sleeping until enough have been refilled.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def drain(self):
+        """Empty the bucket, e.g. after the server reported an exhausted quota."""
+        with self._lock:
+            self._tokens = 0.0
+            self._updated = time.monotonic()
+
+
+class SheetsScheduler:
+    """
+    Paces, retries and batches Google Sheets API calls of a run.
+
+    Attributes:
+        max_retries (int): Retries of a call failing with a retryable status
+        max_pending (int): Queued updates that force a flush even without free budget
+    """
+
+    def __init__(self, read_quota=None, write_quota=None, max_retries=None, max_pending=200):
+        """Create a scheduler, quotas default to the SHEETS_*_QUOTA settings."""
+        self._buckets = {
+            "read": TokenBucket(read_quota or get_setting("SHEETS_READ_QUOTA", 60)),
+            "write": TokenBucket(write_quota or get_setting("SHEETS_WRITE_QUOTA", 60))
+        }
+        self.max_retries = max_retries if max_retries is not None else get_setting("SHEETS_MAX_RETRIES", 6)
+        self.max_pending = max_pending
+
+        # Pending cell values per worksheet: (spreadsheet id, worksheet id) -> (worksheet, {range: values})
+        self._values = {}
+        # Pending formatting requests per spreadsheet: spreadsheet id -> (spreadsheet, {request key: request})
+        self._requests = {}
+        # Keys of queued updates whose cell values have not been written yet, per worksheet
+        self._keys = {}
+        # Keys of updates dropped because the API rejected their batch
+        self._dropped = []
+        self._lock = threading.RLock()
+
+    def call(self, kind, func, *args, **kwargs):
+        """
+        Run a gspread call within the read or write budget, retrying on 429.
+
+        Args:
+            kind (str): "read" or "write"
+            func (callable): gspread method to call
+            *args, **kwargs: Arguments of the call
+
+        Returns:
+            The result of the call
+
+        Raises:
+            gspread.exceptions.APIError: If the call still fails after max_retries retries
+
+        Usage:
+            values = scheduler.call("read", worksheet.batch_get, ranges)
+        """
+        bucket = self._buckets[kind]
+        with span(f"sheets.{kind}", SPAN_KIND_CLIENT, function=getattr(func, "__name__", str(func))) as current:
+            waited = 0.0
+            for attempt in range(self.max_retries + 1):
+                waited += bucket.acquire()
+                current.set(attempts=attempt + 1, quota_wait=round(waited, 3))
+                try:
+                    return func(*args, **kwargs)
+                except (APIError, requests.ConnectionError, requests.Timeout) as e:
+                    status = _status_code(e)
+                    current.set(status=status)
+                    if attempt == self.max_retries or (isinstance(e, APIError) and status not in RETRY_STATUS_CODES):
+                        raise
+
+                    if status == 429:
+                        # The server-side budget is gone, stop spending local tokens as well
+                        bucket.drain()
+
+                    delay = _retry_after(e) or min(64.0, 2 ** attempt) + random.uniform(0, 1)
+                    print(f"[{get_timestamp()}]     {Colors.YELLOW}Sheets {kind} request failed ({status or type(e).__name__}), retrying in {delay:.1f}s{Colors.END}")
+                    time.sleep(delay)
+
+    def submit(self, worksheet, values=(), format_requests=(), key=None, flush=True):
+        """
+        Queue cell updates and formatting requests, writing them when budget allows.
+
+        Updates of the same range replace queued ones, so only the latest
+        value of a cell is sent. Queued updates are written immediately if
+        the write budget has room for them (or the queue is full), and are
+        otherwise merged with later submissions.
+
+        Args:
+            worksheet (gspread.Worksheet): Worksheet the values belong to
+            values (list): Value updates as {"range": "D5", "values": [[...]]}
+            format_requests (list): batchUpdate requests, e.g. repeatCell formatting
+            key (str, optional): Identifier reported once the values are written
+            flush (bool): Write queued updates now if the budget allows (default: True)
+
+        Returns:
+            list: Keys of all updates written by this call
+
+        Usage:
+            for sku in scheduler.submit(worksheet, batch_data, format_requests, key=sku):
+                checkpoint.mark_written(sku)
+        """
+        with self._lock:
+            # Worksheet IDs are only unique within their spreadsheet (the first tab is 0 everywhere)
+            sheet_key = (worksheet.spreadsheet.id, worksheet.id)
+            if values:
+                _, ranges = self._values.setdefault(sheet_key, (worksheet, {}))
+                for update in values:
+                    ranges[update["range"]] = update["values"]
+            if format_requests:
+                spreadsheet = worksheet.spreadsheet
+                _, queued = self._requests.setdefault(spreadsheet.id, (spreadsheet, {}))
+                for request in format_requests:
+                    queued[_request_key(request)] = request
+            if key is not None:
+                self._keys.setdefault(sheet_key, []).append(key)
+
+            if not flush:
+                return []
+            return self.flush(wait=self.pending >= self.max_pending)
+
+    @property
+    def pending(self):
+        """Number of queued cell ranges and formatting requests."""
+        with self._lock:
+            return (sum(len(ranges) for _, ranges in self._values.values())
+                    + sum(len(queued) for _, queued in self._requests.values()))
+
+    def flush(self, wait=True):
+        """
+        Write queued updates, one batch per worksheet and spreadsheet.
+
+        Args:
+            wait (bool): Wait for write budget (True), or only write what the
+                budget allows right now and keep the rest queued (False)
+
+        Batches failing with a retryable error stay queued and end the
+        flush; batches the API rejected for good are dropped, as sending
+        them again cannot succeed, and their keys reported by take_dropped().
+
+        Returns:
+            list: Keys of the updates whose values were written
+
+        Usage:
+            for sku in scheduler.flush():
+                checkpoint.mark_written(sku)
+        """
+        written = []
+        with self._lock:
+            for sheet_key, (worksheet, ranges) in list(self._values.items()):
+                if not wait and not self._buckets["write"].available():
+                    return written
+
+                data = [{"range": cell_range, "values": cell_values} for cell_range, cell_values in ranges.items()]
+                try:
+                    keys = self._keys.get(sheet_key, [])
+                    with span("sheets.values", worksheet=worksheet.title, cells=len(data), rows=len(keys), skus=",".join(map(str, keys[:50]))):
+                        self.call("write", worksheet.batch_update, data, value_input_option='RAW')
+                except Exception as e:
+                    if not _is_rejected(e):
+                        print(f"[{get_timestamp()}]     {Colors.RED}Error writing {len(data)} queued cells, keeping them queued: {e}{Colors.END}")
+                        return written
+                    print(f"[{get_timestamp()}]     {Colors.RED}Dropping {len(data)} queued cells of {worksheet.title} rejected by the API "
+                          f"({', '.join(map(str, keys)) or 'no keys'}): {e}{Colors.END}")
+                    del self._values[sheet_key]
+                    self._dropped.extend(self._keys.pop(sheet_key, []))
+                    continue
+
+                del self._values[sheet_key]
+                written.extend(self._keys.pop(sheet_key, []))
+
+            # Rows without values (e.g. filtered sources) are complete as well
+            for sheet_key in list(self._keys):
+                if sheet_key not in self._values:
+                    written.extend(self._keys.pop(sheet_key))
+
+            for spreadsheet_id, (spreadsheet, queued) in list(self._requests.items()):
+                if not wait and not self._buckets["write"].available():
+                    return written
+
+                try:
+                    with span("sheets.requests", requests=len(queued)):
+                        self.call("write", spreadsheet.batch_update, {"requests": list(queued.values())})
+                except Exception as e:
+                    if not _is_rejected(e):
+                        print(f"[{get_timestamp()}]     {Colors.RED}Error sending {len(queued)} queued formatting requests, keeping them queued: {e}{Colors.END}")
+                        return written
+                    print(f"[{get_timestamp()}]     {Colors.RED}Dropping {len(queued)} queued formatting requests rejected by the API: {e}{Colors.END}")
+                    del self._requests[spreadsheet_id]
+                    continue
+
+                del self._requests[spreadsheet_id]
+
+        return written
+
+    def take_dropped(self):
+        """
+        Return the keys of updates dropped since the last call.
+
+        Returns:
+            list: Keys passed to submit() whose values the API rejected
+        """
+        with self._lock:
+            dropped, self._dropped = self._dropped, []
+            return dropped
+
+
+def _status_code(error):
+    # HTTP status of a failed gspread call, None for connection errors
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def _is_rejected(error):
+    # API errors that no retry can fix (4xx other than 429); quota, server and connection errors can recover
+    status = _status_code(error)
+    return isinstance(error, APIError) and status is not None and 400 <= status < 500 and status not in RETRY_STATUS_CODES
+
+
+def _retry_after(error):
+    # Delay requested by the server in seconds, if any
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _request_key(request):
+    # Later requests updating the same fields of the same cells replace earlier ones
+    kind, body = next(iter(request.items()))
+    if "range" in body and "fields" in body:
+        return (kind, json.dumps(body["range"], sort_keys=True), body["fields"])
+    return (kind, json.dumps(body, sort_keys=True, default=str))
+
+
+# Scheduler shared by all Sheets calls of the current process
+_scheduler = None
+
+def get_sheets_scheduler():
+    """
+    Return the Sheets request scheduler shared by the whole run.
+
+    Returns:
+        SheetsScheduler: Shared scheduler, created on first use
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = SheetsScheduler()
+    return _scheduler
@@ -0,0 +1,161 @@
+"""
+Background writer for Google Sheets updates.
+
+gspread calls are blocking HTTP requests. Made directly inside the asyncio
+loop, every sheet write stalls all running browser scrapes and timers. The
+writer moves them to a dedicated thread:
+- The event loop only enqueues updates, the thread sends them through the
+  quota-aware scheduler
+- The queue is bounded; a full queue makes submit() wait (backpressure)
+  instead of buffering an unbounded backlog
+- Keys of written updates are handed back to the loop via take_written()
+- close() flushes everything still queued and waits for the thread
+"""
+
+import queue
+import asyncio
+import threading
+from utils import Colors, get_timestamp, get_setting, span
+from .scheduler import get_sheets_scheduler
+
+# Queue markers for flush requests and shutdown
+_FLUSH = object()
+_STOP = object()
+
+class SheetWriter:
+    """
+    Thread sending queued Sheets updates through a SheetsScheduler.
+
+    Attributes:
+        scheduler (SheetsScheduler): Scheduler pacing and batching the writes
+        idle_flush (float): Seconds without new updates before queued writes are flushed
+    """
+
+    def __init__(self, scheduler=None, max_queue=None, idle_flush=1.0):
+        """Create a stopped writer, max_queue defaults to the SHEETS_WRITE_QUEUE setting (100)."""
+        self.scheduler = scheduler or get_sheets_scheduler()
+        self.idle_flush = idle_flush
+        self._queue = queue.Queue(maxsize=max_queue or get_setting("SHEETS_WRITE_QUEUE", 100))
+        self._written = queue.SimpleQueue()
+        self._thread = None
+
+    def start(self):
+        """Start the writer thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sheet-writer", daemon=True)
+            self._thread.start()
+
+    async def submit(self, worksheet, values=(), format_requests=(), key=None):
+        """
+        Queue an update for the writer thread.
+
+        Waits without blocking the event loop while the queue is full.
+
+        Args:
+            worksheet (gspread.Worksheet): Worksheet the values belong to
+            values (list): Value updates as {"range": "D5", "values": [[...]]}
+            format_requests (list): batchUpdate requests, e.g. repeatCell formatting
+            key (str, optional): Identifier returned by take_written() once written
+
+        Usage:
+            await writer.submit(worksheet, batch_data, format_requests, key=sku)
+        """
+        # Traced within the row, the span shows time spent waiting for queue space
+        with span("sheets.submit", cells=len(values), requests=len(format_requests), queued=self._queue.qsize()):
+            await self._put((worksheet, values, format_requests, key))
+
+    async def flush(self):
+        """Wait until every update submitted so far has been sent."""
+        done = threading.Event()
+        await self._put((_FLUSH, done))
+        await asyncio.to_thread(done.wait)
+
+    async def close(self):
+        """Flush all queued updates and stop the writer thread."""
+        if self._thread is None:
+            return
+        await self._put((_STOP, None))
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
+
+    def take_written(self):
+        """
+        Return the keys of updates written since the last call.
+
+        Returns:
+            list: Keys passed to submit(), in the order their values were written
+        """
+        written = []
+        while True:
+            try:
+                written.append(self._written.get_nowait())
+            except queue.Empty:
+                return written
+
+    def take_dropped(self):
+        """
+        Return the keys of updates dropped since the last call.
+
+        Returns:
+            list: Keys passed to submit() whose values the API rejected
+        """
+        return self.scheduler.take_dropped()
+
+    async def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Backpressure: wait in a worker thread until the writer catches up
+            await asyncio.to_thread(self._queue.put, item)
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.idle_flush)
+            except queue.Empty:
+                # Nothing new arrived, send what the scheduler kept back for quota
+                if self.scheduler.pending:
+                    self._flush()
+                continue
+
+            # Merge all updates that queued up while the last write was in flight
+            if not _is_marker(item):
+                item = self._merge_queued(item)
+                try:
+                    self._report(self.scheduler.flush(wait=self.scheduler.pending >= self.scheduler.max_pending))
+                except Exception as e:
+                    print(f"[{get_timestamp()}]     {Colors.RED}Sheet writer error: {e}{Colors.END}")
+                if item is None:
+                    continue
+
+            if item[0] is _STOP:
+                self._flush()
+                return
+            if item[0] is _FLUSH:
+                self._flush()
+                item[1].set()
+
+    def _merge_queued(self, item):
+        # Hand queued updates to the scheduler without writing; returns the first marker or None
+        while not _is_marker(item):
+            worksheet, values, format_requests, key = item
+            self.scheduler.submit(worksheet, values, format_requests, key=key, flush=False)
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return None
+        return item
+
+    def _flush(self):
+        try:
+            self._report(self.scheduler.flush())
+        except Exception as e:
+            print(f"[{get_timestamp()}]     {Colors.RED}Sheet writer flush failed: {e}{Colors.END}")
+
+    def _report(self, keys):
+        for key in keys:
+            self._written.put(key)
+
+
+def _is_marker(item):
+    return item[0] is _STOP or item[0] is _FLUSH
@@ -3,106 +3,271 @@ Main execution module for the price bot application.
 
 Orchestrates the entire price collection workflow including:
 - Google Sheets integration and data retrieval
+- Runs across several target worksheets (GOOGLE_SHEETS_TARGETS): products
+  referenced by several rows are scraped once and written to all of them
 - Concurrent web scraping from multiple e-commerce platforms
 - Data processing and formatting
-- Batch updates to Google Sheets with color coding
+- Batch updates to Google Sheets, paced to the API quotas and sent from a
+  background writer thread off the event loop
+- One-time installation of the availability color rules (--setup-formatting)
+- Progress checkpoints for resuming interrupted runs (--resume)
+- Targeted refreshes of selected sources and rows (--sources, --sku-regex,
+  --base-sku, --rows, --max-age)
+- Recording fetched pages and API responses to an archive (--record) and
+  replaying them offline without spreadsheet writes (--replay)
+- Sampling profiles with event loop blocking detection (--profile)
+- Per-row trace spans written as OpenTelemetry JSON (--trace)
 
 The module handles rate limiting, error recovery, and performance monitoring
 for robust operation across Austrian e-commerce and B2B distributor platforms.
 """
 
 import asyncio
+import argparse
 from datetime import datetime
-from utils import Colors, get_timestamp, format_availability_column, format_itscope_availability_columns
-from google_sheets import setup_google_worksheet, get_data, get_sku_list
-from processors import process_sku
+from utils import Colors, get_timestamp, get_setting, get_metrics, RunCheckpoint, open_snapshot_archive, get_snapshot_archive, close_snapshot_archive, run_profiled, span, open_tracer, close_tracer, price_column_format_requests, column_letter_to_index, normalize_prices, price_keys, cell_note_request, CELL_NOTES_KEY, open_result_cache, get_result_cache, close_result_cache
+import scrapers
+import google_sheets
+from processors import process_sku, prefetch_upcoming_rows, release_row_prefetches, shares_sku_token, filter_rows, iter_with_lookahead, iter_in_thread, parse_sources, parse_row_range, parse_duration, SOURCES, LAST_UPDATED_KEY, merge_sheet_rows, record_sheet_rows, recorded_sheets, update_key, placement_keys, split_update_key, worksheet_label
 from config import COLUMN_MAP, SEMAPHORE_LIMIT
 
-async def main_async():
+async def main_async(resume=False, sources=SOURCES, sku_regex=None, base_skus=None, row_range=None, max_age=None, record=None, replay=None, trace=None, refresh=False):
     """
     Main asynchronous execution function for price collection workflow.
     
     Coordinates the entire process from Google Sheets data retrieval through
     concurrent web scraping to final data formatting and batch updates.
     Implements rate limiting and error handling for robust operation.
+
+    Progress is saved to a checkpoint file every few seconds and when the
+    run ends. When resuming, rows completed by the interrupted run are
+    skipped and spreadsheet updates that were never written are flushed
+    first.
+
+    Targeted runs only scrape the selected sources for the selected rows;
+    all other cells of the spreadsheet are left untouched.
+
+    All worksheets of GOOGLE_SHEETS_TARGETS are updated in one run. Rows
+    with the same SKU and links are scraped once and the results written
+    to every worksheet row referencing them; filters apply per worksheet.
+
+    With record, every fetched page and API response and the spreadsheet
+    rows are saved to a zip archive; with replay, rows and scrapers are
+    served from such an archive without network access and the collected
+    values are only logged, not written.
+
+    Args:
+        resume (bool): Continue from the checkpoint of an interrupted run
+        sources (tuple): Sources to scrape (default: all of SOURCES)
+        sku_regex (str, optional): Only rows whose SKU matches this pattern
+        base_skus (list, optional): Only rows with one of these base SKUs
+        row_range (tuple, optional): Only spreadsheet rows in (first, last)
+        max_age (timedelta, optional): Only rows last updated longer ago than this
+        record (str, optional): Path of a snapshot archive to record the run into
+        replay (str, optional): Path of a recorded snapshot archive to replay
+        trace (str, optional): Path of an OTLP JSON lines file to write row traces to
+        refresh (bool): Scrape all shop results again even if the result cache TTLs allow cached ones
     """
     # Time stamp used for run-time calculation only; ignore
     start_time = datetime.now()
+
+    checkpoint_path = get_setting("CHECKPOINT_FILE", "price_bot_checkpoint.json")
+    if replay:
+        # Replay progress must never make a live --resume skip rows
+        checkpoint_path = f"{replay}.checkpoint.json"
+    if resume:
+        checkpoint = RunCheckpoint.load(checkpoint_path)
+    else:
+        checkpoint = RunCheckpoint(checkpoint_path)
+
+    writer = None
     
     try:
+        # One trace per row with spans for scrapes, retries, requests and sheet writes
+        if trace:
+            open_tracer(trace)
+
+        # Record or replay scraped pages and API responses
+        if record:
+            open_snapshot_archive(record, "record")
+        elif replay:
+            open_snapshot_archive(replay, "replay")
+        else:
+            # Good shop results of earlier runs, recordings and replays always scrape
+            open_result_cache(refresh=refresh)
+
         # Setup
-        worksheet = setup_google_worksheet()
-        records = get_data(worksheet)
-        sku_lookup_table = get_sku_list(worksheet)
+        if replay:
+            # Replays read the rows recorded with the archive, nothing reaches Google
+            sheets = recorded_sheets(get_snapshot_archive())
+        else:
+            # Rows are streamed page by page while earlier rows are already processed
+            first_row = row_range[0] if row_range and row_range[0] else 2
+            sheets = [(worksheet, google_sheets.iter_rows(worksheet, first_row=first_row))
+                      for worksheet in google_sheets.setup_google_worksheets()]
+            if record:
+                sheets = record_sheet_rows(get_snapshot_archive(), sheets)
+        worksheets = [worksheet for worksheet, _ in sheets]
+
+        # Restrict the run to the requested rows of every worksheet, then merge rows of the same product
+        rows = merge_sheet_rows([
+            (worksheet, filter_rows(sheet_rows, sku_regex=sku_regex, base_skus=base_skus, row_range=row_range, max_age=max_age))
+            for worksheet, sheet_rows in sheets
+        ])
+        if sku_regex or base_skus or row_range or max_age or tuple(sources) != SOURCES:
+            print(f"[{get_timestamp()}] {Colors.YELLOW}Targeted run, sources: {', '.join(sources)}{Colors.END}")
         
         # Semaphore to limit concurrent requests
         semaphore = asyncio.Semaphore(SEMAPHORE_LIMIT)
         
-        last_prices = {}
+        last_prices = checkpoint.last_prices
 
-        for row in records:
-            try:
+        # Sheets writes run in a background thread, paced and batched by the scheduler
+        writer = google_sheets.SheetWriter()
+        writer.start()
 
-                # Adds a 1 second delay between row processings, so there is some time between requests
-                await asyncio.sleep(1)
+        # Price cells hold numbers, so the euro display format is set per column
+        if not replay:
+            for worksheet in worksheets:
+                await writer.submit(worksheet, format_requests=price_column_format_requests(
+                    worksheet.id, [COLUMN_MAP[key] for key in price_keys() if key in COLUMN_MAP]))
 
-                # Process SKU concurrently
-                sku, prices = await process_sku(row, last_prices, semaphore)
-                if not sku:
-                    print(f"[{get_timestamp()}]     {Colors.RED}Error in SKU Processor: {e}{Colors.END}")
-                    continue
-                
-                if sku in sku_lookup_table:
-                    row_index = sku_lookup_table[sku]
-
-                    batch_data = []
-
-                    for price_key, price_value in prices.items():
-                        col_letter = COLUMN_MAP[price_key]   # e.g. "D"
-                        cell_range = f"{col_letter}{row_index}"    # e.g. "D5"
-
-                        batch_data.append({
-                            "range":  cell_range,
-                            "values": [[ price_value ]]      # must be a 2D array: rows → [cells]
-                        })
-
-                    # Debug line
-                    print(f"[{get_timestamp()}]     {Colors.BLUE}Updating cells: {batch_data}{Colors.END}")  
-
-                    try:
-                        worksheet.batch_update(batch_data, value_input_option='RAW')
-
-                        availability_value = prices.get("Verfügbar")
-                        if availability_value is not None:
-                            format_availability_column(worksheet, row_index, availability_value)
-                        
-                        availability_value = prices.get("INGRAM")
-                        if availability_value is not None:
-                            format_itscope_availability_columns(worksheet, row_index, availability_value, 5)
-
-                        availability_value = prices.get("ALSO")
-                        if availability_value is not None:
-                            format_itscope_availability_columns(worksheet, row_index, availability_value, 4)
-
-                        availability_value = prices.get("TD Synnex")
-                        if availability_value is not None:
-                            format_itscope_availability_columns(worksheet, row_index, availability_value, 3)       
-                                                 
-                        print(f"[{get_timestamp()}]     {Colors.GREEN}Successfully updated {sku}{Colors.END}")
-                    except Exception as e:
-                        print(f"[{get_timestamp()}]     {Colors.RED}Error updating spreadsheet for SKU {sku}: {e}{Colors.END}")
+        # Launch the shared browser once; accepts cookie consent for new sites
+        browser_sites = [source for source in sources if source != "itscope"]
+        if browser_sites:
+            await scrapers.get_browser_pool().start(browser_sites)
+
+        # Crawl configured Campuspoint listing pages once for the whole run
+        if "campuspoint" in sources:
+            await scrapers.load_campuspoint_listings(semaphore)
+
+        # Index our own edustore catalog feed for in-memory price and stock lookups;
+        # the download is blocking, so it runs in a worker thread beside the started browser
+        if "edustore" in sources:
+            await asyncio.to_thread(scrapers.load_edustore_feed)
+
+        # Flush updates the interrupted run prepared but never wrote
+        for pending_key, pending_data in list(checkpoint.pending.items()):
+            worksheet, _ = split_update_key(pending_key, worksheets)
+            if worksheet is None:
+                print(f"[{get_timestamp()}] {Colors.RED}Dropping pending update of {pending_key}, worksheet is no longer a target{Colors.END}")
+                checkpoint.mark_written(pending_key)
+                continue
+            await writer.submit(worksheet, pending_data, key=pending_key)
+        await writer.flush()
+        mark_written(writer, checkpoint)
+
+        # Number of upcoming rows whose pages are loaded while the current row is processed
+        lookahead = get_setting("PREFETCH_LOOKAHEAD", 2)
+
+        # Sheet pages are read in a worker thread, paced reads do not stall the running scrapes
+        async for row, upcoming in iter_in_thread(iter_with_lookahead(rows, lookahead)):
+            # One trace per row, scrapes, retries and sheet submissions are its child spans
+            with span("row", sku=row["SKU"], row=row.row_number, worksheets=len(row.placements)) as row_span:
+                try:
+                    # Skip rows finished by an interrupted run
+                    if resume and completed_earlier(row, checkpoint):
+                        print(f"[{get_timestamp()}] {Colors.YELLOW}Skipping completed SKU: {row['SKU']}{Colors.END}")
+                        row_span.set(outcome="completed earlier")
+                        continue
+
+                    # Overlap the next rows' page loads with this row's scraping and writing
+                    upcoming = [upcoming_row for upcoming_row in upcoming
+                                if not (resume and completed_earlier(upcoming_row, checkpoint))]
+                    prefetch_upcoming_rows(upcoming, row["SKU"], sources)
+
+                    # Adds a 1 second delay between row processings, so there is some time between requests
+                    await asyncio.sleep(1)
+
+                    # Process SKU concurrently
+                    sku, prices = await process_sku(row, last_prices, semaphore, sources)
+                    if not sku:
+                        print(f"[{get_timestamp()}]     {Colors.RED}Skipping row {row.row_number} without SKU{Colors.END}")
+                        row_span.set(outcome="no sku")
+                        continue
 
+                    # Prices are written as numbers, statuses as their label text
+                    normalized_prices = normalize_prices(prices)
+
+                    # The same results go to every row referencing the product, in any worksheet
+                    cells = 0
+                    for worksheet, row_index in row.placements:
+                        batch_data, note_requests = build_row_updates(worksheet, row_index, prices, normalized_prices,
+                                                                      stamp=tuple(sources) == SOURCES)
+                        cells += len(batch_data)
+
+                        # Debug line
+                        print(f"[{get_timestamp()}]     {Colors.BLUE}Updating cells of {worksheet_label(worksheet)}: {batch_data}{Colors.END}")
+
+                        if replay:
+                            # Replayed results are frozen snapshots and never reach the live spreadsheet
+                            print(f"[{get_timestamp()}]     {Colors.YELLOW}Replay run, spreadsheet not updated for {sku}{Colors.END}")
+                            continue
+
+                        key = update_key(worksheet, sku, row_index)
+                        checkpoint.mark_pending(key, batch_data)
+
+                        # Written in the background, merged with the next rows' updates of the same worksheet.
+                        # Availability colors come from the conditional format rules (--setup-formatting)
+                        await writer.submit(worksheet, batch_data, note_requests, key=key)
+                    mark_written(writer, checkpoint)
+
+                    # Keep cached values of unselected sources for the next SKU variant
+                    if last_prices and shares_sku_token(sku, last_prices["SKU"]):
+                        prices = {**last_prices, **prices}
                     last_prices = prices
                     last_prices["SKU"] = sku
-                else:
-                    print(f"[{get_timestamp()}]     {Colors.RED}SKU {sku} not found in lookup table{Colors.END}")
+
+                    for key in placement_keys(row):
+                        checkpoint.mark_completed(key, last_prices)
+                    checkpoint.save_if_due()
+
+                    # Statuses of the written price columns, e.g. how many sources timed out
+                    statuses = [result.status for result in normalized_prices.values()]
+                    row_span.set(outcome="ok", cells=cells,
+                                 **{f"status.{status}": statuses.count(status) for status in set(statuses)})
                     
-            except Exception as e:
-                print(f"[{get_timestamp()}]     {Colors.RED}Error processing row for SKU {sku}: {e}{Colors.END}")
-                continue
+                except Exception as e:
+                    print(f"[{get_timestamp()}]     {Colors.RED}Error processing row for SKU {sku}: {e}{Colors.END}")
+                    row_span.fail(f"{type(e).__name__}: {e}")
+                    row_span.set(outcome="error")
+                    continue
+                finally:
+                    # Prefetched pages of this row that were not used (cache hits, timeouts, errors)
+                    await release_row_prefetches(row)
+
+        # Write everything still queued, waiting for quota if necessary
+        await writer.close()
+        mark_written(writer, checkpoint)
+
+        # Keep the checkpoint only if some updates still need to be flushed
+        if checkpoint.pending:
+            print(f"[{get_timestamp()}] {Colors.YELLOW}{len(checkpoint.pending)} updates not written, run with --resume to retry{Colors.END}")
+        else:
+            checkpoint.clear()
                 
     except Exception as e:
         print(f"[{get_timestamp()}] {Colors.RED}Fatal error in main(): {e}{Colors.END}")
+    finally:
+        # Never leave queued updates behind, even after a fatal error
+        if writer is not None:
+            await writer.close()
+            mark_written(writer, checkpoint)
+
+        # Progress since the last periodic save, also after an interrupt (Ctrl+C cancels the run)
+        checkpoint.flush()
+
+        # Background refreshes still need the browser, so the cache is saved first
+        await close_result_cache()
+
+        # Persists cookies and localStorage of every site for the next run
+        await scrapers.get_browser_pool().close()
+
+        # Completes a recorded archive with its manifest
+        close_snapshot_archive()
+
+        # Writes the spans of the last rows and the sheet writer
+        close_tracer()
     
     # Calculates how long the script took to finish
     end_time = datetime.now()
@@ -124,16 +289,195 @@ async def main_async():
     time_str = " ".join(time_parts)
     print(f"[{get_timestamp()}] {Colors.YELLOW}Script completed in {time_str}{Colors.END}")
 
+    # Coalesced requests and other counters of the run
+    get_metrics().report()
+
+
+def build_row_updates(worksheet, row_index, prices, normalized_prices, stamp=True):
+    """
+    Build the cell updates and cell note requests of one spreadsheet row.
+
+    Args:
+        worksheet (gspread.Worksheet): Worksheet of the row
+        row_index (int): Spreadsheet row number
+        prices (dict): Collected values from process_sku()
+        normalized_prices (dict): Normalized price columns from normalize_prices()
+        stamp (bool): Write the refresh time; only runs of all sources do, so
+            --max-age never skips rows whose unselected sources are stale
 
-def main():
+    Returns:
+        tuple: (value updates as {"range": "D5", "values": [[...]]}, note requests)
+    """
+    batch_data = []
+
+    for price_key, price_value in prices.items():
+        # Optional columns (e.g. Geizhals competitors) are only written if mapped
+        if price_key not in COLUMN_MAP:
+            continue
+
+        if price_key in normalized_prices:
+            price_value = normalized_prices[price_key].cell_value()
+
+        col_letter = COLUMN_MAP[price_key]   # e.g. "D"
+        cell_range = f"{col_letter}{row_index}"    # e.g. "D5"
+
+        batch_data.append({
+            "range":  cell_range,
+            "values": [[ price_value ]]      # must be a 2D array: rows → [cells]
+        })
+
+    # Record the refresh time so later runs can select stale rows (--max-age)
+    if stamp and LAST_UPDATED_KEY in COLUMN_MAP:
+        batch_data.append({
+            "range":  f"{COLUMN_MAP[LAST_UPDATED_KEY]}{row_index}",
+            "values": [[ get_timestamp() ]]
+        })
+
+    # Age markers of cached values as cell notes, live values clear old markers.
+    # Only notes differing from the last one written to the cell are sent
+    cache = get_result_cache()
+    note_requests = [cell_note_request(worksheet.id, row_index, column_letter_to_index(COLUMN_MAP[key]), note)
+                     for key, note in prices.get(CELL_NOTES_KEY, {}).items()
+                     if key in COLUMN_MAP and cache is not None
+                     and cache.note_changed(f"{worksheet_label(worksheet)}!{COLUMN_MAP[key]}{row_index}", note)]
+
+    return batch_data, note_requests
+
+
+def setup_formatting():
+    """
+    Install the availability color rules on every target worksheet.
+
+    Replaces the per-row cell formatting of earlier versions: the rules are
+    installed once as conditional formatting and updated in place when the
+    setup is run again.
+    """
+    availability_columns = [column_letter_to_index(COLUMN_MAP["Verfügbar"])] if "Verfügbar" in COLUMN_MAP else []
+    itscope_columns = [column_letter_to_index(COLUMN_MAP[key]) for key in scrapers.get_distributors() if key in COLUMN_MAP]
+
+    for worksheet in google_sheets.setup_google_worksheets():
+        google_sheets.install_availability_formatting(worksheet, availability_columns, itscope_columns)
+
+
+def completed_earlier(row, checkpoint):
+    """
+    Check whether an interrupted run finished every sheet row of a product.
+
+    Args:
+        row (ProductRow): Product of the current run
+        checkpoint (RunCheckpoint): Checkpoint loaded with --resume
+
+    Returns:
+        bool: True if all rows referencing the product were processed
+    """
+    return all(checkpoint.is_completed(key) for key in placement_keys(row))
+
+
+def mark_written(writer, checkpoint):
+    """
+    Record the updates the background writer has written or dropped since the last call.
+
+    Dropped updates were rejected by the API and are not sent again, neither
+    in this run nor on --resume.
+
+    Args:
+        writer (SheetWriter): Background sheet writer
+        checkpoint (RunCheckpoint): Checkpoint of the current run
+    """
+    written = writer.take_written()
+    for key in written:
+        checkpoint.mark_written(key)
+        print(f"[{get_timestamp()}]     {Colors.GREEN}Successfully updated {key}{Colors.END}")
+    dropped = writer.take_dropped()
+    for key in dropped:
+        checkpoint.mark_written(key)
+        print(f"[{get_timestamp()}]     {Colors.RED}Update of {key} was rejected by the API and dropped{Colors.END}")
+    if written or dropped:
+        checkpoint.save_if_due()
+
+
+def parse_args(argv=None):
+    """
+    Parse command line options for the price bot.
+
+    Args:
+        argv (list, optional): Argument list, defaults to sys.argv[1:]
+
+    Returns:
+        argparse.Namespace: Parsed command line options
+    """
+    parser = argparse.ArgumentParser(description="Collect prices and availability and update Google Sheets.")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted run from its checkpoint")
+    parser.add_argument("--setup-formatting", action="store_true",
+                        help="install or update the availability color rules of the target worksheets and exit")
+    parser.add_argument("--sources", type=parse_sources, default=SOURCES,
+                        help=f"comma-separated sources to scrape (default: {','.join(SOURCES)})")
+    parser.add_argument("--sku-regex",
+                        help="only refresh rows whose SKU matches this regular expression")
+    parser.add_argument("--base-sku", nargs="+", dest="base_skus", metavar="BASE_SKU",
+                        help="only refresh rows with these base SKUs (part before the first hyphen)")
+    parser.add_argument("--rows", type=parse_row_range, dest="row_range", metavar="FIRST:LAST",
+                        help="only refresh this spreadsheet row range, e.g. 10:50, 10: or :50")
+    parser.add_argument("--max-age", type=parse_duration,
+                        help=f"only refresh rows whose '{LAST_UPDATED_KEY}' is older than this, e.g. 12h or 2d "
+                             f"(the time is only written by runs of all sources)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="scrape every shop result again even if RESULT_CACHE_FRESH_TTL or RESULT_CACHE_STALE_TTL "
+                             "are set (both default to 0); cached results still replace failed scrapes")
+    snapshots = parser.add_mutually_exclusive_group()
+    snapshots.add_argument("--record", metavar="ARCHIVE",
+                           help="save every fetched page and ITScope response to this zip archive")
+    snapshots.add_argument("--replay", metavar="ARCHIVE",
+                           help="serve pages and ITScope responses from a recorded archive, no spreadsheet writes")
+    parser.add_argument("--trace", nargs="?", const="price_bot_trace.jsonl", metavar="FILE",
+                        help="write per-row trace spans as OTLP JSON lines (default file: price_bot_trace.jsonl)")
+    parser.add_argument("--profile", nargs="?", const="price_bot_profile", metavar="PREFIX",
+                        help="profile the run, writes PREFIX.txt and PREFIX.folded (default prefix: price_bot_profile)")
+    args = parser.parse_args(argv)
+
+    # Without a written refresh time every row would count as stale
+    if args.max_age and LAST_UPDATED_KEY not in COLUMN_MAP:
+        parser.error(f"--max-age needs the '{LAST_UPDATED_KEY}' column in COLUMN_MAP")
+
+    return args
+
+
+def main(argv=None):
     """
     Synchronous entry point wrapper for the async main function.
     
     Provides a simple interface for running the price bot from command line
     or other synchronous contexts by wrapping the async execution.
+
+    Args:
+        argv (list, optional): Command line arguments, defaults to sys.argv[1:]
     """
+    args = parse_args(argv)
+
+    if args.setup_formatting:
+        setup_formatting()
+        return
+
+    run = main_async(
+        resume=args.resume,
+        sources=args.sources,
+        sku_regex=args.sku_regex,
+        base_skus=args.base_skus,
+        row_range=args.row_range,
+        max_age=args.max_age,
+        record=args.record,
+        replay=args.replay,
+        trace=args.trace,
+        refresh=args.refresh
+    )
+
+    # Sample the whole run, including the blocking calls made on the event loop
+    if args.profile:
+        run = run_profiled(run, args.profile)
+
     # Runs the async main function
-    asyncio.run(main_async())
+    asyncio.run(run)
 
 
 if __name__ == '__main__':
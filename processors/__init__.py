@@ -6,6 +6,7 @@ This package provides core business logic for processing product SKUs:
 - Smart caching for SKU variants to reduce API calls
 - Integration with all scraper modules and Google Sheets
 - Error handling and logging for robust data collection
+- Merging the rows of several target worksheets into products scraped once
 
 The main processor orchestrates data collection from:
 - Geizhals (price comparison)
@@ -14,8 +15,30 @@ The main processor orchestrates data collection from:
 - ITScope (B2B distributors)
 """
 
-from .sku_processor import process_sku
+from .sku_processor import process_sku, prefetch_upcoming_rows, release_row_prefetches, shares_sku_token
+from .sheet_targets import ProductRow, RecordedWorksheet, merge_sheet_rows, record_sheet_rows, recorded_sheets, update_key, placement_keys, split_update_key, worksheet_label
+from .row_filter import SOURCES, LAST_UPDATED_KEY, filter_rows, iter_with_lookahead, iter_in_thread, parse_sources, parse_row_range, parse_duration
 
 __all__ = [
-    "process_sku"    # Main async function for processing individual SKUs with concurrent scraping
+    "process_sku",             # Main async function for processing individual SKUs with concurrent scraping
+    "prefetch_upcoming_rows",  # Starts loading upcoming rows' pages in pooled browser tabs
+    "release_row_prefetches",  # Closes prefetched pages a finished row did not use
+    "shares_sku_token",        # Checks whether two SKUs are variants of the same product
+    "ProductRow",              # Product scraped once for all rows of all worksheets referencing it
+    "merge_sheet_rows",        # Merges the rows of several target worksheets into products
+    "RecordedWorksheet",       # Offline stand-in of a worksheet recorded for --replay
+    "record_sheet_rows",       # Records targets and rows read in a snapshot archive (--record)
+    "recorded_sheets",         # Targets and rows of a snapshot archive (--replay)
+    "update_key",              # Checkpoint and writer key of a row update in a worksheet
+    "placement_keys",          # Update keys of all sheet rows referencing a product
+    "split_update_key",        # Finds worksheet and SKU of an update key
+    "worksheet_label",         # Readable "<spreadsheet>/<worksheet>" name
+    "SOURCES",                 # Sources that can be selected for a run
+    "LAST_UPDATED_KEY",        # Column holding the time of a row's last update
+    "filter_rows",             # Selects rows by SKU pattern, base SKU, row range and age
+    "iter_with_lookahead",     # Pairs each row of a stream with its upcoming rows
+    "iter_in_thread",          # Advances a blocking row stream in a worker thread
+    "parse_sources",           # Parses a comma-separated source list (--sources)
+    "parse_row_range",         # Parses a spreadsheet row range like "10:50" (--rows)
+    "parse_duration"           # Parses durations like "12h" or "2d" (--max-age)
 ]
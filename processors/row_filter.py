@@ -0,0 +1,187 @@
+"""
+Row selection for targeted refreshes.
+
+Provides the filters behind the command line options of the price bot:
+- SKU regular expression and base-SKU lists
+- Spreadsheet row ranges
+- Maximum age of a row's last update
+
+Filtered runs only scrape and write the selected rows; all other rows of
+the spreadsheet are left untouched. Filters work on row streams, so rows
+can be selected while the sheet is still being read page by page.
+"""
+
+import re
+import asyncio
+from collections import deque
+from itertools import islice
+from datetime import datetime, timedelta
+from utils import LAST_UPDATED_KEY
+
+# Sources that can be selected for a run
+SOURCES = ("geizhals", "campuspoint", "edustore", "itscope")
+
+_DURATION_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$')
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def parse_sources(value):
+    """
+    Parse a comma-separated source list.
+
+    Args:
+        value (str): Sources like "geizhals,itscope"
+
+    Returns:
+        tuple: Selected sources in canonical order
+
+    Raises:
+        ValueError: If an unknown source is given
+    """
+    selected = {source.strip().lower() for source in value.split(",") if source.strip()}
+    unknown = selected - set(SOURCES)
+    if unknown:
+        raise ValueError(f"unknown sources: {', '.join(sorted(unknown))} (choose from {', '.join(SOURCES)})")
+    return tuple(source for source in SOURCES if source in selected)
+
+
+def parse_row_range(value):
+    """
+    Parse a spreadsheet row range like "10:50", "10:" or ":50" (inclusive).
+
+    Args:
+        value (str): Row range using spreadsheet row numbers
+
+    Returns:
+        tuple: (first row or None, last row or None)
+
+    Raises:
+        ValueError: If the range is malformed
+    """
+    if ":" not in value:
+        row = int(value)
+        return row, row
+
+    start, end = value.split(":", 1)
+    return (int(start) if start.strip() else None, int(end) if end.strip() else None)
+
+
+def parse_duration(value):
+    """
+    Parse a duration like "30m", "12h", "2d" or a number of seconds.
+
+    Args:
+        value (str): Duration text
+
+    Returns:
+        timedelta: Parsed duration
+
+    Raises:
+        ValueError: If the duration is malformed
+    """
+    match = _DURATION_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"invalid duration: {value!r} (use e.g. 30m, 12h or 2d)")
+    return timedelta(seconds=float(match.group(1)) * _DURATION_UNITS[match.group(2)])
+
+
+def filter_rows(records, sku_regex=None, base_skus=None, row_range=None, max_age=None, now=None):
+    """
+    Select the spreadsheet rows to refresh.
+
+    Rows carrying their own row_number (SheetRow) are matched against
+    row_range by that number, plain dictionaries by their position.
+
+    Args:
+        records (iterable): Rows from iter_rows() or get_data(), first entry is sheet row 2
+        sku_regex (str, optional): Regular expression the SKU must match (re.search)
+        base_skus (iterable, optional): Base SKUs (part before the first hyphen) to include
+        row_range (tuple, optional): (first, last) spreadsheet row numbers, inclusive
+        max_age (timedelta, optional): Only rows last updated longer ago than this
+        now (datetime, optional): Reference time for max_age (default: now)
+
+    Yields:
+        SheetRow | dict: Selected rows in spreadsheet order
+
+    Usage:
+        rows = filter_rows(iter_rows(worksheet), sku_regex="^MX", max_age=timedelta(hours=12))
+    """
+    pattern = re.compile(sku_regex) if sku_regex else None
+    base_skus = {base_sku.upper() for base_sku in base_skus} if base_skus else None
+    first_row, last_row = row_range if row_range else (None, None)
+    now = now or datetime.now()
+
+    for row_number, row in enumerate(records, start=2):
+        row_number = getattr(row, "row_number", row_number)
+        sku = row.get("SKU", "")
+
+        if first_row is not None and row_number < first_row:
+            continue
+        if last_row is not None and row_number > last_row:
+            break
+        if pattern is not None and not pattern.search(sku):
+            continue
+        if base_skus is not None and sku.split('-')[0].upper() not in base_skus:
+            continue
+        if max_age is not None and not _is_stale(row.get(LAST_UPDATED_KEY), now, max_age):
+            continue
+
+        yield row
+
+
+def iter_with_lookahead(rows, count):
+    """
+    Iterate over a row stream together with the rows that follow each row.
+
+    Only count upcoming rows are buffered, so the stream is consumed
+    lazily, one row ahead of the lookahead window.
+
+    Args:
+        rows (iterable): Row stream
+        count (int): Number of upcoming rows to return with each row
+
+    Yields:
+        tuple: (row, list of up to count upcoming rows)
+
+    Usage:
+        for row, upcoming in iter_with_lookahead(rows, 2):
+            prefetch_upcoming_rows(upcoming, row["SKU"])
+    """
+    rows = iter(rows)
+    window = deque(islice(rows, count + 1))
+    while window:
+        row = window.popleft()
+        yield row, list(window)
+        window.extend(islice(rows, 1))
+
+
+async def iter_in_thread(rows):
+    """
+    Iterate over a blocking row stream without blocking the event loop.
+
+    Advancing a stream from iter_rows() reads the next sheet page, which
+    waits for the Sheets read quota and backs off on rate limits. Each step
+    therefore runs in a worker thread, so scrapes of earlier rows and the
+    prefetched pages keep running meanwhile.
+
+    Args:
+        rows (iterable): Row stream
+
+    Yields:
+        Items of the stream in order
+
+    Usage:
+        async for row, upcoming in iter_in_thread(iter_with_lookahead(rows, 2)):
+            ...
+    """
+    rows = iter(rows)
+    done = object()
+    while (row := await asyncio.to_thread(next, rows, done)) is not done:
+        yield row
+
+
+def _is_stale(last_updated, now, max_age):
+    # Rows without a readable timestamp are always refreshed
+    try:
+        return now - datetime.strptime(last_updated, "%Y-%m-%d %H:%M:%S") > max_age
+    except (TypeError, ValueError):
+        return True
@@ -0,0 +1,252 @@
+"""
+Runs across several target worksheets with shared scrape results.
+
+Product lines and customer segments are kept in separate worksheets that
+list overlapping SKUs and URLs. Instead of one run per worksheet, a run
+reads all targets and merges their rows into products:
+- Rows with the same SKU and links (in any worksheet) become one product,
+  which is scraped once and written to every row that references it
+- Products are ordered by base SKU, so variants from different worksheets
+  follow each other and share the SKU variant cache
+- Rows of different products pointing at the same URL or base SKU still
+  share one fetch through the coalescing group
+
+Updates of merged rows are queued per worksheet, so the Sheets scheduler
+coalesces them into one batch write per worksheet.
+
+With --record, the targets and the rows read from them are stored in the
+snapshot archive; --replay reads them from there instead of from Google.
+"""
+
+import json
+from types import SimpleNamespace
+from utils import Colors, get_timestamp, normalize_url, SnapshotMissing
+import google_sheets
+
+# Rows per recorded chunk of a worksheet's row stream
+_ROW_CHUNK = 100
+
+
+class ProductRow:
+    """
+    Product scraped once for one or more spreadsheet rows.
+
+    Supports the dictionary access of SheetRow (row["SKU"], row.get(...)),
+    so it can be passed to the processors unchanged.
+
+    Attributes:
+        row (SheetRow): First row referencing the product
+        placements (list): (worksheet, row number) of every row referencing it
+    """
+    __slots__ = ("row", "placements")
+
+    def __init__(self, row, placements):
+        self.row = row
+        self.placements = placements
+
+    @property
+    def row_number(self):
+        """Spreadsheet row number of the first referencing row."""
+        return self.row.row_number
+
+    def __getitem__(self, header):
+        return self.row[header]
+
+    def get(self, header, default=None):
+        """Return the value of a header column, or default for unknown headers."""
+        return self.row.get(header, default)
+
+    def __repr__(self):
+        return f"ProductRow({self.row!r}, {len(self.placements)} rows)"
+
+
+def merge_sheet_rows(sheets):
+    """
+    Merge the rows of all target worksheets into products.
+
+    A single worksheet is streamed row by row. Several worksheets are read
+    completely first, as a product's rows in later worksheets have to be
+    known before it is scraped.
+
+    Args:
+        sheets (list): (worksheet, row stream) per target, e.g. from iter_rows()
+
+    Yields:
+        ProductRow: Products in processing order
+
+    Usage:
+        rows = merge_sheet_rows([(worksheet, iter_rows(worksheet)) for worksheet in worksheets])
+    """
+    if len(sheets) == 1:
+        worksheet, rows = sheets[0]
+        for row in rows:
+            yield ProductRow(row, [(worksheet, row.row_number)])
+        return
+
+    # Base SKU -> product key -> product, both in order of first appearance
+    groups = {}
+    total = 0
+    for worksheet, rows in sheets:
+        for row in rows:
+            total += 1
+            products = groups.setdefault(row["SKU"].split('-')[0], {})
+            key = _product_key(row)
+            product = products.get(key)
+            if product is None:
+                products[key] = ProductRow(row, [(worksheet, row.row_number)])
+            else:
+                product.placements.append((worksheet, row.row_number))
+
+    count = sum(len(products) for products in groups.values())
+    print(f"[{get_timestamp()}] {Colors.YELLOW}{total} rows in {len(sheets)} worksheets reference {count} products{Colors.END}")
+
+    for products in groups.values():
+        yield from products.values()
+
+
+class RecordedWorksheet:
+    """
+    Offline stand-in of a worksheet recorded in a snapshot archive (--replay).
+
+    Attributes:
+        id (int): Worksheet ID at recording time
+        title (str): Worksheet name
+        spreadsheet: Object with the spreadsheet's title (and the title as id)
+    """
+    __slots__ = ("id", "title", "spreadsheet")
+
+    def __init__(self, spreadsheet_title, title, sheet_id):
+        self.id = sheet_id
+        self.title = title
+        self.spreadsheet = SimpleNamespace(id=spreadsheet_title, title=spreadsheet_title)
+
+    def __repr__(self):
+        return f"<RecordedWorksheet {worksheet_label(self)!r}>"
+
+
+def record_sheet_rows(archive, sheets):
+    """
+    Record the targets of a run and every row read from them (--record).
+
+    Args:
+        archive (SnapshotArchive): Archive opened for recording
+        sheets (list): (worksheet, row stream) per target
+
+    Returns:
+        list: (worksheet, row stream) per target, the streams record the rows they yield
+
+    Usage:
+        sheets = record_sheet_rows(get_snapshot_archive(), sheets)
+    """
+    targets = [{"spreadsheet": worksheet.spreadsheet.title, "worksheet": worksheet.title, "id": worksheet.id}
+               for worksheet, _ in sheets]
+    archive.put("rows", "targets", json.dumps(targets, ensure_ascii=False))
+    return [(worksheet, _record_rows(archive, worksheet, rows)) for worksheet, rows in sheets]
+
+
+def recorded_sheets(archive):
+    """
+    Return the targets and rows recorded in a snapshot archive (--replay).
+
+    Args:
+        archive (SnapshotArchive): Archive opened for replaying
+
+    Returns:
+        list: (RecordedWorksheet, row stream of SheetRow) per recorded target
+
+    Raises:
+        SnapshotMissing: If the archive holds no spreadsheet rows
+    """
+    targets = archive.get("rows", "targets")
+    if targets is None:
+        raise SnapshotMissing(f"no spreadsheet rows recorded in {archive.path}")
+
+    sheets = []
+    for target in json.loads(targets):
+        worksheet = RecordedWorksheet(target["spreadsheet"], target["worksheet"], target["id"])
+        sheets.append((worksheet, _replay_rows(archive, worksheet)))
+    return sheets
+
+
+def update_key(worksheet, sku, row_number):
+    """
+    Key of a row update in the checkpoint and the sheet writer.
+
+    Rows with the same SKU but different links are different products, so
+    the key names the sheet row as well.
+
+    Args:
+        worksheet (gspread.Worksheet): Worksheet the update is written to
+        sku (str): SKU of the row
+        row_number (int): Spreadsheet row number
+
+    Returns:
+        str: Key like "ABC123-DE @ Preisliste/Notebooks!12"
+    """
+    return f"{sku} @ {worksheet_label(worksheet)}!{row_number}"
+
+
+def placement_keys(row):
+    """Update keys of all sheet rows referencing a product."""
+    return [update_key(worksheet, row["SKU"], row_number) for worksheet, row_number in row.placements]
+
+
+def split_update_key(key, worksheets):
+    """
+    Find the worksheet and SKU of an update key.
+
+    Keys of checkpoints written before multi-worksheet runs are plain SKUs
+    and belong to the first worksheet.
+
+    Args:
+        key (str): Key created by update_key()
+        worksheets (list): Target worksheets of the run
+
+    Returns:
+        tuple: (worksheet or None if it is no target of this run, SKU)
+    """
+    sku, separator, label = key.rpartition(" @ ")
+    if not separator:
+        return worksheets[0], key
+    label = label.rpartition("!")[0]
+    for worksheet in worksheets:
+        if worksheet_label(worksheet) == label:
+            return worksheet, sku
+    return None, sku
+
+
+def worksheet_label(worksheet):
+    """Readable name of a worksheet, "<spreadsheet>/<worksheet>"."""
+    return f"{worksheet.spreadsheet.title}/{worksheet.title}"
+
+
+def _record_rows(archive, worksheet, rows):
+    # Pass rows through, storing them in chunks; the last chunk is stored when the stream ends or is closed
+    chunk, index = [], 0
+    try:
+        for row in rows:
+            chunk.append({field: getattr(row, field) for field in row.__slots__})
+            if len(chunk) >= _ROW_CHUNK:
+                archive.put("rows", _chunk_url(worksheet, index), json.dumps(chunk, ensure_ascii=False))
+                chunk, index = [], index + 1
+            yield row
+    finally:
+        if chunk:
+            archive.put("rows", _chunk_url(worksheet, index), json.dumps(chunk, ensure_ascii=False))
+
+
+def _replay_rows(archive, worksheet):
+    index = 0
+    while (chunk := archive.get("rows", _chunk_url(worksheet, index))) is not None:
+        for values in json.loads(chunk):
+            yield google_sheets.SheetRow(**values)
+        index += 1
+
+
+def _chunk_url(worksheet, index):
+    return f"rows:{worksheet_label(worksheet)}:{index}"
+
+
+def _product_key(row):
+    # Rows scrape the same data if SKU and all links match
+    return (row["SKU"], *(normalize_url(row[header]) for header in ("Geizhals link", "Campuspoint link", "edustore link")))
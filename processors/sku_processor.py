@@ -10,25 +10,46 @@ Key features:
 - Concurrent scraping from multiple sources with rate limiting
 - Integration with Geizhals, Campuspoint, edustore, and ITScope platforms
 - Error handling and retry mechanisms for robust operation
+- Per-row and per-source deadlines bounding the time spent on one row
 """
 
 import json
 import asyncio
-from utils import Colors, get_timestamp, retry_after_timeout
-from scrapers import *
+from utils import (
+    Colors, get_timestamp, retry_after_timeout, get_single_flight, get_metrics,
+    TIMEOUT_RESULT, row_deadline, source_budget, current_deadline, deadline_scope,
+    CachedResult, CELL_NOTES_KEY, get_result_cache, is_failure_result
+)
+from .row_filter import SOURCES
+import scrapers
 
-async def process_sku(row, last_prices, semaphore):
+# Result of a failed ITScope request, written to all distributor columns; not kept by the coalescing group
+ITSCOPE_ERROR_RESULT = "Error fetching data"
+
+async def process_sku(row, last_prices, semaphore, sources=SOURCES):
     """
     Process a single SKU to collect price and availability data from multiple sources.
     
     Implements intelligent caching for SKU variants (e.g., different configurations
     of the same base product) to minimize redundant API calls. Orchestrates
     concurrent data collection from e-commerce sites and B2B distributors.
+
+    The row has ROW_DEADLINE seconds, each source at most its entry of
+    SOURCE_DEADLINES. Sources still running when their budget runs out are
+    cancelled and their columns set to "Timeout"; results of the other
+    sources are returned as usual.
+
+    Shop scrapes go through the persistent result cache if one is open:
+    failed and timed-out scrapes fall back to the last good value. Cell
+    notes of these columns (age markers of cached values, "" otherwise)
+    are returned under CELL_NOTES_KEY.
     
     Args:
         row (dict): Spreadsheet row data containing SKU and URLs
         last_prices (dict): Previously collected prices for caching optimization  
         semaphore (asyncio.Semaphore): Rate limiting semaphore for concurrent requests
+        sources (tuple): Sources to collect (default: all of SOURCES); columns of
+            other sources are missing from the result and left untouched
         
     Returns:
         tuple: (sku_string, prices_dict) containing SKU and collected price data
@@ -41,101 +62,331 @@ async def process_sku(row, last_prices, semaphore):
     url_gh = row["Geizhals link"]
     url_camp = row["Campuspoint link"]
     url_edu = row["edustore link"]
-    itclient = ITscopeClient()
 
     # Extract base SKU for caching comparison (before first hyphen)
     sku_first_block = sku.split('-')[0]
     
     print(f"[{get_timestamp()}] {Colors.BLUE}Processing SKU: {sku}{Colors.END}")
 
+    # Time budget of the whole row, sources get a share of it
+    deadline = row_deadline()
+
     tasks = []
 
+    def start(key, awaitable):
+        # Start collecting a column right away, within its source's budget
+        # Named after row and column, so profiles and tracebacks show what a task collects
+        tasks.append((key, asyncio.create_task(_within_budget(_source_of(key), awaitable, deadline), name=f"{sku} {key}")))
+
+    # Rows pointing at the same URL share one fetch per run
+    flight = get_single_flight()
+
+    # Good results are kept across runs, column key -> (source, url) of cached scrapes
+    cache = get_result_cache()
+    cached_urls = {}
+
+    def scrape(key, source, url, func):
+        # Scrape through the coalescing group and, if enabled, the result cache
+        fetch = lambda: flight.do(source, url, retry_after_timeout, func, url, semaphore)
+        if cache is None:
+            start(key, fetch())
+        else:
+            cached_urls[key] = (source, url)
+            start(key, cache.fetch(source, url, fetch))
+
+    # Look up our own shop's product in the edustore catalog feed (None if not indexed)
+    feed_entry = None
+    if "edustore" in sources and url_edu not in ("^", "-"):
+        feed_entry = scrapers.lookup_edustore_feed(url_edu, sku)
+
     # Implement smart caching: reuse data for SKU variants of the same base product
-    if last_prices and any(item in set(sku.split('-')) for item in set(last_prices["SKU"].split('-'))):
+    reuse_last_prices = bool(last_prices) and shares_sku_token(sku, last_prices["SKU"]) and _has_cached_values(last_prices, sources)
+    if reuse_last_prices:
         print(f"[{get_timestamp()}]     {Colors.YELLOW}Using cached prices for SKU group: {sku_first_block}{Colors.END}")
         
         # Reuse cached values for same SKU group (reduces API calls)
-        tasks.append(("Geizhals Preis", asyncio.create_task(asyncio.sleep(0.1, result=last_prices["Geizhals Preis"]))))
-        tasks.append(("Campuspoint Preis", asyncio.create_task(asyncio.sleep(0.1, result=last_prices["Campuspoint Preis"]))))
-        tasks.append(("Verfügbar", asyncio.create_task(asyncio.sleep(0.1, result=last_prices["Verfügbar"]))))
-        tasks.append(("edustore VK", retry_after_timeout(get_price_from_edustore, url_edu, semaphore)))
-        tasks.append(("INGRAM", asyncio.create_task(asyncio.sleep(0.1, result=last_prices["INGRAM"]))))
-        tasks.append(("ALSO", asyncio.create_task(asyncio.sleep(0.1, result=last_prices["ALSO"]))))
-        tasks.append(("TD Synnex", asyncio.create_task(asyncio.sleep(0.1, result=last_prices["TD Synnex"]))))
+        if "geizhals" in sources:
+            for key, value in last_prices.items():
+                if key.startswith("Geizhals "):
+                    start(key, asyncio.create_task(asyncio.sleep(0.1, result=value)))
+        if "campuspoint" in sources:
+            start("Campuspoint Preis", asyncio.create_task(asyncio.sleep(0.1, result=last_prices["Campuspoint Preis"])))
+        if "edustore" in sources:
+            start("Verfügbar", asyncio.create_task(asyncio.sleep(0.1, result=last_prices["Verfügbar"])))
+            if feed_entry is not None:
+                start("edustore VK", asyncio.create_task(asyncio.sleep(0.1, result=feed_entry["price"])))
+            else:
+                scrape("edustore VK", "edustore_price", url_edu, scrapers.get_price_from_edustore)
+        if "itscope" in sources:
+            for distributor_key in scrapers.get_distributors():
+                start(distributor_key, asyncio.create_task(asyncio.sleep(0.1, result=last_prices[distributor_key])))
             
     else:
         print(f"[{get_timestamp()}]     {Colors.YELLOW}Fetching new prices for SKU group: {sku_first_block}{Colors.END}")
         
-        # Scrape fresh data from all sources with rate limiting
-        if url_gh != "^":
-            tasks.append(("Geizhals Preis", retry_after_timeout(get_price_from_geizhals, url_gh, semaphore)))
-        else:
-            tasks.append(("Geizhals Preis", asyncio.create_task(asyncio.sleep(0.1, result="No valid URL"))))
+        # Scrape fresh data from all selected sources with rate limiting
+        if "geizhals" in sources:
+            if url_gh != "^":
+                scrape("Geizhals Preis", "geizhals", url_gh, scrapers.get_offers_from_geizhals)
+            else:
+                start("Geizhals Preis", asyncio.create_task(asyncio.sleep(0.1, result="No valid URL")))
         
-        # Stagger requests to avoid overwhelming servers
-        await asyncio.sleep(1)
+            # Stagger requests to avoid overwhelming servers
+            await asyncio.sleep(1)
         
-        if url_camp != "^":
-            tasks.append(("Campuspoint Preis", retry_after_timeout(get_price_from_campuspoint, url_camp, semaphore)))
-        else:
-            tasks.append(("Campuspoint Preis", asyncio.create_task(asyncio.sleep(0.1, result="No valid URL"))))
+        if "campuspoint" in sources:
+            # Prefer prices from the bulk listing crawl, fall back to the product page
+            listed_price = scrapers.lookup_campuspoint_listing(url_camp, sku) if url_camp not in ("^", "-") else None
+            if listed_price is not None:
+                start("Campuspoint Preis", asyncio.create_task(asyncio.sleep(0.1, result=listed_price)))
+            elif url_camp != "^":
+                scrape("Campuspoint Preis", "campuspoint", url_camp, scrapers.get_price_from_campuspoint)
+            else:
+                start("Campuspoint Preis", asyncio.create_task(asyncio.sleep(0.1, result="No valid URL")))
+
+            # Continue staggered scraping for remaining sources
+            await asyncio.sleep(1)
+
+        if "edustore" in sources:
+            # Our own shop's price and stock come from the catalog feed when possible
+            if feed_entry is not None:
+                start("edustore VK", asyncio.create_task(asyncio.sleep(0.1, result=feed_entry["price"])))
+                if feed_entry["availability"] is not None:
+                    start("Verfügbar", asyncio.create_task(asyncio.sleep(0.1, result=feed_entry["availability"])))
+                else:
+                    # The feed has no usable stock value for this product
+                    scrape("Verfügbar", "edustore_stock", url_edu, scrapers.get_stock_from_edustore)
+            elif url_edu != "^":
+                scrape("edustore VK", "edustore_price", url_edu, scrapers.get_price_from_edustore)
+                scrape("Verfügbar", "edustore_stock", url_edu, scrapers.get_stock_from_edustore)
+            else:
+                start("edustore VK", asyncio.create_task(asyncio.sleep(0.1, result="No valid URL")))
+                start("Verfügbar", asyncio.create_task(asyncio.sleep(0.1, result="No valid URL")))
+
+            await asyncio.sleep(1)
 
-        # Continue staggered scraping for remaining sources
-        await asyncio.sleep(1)
+        # Query ITScope B2B distributors for availability data, once per base SKU and run
+        if "itscope" in sources:
+            start("ITScope", flight.do("itscope", sku_first_block, _fetch_itscope, sku, sku_first_block))
 
-        if url_edu != "^":
-            tasks.append(("edustore VK", retry_after_timeout(get_price_from_edustore, url_edu, semaphore)))
-            tasks.append(("Verfügbar", retry_after_timeout(get_stock_from_edustore, url_edu, semaphore)))
+    # Wait for all data collection tasks, at most until the row deadline
+    if tasks:
+        _, pending = await asyncio.wait([task for _, task in tasks], timeout=deadline.remaining())
+        if pending:
+            # Row deadline reached: cancel the stragglers and wait until they have cleaned up
+            print(f"[{get_timestamp()}]     {Colors.RED}Row deadline reached for {sku}, cancelling {len(pending)} tasks{Colors.END}")
+            for task in pending:
+                task.cancel()
+            await asyncio.wait(pending)
+    
+    # Build structured prices dictionary from task results
+    prices = {}
+    notes = {}
+    for key, task in tasks:
+        result = _task_result(key, task)
+
+        note = None
+        if key in cached_urls:
+            # Scrapes cut off by their deadline or failed outside the cache fall back to the last good value as well
+            if is_failure_result(result):
+                result = cache.fallback(*cached_urls[key]) or result
+            note = result.note if isinstance(result, CachedResult) else ""
+            result = result.value if isinstance(result, CachedResult) else result
+
+        if key == "Geizhals Preis":
+            # Expand the Geizhals offer summary into its price and offer columns
+            columns = scrapers.geizhals_offer_columns(result)
+        elif key == "ITScope":
+            # Expand the ITScope availability into the distributor columns
+            if isinstance(result, dict):
+                columns = result
+            else:
+                columns = {distributor_key: result for distributor_key in scrapers.get_distributors()}
         else:
-            tasks.append(("edustore VK", asyncio.create_task(asyncio.sleep(0.1, result="No valid URL"))))
-            tasks.append(("Verfügbar", asyncio.create_task(asyncio.sleep(0.1, result="No valid URL"))))
+            columns = {key: result}
+
+        prices.update(columns)
+        if note is not None:
+            notes.update(dict.fromkeys(columns, note))
+
+    # Values reused for a SKU variant keep their age markers
+    if reuse_last_prices:
+        for key, note in last_prices.get(CELL_NOTES_KEY, {}).items():
+            if key in prices:
+                notes.setdefault(key, note)
+    if notes:
+        prices[CELL_NOTES_KEY] = notes
+    
+    return sku, prices
+
+
+def _source_of(key):
+    # Source whose budget applies to a result column
+    if key.startswith("Geizhals "):
+        return "geizhals"
+    if key.startswith("Campuspoint "):
+        return "campuspoint"
+    if key in ("edustore VK", "Verfügbar"):
+        return "edustore"
+    return "itscope"
 
-        await asyncio.sleep(1)
 
-        # Query ITScope B2B distributors for availability data
+async def _within_budget(source, awaitable, deadline):
+    # Await a source's result within its share of the row deadline, "Timeout" once it runs out
+    budget = deadline.child(source_budget(source))
+    with deadline_scope(budget):
         try:
-            print(f"[{get_timestamp()}]     {Colors.CYAN}Calling ITScope for SKU: {sku}{Colors.END}")
-            data = itclient.get_product_by_id(sku_first_block)
-            print(f"[{get_timestamp()}]     {Colors.CYAN}ITScope returned:\n {json.dumps(data, indent=4, ensure_ascii=False)}{Colors.END}")
+            return await asyncio.wait_for(awaitable, timeout=budget.remaining())
+        except asyncio.TimeoutError:
+            print(f"[{get_timestamp()}]     {Colors.RED}{source} deadline reached, marking as timed out{Colors.END}")
+            get_metrics().increment(f"deadlines.{source}.timeouts")
+            return TIMEOUT_RESULT
 
-            if data:
-                # Process availability data for each Austrian distributor
-                ingram_availability = get_availability_for_ingram(data)
-                print(f"[{get_timestamp()}]     {Colors.GREEN}Ingram availability result: {ingram_availability}{Colors.END}")
 
-                also_availability = get_availability_for_also(data)
-                print(f"[{get_timestamp()}]     {Colors.GREEN}ALSO availability result: {also_availability}{Colors.END}")
+def _task_result(key, task):
+    # Result of a finished task, cancelled tasks timed out with the row
+    if task.cancelled():
+        get_metrics().increment(f"deadlines.{_source_of(key)}.row_timeouts")
+        return TIMEOUT_RESULT
+    if task.exception() is not None:
+        print(f"[{get_timestamp()}]     {Colors.RED}Error collecting {key}: {task.exception()}{Colors.END}")
+        return f"Error: {type(task.exception()).__name__}"
+    return task.result()
 
-                tdsynnex_availability = get_availability_for_tdsynnex(data)
-                print(f"[{get_timestamp()}]     {Colors.GREEN}TD Synnex availability result: {tdsynnex_availability}{Colors.END}")
-            else:
-                print(f"[{get_timestamp()}]     {Colors.RED}ITScope returned empty data{Colors.END}")
-                ingram_availability = "no data"
-                also_availability = "no data"
-                tdsynnex_availability = "no data"
-                
-            # Add distributor availability data to task list
-            tasks.append(("INGRAM", asyncio.create_task(asyncio.sleep(0.1, result=ingram_availability))))
-            tasks.append(("ALSO", asyncio.create_task(asyncio.sleep(0.1, result=also_availability))))
-            tasks.append(("TD Synnex", asyncio.create_task(asyncio.sleep(0.1, result=tdsynnex_availability))))
-
-        except json.JSONDecodeError as e:
-            print(f"[{get_timestamp()}]     {Colors.RED}ITScope error for {sku}: No such product found.{Colors.END}")
-            tasks.append(("INGRAM", asyncio.create_task(asyncio.sleep(0.1, result="no such product"))))
-            tasks.append(("ALSO", asyncio.create_task(asyncio.sleep(0.1, result="no such product"))))
-            tasks.append(("TD Synnex", asyncio.create_task(asyncio.sleep(0.1, result="no such product"))))
-        except Exception as e:
-            print(f"[{get_timestamp()}]     {Colors.RED}ITScope error for {sku}: {e}{Colors.END}")
-            tasks.append(("INGRAM", asyncio.create_task(asyncio.sleep(0.1, result="error fetching data"))))
-            tasks.append(("ALSO", asyncio.create_task(asyncio.sleep(0.1, result="error fetching data"))))
-            tasks.append(("TD Synnex", asyncio.create_task(asyncio.sleep(0.1, result="error fetching data"))))
-
-    # Execute all data collection tasks concurrently
-    results = await asyncio.gather(*[task[1] for task in tasks])
+
+async def _fetch_itscope(sku, sku_first_block):
+    # Query ITScope once for the base SKU and return the availability of all distributors
+    try:
+        print(f"[{get_timestamp()}]     {Colors.CYAN}Calling ITScope for SKU: {sku}{Colors.END}")
+        itclient = scrapers.ITscopeClient()
+
+        # The request is blocking, so it runs in a worker thread with its timeout capped to the budget
+        deadline = current_deadline()
+        timeout = max(1.0, deadline.cap(20)) if deadline is not None else 20
+        data = await asyncio.to_thread(itclient.get_product_by_id, sku_first_block, timeout=timeout)
+        print(f"[{get_timestamp()}]     {Colors.CYAN}ITScope returned:\n {json.dumps(data, indent=4, ensure_ascii=False)}{Colors.END}")
+
+        if data:
+            # Process availability data for all configured distributors in one pass
+            availability = scrapers.get_availability_for_distributors(data)
+            for distributor_key, distributor_availability in availability.items():
+                print(f"[{get_timestamp()}]     {Colors.GREEN}{distributor_key} availability result: {distributor_availability}{Colors.END}")
+            return availability
+
+        print(f"[{get_timestamp()}]     {Colors.RED}ITScope returned empty data{Colors.END}")
+        return {distributor_key: "no data" for distributor_key in scrapers.get_distributors()}
+
+    except json.JSONDecodeError as e:
+        print(f"[{get_timestamp()}]     {Colors.RED}ITScope error for {sku}: No such product found.{Colors.END}")
+        return {distributor_key: "no such product" for distributor_key in scrapers.get_distributors()}
+    except Exception as e:
+        print(f"[{get_timestamp()}]     {Colors.RED}ITScope error for {sku}: {e}{Colors.END}")
+        return ITSCOPE_ERROR_RESULT
+
+
+def _has_cached_values(last_prices, sources):
+    # The SKU variant cache can only be used if it holds every selected source's columns, none timed out
+    required = []
+    if "geizhals" in sources:
+        required.append("Geizhals Preis")
+    if "campuspoint" in sources:
+        required.append("Campuspoint Preis")
+    if "edustore" in sources:
+        required.append("Verfügbar")
+    if "itscope" in sources:
+        required.extend(scrapers.get_distributors())
+    return all(last_prices.get(key, TIMEOUT_RESULT) != TIMEOUT_RESULT for key in required)
+
+
+def shares_sku_token(sku, other_sku):
+    """
+    Check whether two SKUs are variants of the same product.
     
-    # Build structured prices dictionary from task results
-    prices = {}
-    for i, (key, _) in enumerate(tasks):
-        prices[key] = results[i]
+    SKUs are split into hyphen-separated tokens; variants share at least
+    one token (e.g. "ABC123-DE" and "ABC123-AT").
     
-    return sku, prices
+    Args:
+        sku (str): SKU of the current row
+        other_sku (str): SKU of the previously processed row
+        
+    Returns:
+        bool: True if the SKUs share a token
+    """
+    return not set(sku.split('-')).isdisjoint(other_sku.split('-'))
+
+
+# Browser site and link column of the prefetched pages of a row
+_PREFETCH_COLUMNS = (("geizhals", "Geizhals link"), ("campuspoint", "Campuspoint link"), ("edustore", "edustore link"))
+
+
+def prefetch_upcoming_rows(rows, previous_sku, sources=SOURCES):
+    """
+    Start loading the product pages of upcoming rows in pooled browser tabs.
+    
+    Mirrors the source selection of process_sku(): rows that will reuse the
+    cached prices of a SKU variant, Campuspoint products found by the listing
+    crawl and edustore products found in the catalog feed (with a known
+    availability, unless the cached one is reused) are not prefetched.
+    The number of pages per site is bounded by the pool's concurrency limits.
+    
+    Args:
+        rows (list): Upcoming spreadsheet rows, in processing order
+        previous_sku (str): SKU of the row processed before the first upcoming row
+        sources (tuple): Sources selected for the run (default: all of SOURCES)
+        
+    Usage:
+        prefetch_upcoming_rows(records[index + 1:index + 1 + lookahead], row["SKU"])
+    """
+    pool = scrapers.get_browser_pool()
+    flight = get_single_flight()
+    cache = get_result_cache()
+
+    def needed(source, url):
+        # URLs fetched earlier in the run (or right now) are served by the coalescing group,
+        # fresh cached results are used without loading the page
+        return not flight.seen(source, url) and not (cache is not None and cache.fresh(source, url))
+
+    for row in rows:
+        sku = row["SKU"]
+        cached = bool(previous_sku) and shares_sku_token(sku, previous_sku)
+        previous_sku = sku
+
+        url_gh = row["Geizhals link"]
+        url_camp = row["Campuspoint link"]
+        url_edu = row["edustore link"]
+
+        if "geizhals" in sources and not cached and url_gh not in ("^", "-", "") and needed("geizhals", url_gh):
+            pool.prefetch("geizhals", url_gh)
+        if ("campuspoint" in sources and not cached and url_camp not in ("^", "-", "")
+                and scrapers.lookup_campuspoint_listing(url_camp, sku) is None and needed("campuspoint", url_camp)):
+            pool.prefetch("campuspoint", url_camp)
+        if "edustore" in sources and url_edu not in ("^", "-", ""):
+            feed_entry = scrapers.lookup_edustore_feed(url_edu, sku)
+            if feed_entry is None:
+                load = needed("edustore_price", url_edu)
+            else:
+                # Only the stock is scraped for feed products without a known availability
+                load = not cached and feed_entry["availability"] is None and needed("edustore_stock", url_edu)
+            if load:
+                pool.prefetch("edustore", url_edu)
+
+
+async def release_row_prefetches(row):
+    """
+    Close the prefetched pages of a finished row that its scrapers did not take.
+
+    Pages stay unused when a row timed out or failed before its page was
+    requested, or when results came from the result cache or an earlier
+    fetch of the same URL.
+
+    Args:
+        row (dict): Spreadsheet row that was just processed
+
+    Usage:
+        await release_row_prefetches(row)
+    """
+    pool = scrapers.get_browser_pool()
+    for site, header in _PREFETCH_COLUMNS:
+        url = row.get(header) or ""
+        if url not in ("^", "-", ""):
+            await pool.release_prefetched(site, url)
@@ -12,16 +12,28 @@ distribution platform used in Austria. It includes:
 
 The module handles complex stock status logic including real-time vs 
 non-real-time data, availability dates, and supplier-specific formatting.
+Distributors are configured in a table (ITSCOPE_DISTRIBUTORS setting).
 """
 
-from .client import ITscopeClient
-from .getters import get_availability_for_ingram, get_availability_for_also, get_availability_for_tdsynnex
+from utils.lazy import lazy_exports
+
+# The client (and requests) is only imported when an API call is made
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "ITscopeClient": ".client",
+    "get_availability_for_distributors": ".getters",
+    "get_distributors": ".getters",
+    "get_availability_for_ingram": ".getters",
+    "get_availability_for_also": ".getters",
+    "get_availability_for_tdsynnex": ".getters"
+})
 
 __all__ = [
     # API client
     "ITscopeClient",                    # Main API client for ITScope platform
     
     # Distributor availability parsers
+    "get_availability_for_distributors", # Single-pass parser for all configured distributors
+    "get_distributors",                 # Configured distributor table (column key -> supplier)
     "get_availability_for_ingram",      # Parses Ingram Micro stock data
     "get_availability_for_also",        # Parses ALSO Austria stock data
     "get_availability_for_tdsynnex"     # Parses TD SYNNEX Austria stock data
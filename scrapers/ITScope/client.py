@@ -4,11 +4,35 @@ ITScope B2B distributor platform API client module.
 Provides HTTP API client functionality for accessing ITScope's B2B technology
 distribution platform. Handles authentication, product lookups, and supplier
 data filtering for Austrian distributors (Ingram Micro, ALSO, TD SYNNEX).
+
+Responses are streamed and parsed incrementally (with the optional ijson
+package), keeping only the configured suppliers and the stock fields the
+availability parsers need, so memory and parse time do not grow with the
+number of suppliers ITScope lists for a product.
+
+With an open snapshot archive, raw responses are recorded (--record) or
+served from the archive instead of the API (--replay).
 """
 
+import io
+import json
 import requests
 from requests.auth import HTTPBasicAuth
+from utils import get_setting, get_snapshot_archive, span, SPAN_KIND_CLIENT
 from .itscope_config import *
+from .getters import get_distributors
+
+try:
+    import ijson
+except ImportError:  # Optional: fall back to parsing the full response
+    ijson = None
+
+# supplierStockInfo fields used by the availability parsers
+STOCK_INFO_FIELDS = ("stockStatus", "stockStatusText", "stockAvailabilityDate")
+
+# ijson prefixes of the product list and its supplier items
+_PRODUCT_PREFIX = "product.item"
+_SUPPLIER_ITEM_PREFIX = "product.item.supplierItems.item"
 
 class ITscopeClient:
     """
@@ -30,18 +54,20 @@ class ITscopeClient:
         self.auth = HTTPBasicAuth(ACCOUNT_ID, API_KEY)
         self.headers = {"User-Agent": USER_AGENT, "Accept": "application/json"}
 
-    def get_product_by_id(self, sku: str, developer: bool = True, realtime: bool = True) -> dict:
+    def get_product_by_id(self, sku: str, developer: bool = True, realtime: bool = True, timeout: float = 20) -> dict:
         """
         Retrieve product information and supplier stock data by SKU.
         
         Queries ITScope API for detailed product information including
         real-time stock levels from Austrian distributors. Filters results
-        to include only relevant suppliers for the Austrian market.
+        to include only relevant suppliers for the Austrian market while
+        the response is being streamed.
         
         Args:
             sku (str): Product SKU/part number to lookup
             developer (bool): Use developer format for detailed response (default: True)
             realtime (bool): Include real-time stock information (default: True)
+            timeout (float): Connect and read timeout in seconds (default: 20)
             
         Returns:
             list: Filtered supplier data for Ingram Micro, ALSO, and TD SYNNEX Austria
@@ -53,25 +79,92 @@ class ITscopeClient:
             client = ITscopeClient()
             data = client.get_product_by_id("ABC123")
         """
-        # Format API endpoint based on developer flag
-        return_format = "developer" if developer else "standard"
+        # Format API endpoint based on developer flag, ITSCOPE_RETURN_FORMAT selects a smaller format
+        return_format = get_setting("ITSCOPE_RETURN_FORMAT") or ("developer" if developer else "standard")
         url = f"{self.base}/products/search/hstpid={sku}/{return_format}.json"
-        
-        # Make authenticated API request with realtime parameter
-        ret = requests.get(url, params={"realtime": str(realtime).lower()},
-                         auth=self.auth, headers=self.headers, timeout=20)
-        ret.raise_for_status()
-        
-        # Parse JSON response
-        raw_data = ret.json()
-        
-        # Filter to only include relevant Austrian suppliers
-        filtered_json = self._get_suppliers(raw_data)
-        return filtered_json
+        params = {"realtime": str(realtime).lower()}
+
+        # Recorded responses are replayed without contacting the API
+        archive = get_snapshot_archive()
+        snapshot_url = f"{url}?realtime={params['realtime']}"
+        with span("itscope.request", SPAN_KIND_CLIENT, sku=sku, url=snapshot_url, timeout=float(timeout)) as current:
+            if archive is not None and archive.replaying:
+                data = archive.require("json", snapshot_url)
+                current.set(replayed=True, bytes=len(data))
+                return self._parse_response(io.BytesIO(data))
+
+            # Make authenticated, streamed API request with realtime parameter
+            with requests.get(url, params=params,
+                              auth=self.auth, headers=self.headers, timeout=timeout, stream=True) as ret:
+                current.set(status=ret.status_code)
+                ret.raise_for_status()
+
+                if archive is not None and archive.recording:
+                    # The complete response is needed for the archive, parse it from memory
+                    archive.put("json", snapshot_url, ret.content)
+                    current.set(bytes=len(ret.content))
+                    return self._parse_response(io.BytesIO(ret.content))
+
+                if ijson is None:
+                    # Parse JSON response and filter to relevant Austrian suppliers
+                    current.set(bytes=len(ret.content))
+                    return self._get_suppliers(json.loads(ret.content))
+
+                # Parse incrementally, only relevant suppliers are kept in memory
+                ret.raw.decode_content = True
+                suppliers = self._stream_suppliers(ret.raw)
+                # Bytes received until parsing stopped, the rest of the response is never read
+                current.set(bytes=ret.raw.tell())
+                return suppliers
+
+    def _parse_response(self, stream) -> list:
+        # Filter suppliers of a response held in a binary file object
+        if ijson is None:
+            return self._get_suppliers(json.load(stream))
+        return self._stream_suppliers(stream)
+
+    def _stream_suppliers(self, stream) -> list:
+        # Incremental equivalent of _get_suppliers() for a JSON byte stream
+        suppliers_to_keep = set(get_distributors().values())
+        filtered = []
+        products_seen = 0
+        builder = None
+
+        try:
+            for prefix, event, value in ijson.parse(stream):
+                if prefix == _PRODUCT_PREFIX:
+                    if event == "start_map":
+                        products_seen += 1
+                    elif event == "end_map":
+                        # Only the first product is used, skip the rest of the response
+                        break
+                    continue
+
+                if products_seen != 1:
+                    continue
+
+                # Build one supplier item at a time and keep it only if relevant
+                if builder is None:
+                    if prefix == _SUPPLIER_ITEM_PREFIX and event == "start_map":
+                        builder = ijson.ObjectBuilder()
+                        builder.event(event, value)
+                    continue
+
+                builder.event(event, value)
+                if prefix == _SUPPLIER_ITEM_PREFIX and event == "end_map":
+                    item = self._filter_supplier_item(builder.value, suppliers_to_keep)
+                    if item is not None:
+                        filtered.append(item)
+                    builder = None
+        except ijson.JSONError as e:
+            # Keep the json module's error type for callers ("no such product")
+            raise json.JSONDecodeError(str(e), "", 0) from e
+
+        return filtered
 
     def _get_suppliers(self, json_data: dict) -> list:
-        # Define Austrian B2B distributors to include in results
-        suppliers_to_keep = {"Ingram Micro Österreich", "TD SYNNEX Austria", "ALSO Österreich"}
+        # Austrian B2B distributors from the distributor table
+        suppliers_to_keep = set(get_distributors().values())
 
         # Handle empty or invalid response data
         if not json_data:
@@ -88,15 +181,24 @@ class ITscopeClient:
         # Filter suppliers and format response data
         filtered = []
         for item in supplier_items:
-            supplier = item.get("supplier", {})
-            name = supplier.get("name")
-            
-            # Only include relevant Austrian suppliers
-            if name in suppliers_to_keep:
-                filtered.append({
-                    "supplier_id": supplier.get("id"),
-                    "supplier_name": name,
-                    "supplierStockInfo": item.get("supplierStockInfo", [])
-                })
+            item = self._filter_supplier_item(item, suppliers_to_keep)
+            if item is not None:
+                filtered.append(item)
         
-        return filtered
\ No newline at end of file
+        return filtered
+
+    def _filter_supplier_item(self, item: dict, suppliers_to_keep: set):
+        # Only include relevant Austrian suppliers, trimmed to the fields in use
+        supplier = item.get("supplier", {})
+        name = supplier.get("name")
+        if name not in suppliers_to_keep:
+            return None
+
+        return {
+            "supplier_id": supplier.get("id"),
+            "supplier_name": name,
+            "supplierStockInfo": [
+                {field: info.get(field) for field in STOCK_INFO_FIELDS}
+                for info in item.get("supplierStockInfo", [])
+            ]
+        }
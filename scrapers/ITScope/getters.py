@@ -5,23 +5,49 @@ Provides specialized functions for extracting and formatting stock availability
 information from major Austrian B2B technology distributors through the ITScope
 platform. Handles complex stock status logic and date formatting for Ingram Micro,
 ALSO, and TD SYNNEX Austria.
+
+Distributors are described by a configurable table, and a single pass over
+the supplier items yields the availability of every distributor.
 """
 
 from datetime import datetime
+from utils import get_setting
 
-def get_availability_for_ingram(json_data) -> str:
+# Distributor table: sheet column key -> ITScope supplier name.
+# Override with ITSCOPE_DISTRIBUTORS in config.py to add distributors.
+DEFAULT_DISTRIBUTORS = {
+    "INGRAM": "Ingram Micro Österreich",
+    "ALSO": "ALSO Österreich",
+    "TD Synnex": "TD SYNNEX Austria"
+}
+
+def get_distributors() -> dict:
     """
-    Extract stock availability information for Ingram Micro Österreich.
+    Return the configured distributor table.
+    
+    Returns:
+        dict: Mapping of sheet column keys to ITScope supplier names
+        
+    Usage:
+        for column_key, supplier_name in get_distributors().items(): ...
+    """
+    return get_setting("ITSCOPE_DISTRIBUTORS", DEFAULT_DISTRIBUTORS)
+
+def get_availability_for_distributors(json_data, distributors=None) -> dict:
+    """
+    Extract stock availability for all configured distributors in one pass.
     
-    Processes ITScope API response data to determine current stock status
-    and availability dates for Ingram Micro Austria. Handles multiple stock
-    status codes and fallback logic for real-time vs. cached information.
+    Walks the supplier items once and applies the stock status rules to
+    every distributor in the table. Stops early as soon as every distributor
+    has a final result.
     
     Args:
         json_data (list): Filtered supplier data from ITScope API
+        distributors (dict, optional): Column key -> supplier name table,
+            defaults to get_distributors()
         
     Returns:
-        str: Stock status text or formatted availability date, 'no data' if unavailable
+        dict: Availability text per column key, 'no data' if unavailable
         
     Stock Status Codes:
         1: Available
@@ -30,53 +56,51 @@ def get_availability_for_ingram(json_data) -> str:
         Other: Specific availability date
         
     Usage:
-        availability = get_availability_for_ingram(supplier_data)
+        availability = get_availability_for_distributors(supplier_data)
+        ingram = availability["INGRAM"]
     """
-    ret = 'no data'
+    distributors = distributors if distributors is not None else get_distributors()
+    keys_by_name = {name: key for key, name in distributors.items()}
+
+    results = {key: 'no data' for key in distributors}
+    open_keys = set(distributors)
 
-    # Search for Ingram Micro supplier data
     for item in json_data:
-        if item['supplier_name'] == 'Ingram Micro Österreich':
-            stock_info = item['supplierStockInfo']
-            
-            # Validate stock_info structure - need at least 2 entries
-            if not stock_info or len(stock_info) < 2:
-                continue
-
-            # Skip invalid combinations (status 6 + 8)
-            if stock_info[0]['stockStatus'] == "6" and stock_info[1]['stockStatus'] == "8":
-                ret = stock_info[0]['stockStatusText']
-                continue
-
-            # Check real-time stock status first (index 1)
-            if stock_info[1]['stockStatus'] in ("1", "6"):
-                ret = stock_info[1]['stockStatusText']
-                return ret
-
-            # Handle specific availability dates for non-standard statuses
-            if stock_info[1]['stockStatus'] not in ("1", "6", "8"):
-                ret = _format_date(stock_info[1]['stockAvailabilityDate'])
-                return ret
-
-            # Fallback to cached data when real-time is unknown (status 8)
-            elif stock_info[1]['stockStatus'] == "8":
-                # Use cached data (index 0) for fallback information
-                if stock_info[0]['stockStatus'] in ("1", "8"):
-                    ret = stock_info[0]['stockStatusText']
-                    return ret
-                ret = _format_date(stock_info[0]['stockAvailabilityDate'])
-                return ret
+        key = keys_by_name.get(item['supplier_name'])
+        if key not in open_keys:
+            continue
+
+        value, final = _evaluate_stock_info(item['supplierStockInfo'])
+        if value is None:
+            continue
+
+        results[key] = value
+        if final:
+            open_keys.discard(key)
+            if not open_keys:
+                break
+
+    return results
+
+def get_availability_for_ingram(json_data) -> str:
+    """
+    Extract stock availability information for Ingram Micro Österreich.
     
-    return ret
+    Args:
+        json_data (list): Filtered supplier data from ITScope API
+        
+    Returns:
+        str: Stock status text or formatted availability date, 'no data' if unavailable
+        
+    Usage:
+        availability = get_availability_for_ingram(supplier_data)
+    """
+    return get_availability_for_distributors(json_data, {"INGRAM": DEFAULT_DISTRIBUTORS["INGRAM"]})["INGRAM"]
 
 def get_availability_for_also (json_data) -> str:
     """
     Extract stock availability information for ALSO Österreich.
     
-    Processes ITScope API response data to determine current stock status
-    and availability dates for ALSO Austria. Implements similar logic to
-    Ingram Micro with distributor-specific handling.
-    
     Args:
         json_data (list): Filtered supplier data from ITScope API
         
@@ -86,52 +110,12 @@ def get_availability_for_also (json_data) -> str:
     Usage:
         availability = get_availability_for_also(supplier_data)
     """
-    ret = 'no data'
-
-    # Search for ALSO supplier data
-    for item in json_data:
-        if item['supplier_name'] == 'ALSO Österreich':
-            stock_info = item['supplierStockInfo']
-            
-            # Validate stock_info structure - need at least 2 entries
-            if not stock_info or len(stock_info) < 2:
-                continue
-
-            # Skip invalid combinations (status 6 + 8)
-            if stock_info[0]['stockStatus'] == "6" and stock_info[1]['stockStatus'] == "8":
-                ret = stock_info[0]['stockStatusText']
-                continue
-
-            # Check real-time stock status first (index 1)
-            if stock_info[1]['stockStatus'] in ("1", "6"):
-                ret = stock_info[1]['stockStatusText']
-                return ret
-
-            # Handle specific availability dates for non-standard statuses
-            if stock_info[1]['stockStatus'] not in ("1", "6", "8"):
-                ret = _format_date(stock_info[1]['stockAvailabilityDate'])
-                return ret
-
-            # Fallback to cached data when real-time is unknown (status 8)
-            elif stock_info[1]['stockStatus'] == "8":
-                # Use cached data (index 0) for fallback information
-                if stock_info[0]['stockStatus'] in ("1", "8"):
-                    ret = stock_info[0]['stockStatusText']
-                    return ret
-
-                ret = _format_date(stock_info[0]['stockAvailabilityDate'])
-                return ret
-    
-    return ret
+    return get_availability_for_distributors(json_data, {"ALSO": DEFAULT_DISTRIBUTORS["ALSO"]})["ALSO"]
 
 def get_availability_for_tdsynnex(json_data) -> str:
     """
     Extract stock availability information for TD SYNNEX Austria.
     
-    Processes ITScope API response data to determine current stock status
-    and availability dates for TD SYNNEX Austria. Follows the same logic
-    pattern as other distributors with TD SYNNEX-specific handling.
-    
     Args:
         json_data (list): Filtered supplier data from ITScope API
         
@@ -141,42 +125,41 @@ def get_availability_for_tdsynnex(json_data) -> str:
     Usage:
         availability = get_availability_for_tdsynnex(supplier_data)
     """
-    ret = 'no data'
+    return get_availability_for_distributors(json_data, {"TD Synnex": DEFAULT_DISTRIBUTORS["TD Synnex"]})["TD Synnex"]
 
-    # Search for TD SYNNEX supplier data
-    for item in json_data:
-        if item['supplier_name'] == 'TD SYNNEX Austria':
-            stock_info = item['supplierStockInfo']
-            
-            # Validate stock_info structure - need at least 2 entries
-            if not stock_info or len(stock_info) < 2:
-                continue
-
-            # Skip invalid combinations (status 6 + 8)
-            if stock_info[0]['stockStatus'] == "6" and stock_info[1]['stockStatus'] == "8":
-                ret = stock_info[0]['stockStatusText']
-                continue
-
-            # Check real-time stock status first (index 1)
-            if stock_info[1]['stockStatus'] in ("1", "6"):
-                ret = stock_info[1]['stockStatusText']
-                return ret
-
-            # Handle specific availability dates for non-standard statuses
-            if stock_info[1]['stockStatus'] not in ("1", "6", "8"):
-                ret = _format_date(stock_info[1]['stockAvailabilityDate'])
-                return ret
-
-            # Fallback to cached data when real-time is unknown (status 8)
-            elif stock_info[1]['stockStatus'] == "8":
-                # Use cached data (index 0) for fallback information
-                if stock_info[0]['stockStatus'] in ("1", "8"):
-                    ret = stock_info[0]['stockStatusText']
-                    return ret
-                ret = _format_date(stock_info[0]['stockAvailabilityDate'])
-                return ret
+def _evaluate_stock_info(stock_info) -> tuple:
+    """
+    Apply the stock status rules to one supplier item.
     
-    return ret
+    Args:
+        stock_info (list): supplierStockInfo entries (cached at index 0, real-time at index 1)
+        
+    Returns:
+        tuple: (availability text or None if the entry is invalid, True if the result is final)
+    """
+    # Validate stock_info structure - need at least 2 entries
+    if not stock_info or len(stock_info) < 2:
+        return None, False
+
+    cached_status = stock_info[0]['stockStatus']
+    realtime_status = stock_info[1]['stockStatus']
+
+    # Invalid combination (status 6 + 8): remember cached text but keep searching
+    if cached_status == "6" and realtime_status == "8":
+        return stock_info[0]['stockStatusText'], False
+
+    # Check real-time stock status first (index 1)
+    if realtime_status in ("1", "6"):
+        return stock_info[1]['stockStatusText'], True
+
+    # Handle specific availability dates for non-standard statuses
+    if realtime_status != "8":
+        return _format_date(stock_info[1]['stockAvailabilityDate']), True
+
+    # Fallback to cached data when real-time is unknown (status 8)
+    if cached_status in ("1", "8"):
+        return stock_info[0]['stockStatusText'], True
+    return _format_date(stock_info[0]['stockAvailabilityDate']), True
 
 def _format_date(date: str) -> str:
     """
@@ -5,26 +5,63 @@ This package provides web scrapers for various Austrian e-commerce platforms:
 - Geizhals: Price comparison platform scraper
 - Campuspoint: Educational technology retailer scraper  
 - edustore: Educational products retailer scraper with price and stock checking
+- edustore feed: Bulk catalog feed ingestion for our own edustore products
 - ITScope: B2B technology distributor API client and availability parsers
 
 All scrapers are designed to work asynchronously with proper error handling
-and rate limiting through semaphores.
+and rate limiting through semaphores. Browser based scrapers share one
+Chromium instance through the browser pool. Exports are loaded lazily.
 """
 
-from .geizhals import get_price_from_geizhals
-from .campuspoint import get_price_from_campuspoint
-from .edustore import get_price_from_edustore, get_stock_from_edustore
-from .ITScope import *
+from utils.lazy import lazy_exports
+
+# Submodules are imported on first use, so runs without browser scrapers never load Playwright
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "BrowserPool": ".browser",
+    "get_browser_pool": ".browser",
+    "wait_for_outcome": ".browser",
+    "EMPTY_PAGE": ".browser",
+    "get_price_from_geizhals": ".geizhals",
+    "get_offers_from_geizhals": ".geizhals",
+    "geizhals_offer_columns": ".geizhals",
+    "get_price_from_campuspoint": ".campuspoint",
+    "load_campuspoint_listings": ".campuspoint",
+    "lookup_campuspoint_listing": ".campuspoint",
+    "get_price_from_edustore": ".edustore",
+    "get_stock_from_edustore": ".edustore",
+    "load_edustore_feed": ".edustore_feed",
+    "lookup_edustore_feed": ".edustore_feed",
+    "ITscopeClient": ".ITScope",
+    "get_availability_for_distributors": ".ITScope",
+    "get_distributors": ".ITScope",
+    "get_availability_for_ingram": ".ITScope",
+    "get_availability_for_also": ".ITScope",
+    "get_availability_for_tdsynnex": ".ITScope"
+})
 
 __all__ = [
+    # Shared browser
+    "BrowserPool",                      # Shared Chromium with persistent per-site contexts
+    "get_browser_pool",                 # Returns the process-wide browser pool
+    "wait_for_outcome",                 # Races terminal page states in one in-page call
+    "EMPTY_PAGE",                       # Outcome of pages that loaded without any text
+
     # E-commerce site scrapers
     "get_price_from_geizhals",          # Async price scraper for Geizhals.at
+    "get_offers_from_geizhals",         # Async full offer-list scraper for Geizhals.at
+    "geizhals_offer_columns",           # Converts Geizhals offer summaries to sheet columns
     "get_price_from_campuspoint",       # Async price scraper for Campuspoint
+    "load_campuspoint_listings",        # Async bulk crawler for Campuspoint listing pages
+    "lookup_campuspoint_listing",       # Looks up prices found by the listing crawler
     "get_price_from_edustore",          # Async price scraper for edustore
     "get_stock_from_edustore",          # Async stock availability checker for edustore
+    "load_edustore_feed",               # Loads and indexes the edustore catalog feed
+    "lookup_edustore_feed",             # Looks up price and stock in the edustore feed
     
     # ITScope B2B distributor integration
     "ITscopeClient",                    # API client for ITScope distributor platform
+    "get_availability_for_distributors", # Single-pass availability parser for all distributors
+    "get_distributors",                 # Configured ITScope distributor table
     "get_availability_for_ingram",      # Availability parser for Ingram Micro Austria
     "get_availability_for_also",        # Availability parser for ALSO Austria  
     "get_availability_for_tdsynnex"     # Availability parser for TD SYNNEX Austria
@@ -0,0 +1,653 @@
+"""
+Shared browser pool for the Playwright based scrapers.
+
+Keeps one Chromium instance for the whole run and one browser context per
+site instead of launching a fresh browser for every scrape. Each site
+context:
+- Reuses persisted storage state (cookies and localStorage) between runs
+- Uses a stable header identity (user agent, language) for the session
+- Runs a one-time cookie consent step at pool start if no state exists yet
+
+Pages therefore load without cookie banners and consent scripts, and return
+visits look like the same browser instead of a new visitor every time.
+
+The pool can also prefetch pages: upcoming rows' URLs are opened in pooled
+tabs while the current row is still being processed, so their network time
+overlaps with work already in progress. Concurrent navigations per site,
+including prefetches, are bounded by the HOST_CONCURRENCY setting. Pages a
+row's scrapers did not take (e.g. results served from a cache, or the row
+timed out) are closed once the row is done.
+
+With an open snapshot archive (--record / --replay), the rendered HTML of
+every page is recorded when the scraper is done with it, or served from the
+archive with all other network requests blocked.
+
+The pool also keeps the long-lived browser healthy:
+- A site context is recycled after CONTEXT_MAX_NAVIGATIONS navigations
+- The whole browser is recycled once the Chromium processes use more than
+  BROWSER_MAX_RSS_MB of memory, checked every BROWSER_HEALTH_INTERVAL
+  navigations
+- Crashed or disconnected browsers are relaunched on the next page request,
+  crashed tabs make their site context recycle
+Recycled contexts and browsers are closed once their last open page is
+closed, so scrapes in progress are not interrupted. Recycles, crashes and
+the memory use are reported in the run metrics under "browser".
+
+Scrapers wait for the first terminal state of a loaded page (price shown,
+not-available banner, 404 page, ...) with wait_for_outcome(), which checks
+all state selectors in one in-page call instead of one round trip each.
+"""
+
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from utils import Colors, get_timestamp, get_session_headers, get_setting, get_metrics, normalize_url, get_snapshot_archive, page_timeout, span, current_span, SPAN_KIND_CLIENT
+
+try:
+    import psutil
+except ImportError:  # Optional: fall back to reading /proc
+    psutil = None
+
+# Start page per site, visited once to accept cookie consent
+SITE_HOMEPAGES = {
+    "geizhals": "https://geizhals.at/",
+    "campuspoint": "https://www.campuspoint.de/",
+    "edustore": "https://www.edustore.at/"
+}
+
+# Consent buttons per site, tried in order until one is clicked
+CONSENT_SELECTORS = {
+    "geizhals": ["#onetrust-accept-btn-handler", "button:has-text('Alle akzeptieren')", "button:has-text('Akzeptieren')"],
+    "campuspoint": ["#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll", "button:has-text('Alle akzeptieren')"],
+    "edustore": ["#btn-cookie-allow", "button.amgdprcookie-button.-allow", "button:has-text('Alle akzeptieren')"]
+}
+
+# Outcome of wait_for_outcome() for pages that finished loading without any text
+EMPTY_PAGE = "empty"
+
+# Interval in milliseconds at which wait_for_outcome() checks the page
+_OUTCOME_POLLING = 50
+
+# Returns [name, text] of the first outcome with a visible element, "empty" for loaded blank pages, null otherwise
+_OUTCOME_SCRIPT = """
+([outcomes, emptyPage]) => {
+    for (const [name, selector] of outcomes) {
+        for (const element of document.querySelectorAll(selector)) {
+            if (element.getClientRects().length) {
+                return [name, (element.innerText || element.textContent || "").trim()];
+            }
+        }
+    }
+    if (document.readyState === "complete" && !(document.body && document.body.innerText.trim())) {
+        return [emptyPage, ""];
+    }
+    return null;
+}
+"""
+
+class BrowserPool:
+    """
+    One shared Chromium browser with a persistent context per site.
+
+    Attributes:
+        state_dir (str): Directory holding the storage state file of each site
+        headless (bool): Run Chromium without a visible window
+    """
+
+    def __init__(self, state_dir=None, headless=True):
+        """Create an idle pool, the browser is launched by start() or on first use."""
+        self.state_dir = state_dir or get_setting("BROWSER_STATE_DIR", ".browser_state")
+        self.headless = headless
+        self._playwright = None
+        self._browser = None
+        self._contexts = {}
+        self._site_slots = {}
+        self._prefetched = {}
+        self._lock = asyncio.Lock()
+
+        # Health state: navigations per site context, open pages per context,
+        # contexts waiting for their last page before they are closed
+        self._navigations = {}
+        self._total_navigations = 0
+        self._open_pages = {}
+        self._retiring = set()
+        self._crashed_sites = set()
+
+    async def start(self, sites=None):
+        """
+        Launch the browser and run the consent step for new sites.
+
+        Args:
+            sites (iterable, optional): Sites to prepare, defaults to all known sites
+
+        Usage:
+            pool = get_browser_pool()
+            await pool.start()
+        """
+        await self._ensure_browser()
+
+        # Replayed pages come from the archive, consent is part of the recorded HTML
+        if _replaying():
+            return
+
+        for site in (sites or SITE_HOMEPAGES):
+            if not os.path.exists(self._state_path(site)):
+                await self._accept_consent(site)
+
+    async def close(self):
+        """Persist the storage state of all sites and shut down the browser."""
+        await self.discard_prefetched()
+
+        async with self._lock:
+            await self.save_state()
+            for context in list(self._contexts.values()) + list(self._retiring):
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            self._contexts.clear()
+            self._retiring.clear()
+            self._open_pages.clear()
+
+            # Cleared first, so the disconnect is not taken for a crash
+            browser, self._browser = self._browser, None
+            if browser is not None:
+                await browser.close()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    async def save_state(self):
+        """Write cookies and localStorage of every open site context to disk."""
+        if not self._contexts or _replaying():
+            return
+
+        for site, context in self._contexts.items():
+            await self._save_context_state(site, context)
+
+    async def context(self, site):
+        """
+        Return the browser context of a site, creating it on first use.
+
+        Args:
+            site (str): Site name, e.g. "geizhals"
+
+        Returns:
+            playwright.async_api.BrowserContext: Context with the site's stored state
+        """
+        await self._ensure_browser()
+
+        async with self._lock:
+            if site not in self._contexts:
+                headers = get_session_headers(site)
+                user_agent = headers.pop("User-Agent")
+                state_path = self._state_path(site)
+
+                if _replaying():
+                    # Serve documents from the snapshot archive, nothing reaches the network
+                    context = await self._browser.new_context(user_agent=user_agent)
+                    await context.route("**/*", _replay_route)
+                else:
+                    context = await self._browser.new_context(
+                        user_agent=user_agent,
+                        extra_http_headers=headers,
+                        storage_state=state_path if os.path.exists(state_path) else None
+                    )
+                self._contexts[site] = context
+            return self._contexts[site]
+
+    @asynccontextmanager
+    async def page(self, site, url=None, timeout=10000):
+        """
+        Open a page in the site's context and optionally navigate to a URL.
+
+        If the URL was prefetched, the already loaded (or still loading)
+        page is handed out instead of navigating again.
+
+        Args:
+            site (str): Site name, e.g. "geizhals"
+            url (str, optional): URL to load before the page is handed out
+            timeout (int): Navigation timeout in milliseconds (default: 10000),
+                capped to the remaining time of the current row deadline
+
+        Yields:
+            playwright.async_api.Page: Page, closed again when the block exits
+
+        Usage:
+            async with get_browser_pool().page("geizhals", url) as page:
+                html = await page.content()
+        """
+        with span("browser.page", SPAN_KIND_CLIENT, site=site, url=url) as current:
+            page = await self._take_prefetched(site, url) if url else None
+            current.set(prefetched=page is not None)
+            try:
+                if page is None:
+                    page = await self._new_page(site)
+                    if url:
+                        async with self._site_slot(site):
+                            response = await page.goto(url, timeout=page_timeout(timeout), referer=url)
+                        current.set(status=response.status if response is not None else None)
+                        await self._after_navigation(site)
+                yield page
+
+                # Record the page as the scraper saw it, only if the scrape block succeeded
+                if url:
+                    await record_page(url, page)
+            finally:
+                if page is not None:
+                    await self._close_page(page)
+
+    def prefetch(self, site, url, timeout=10000):
+        """
+        Start loading a URL in a pooled tab ahead of its scrape.
+
+        Does nothing if the URL is already prefetched or the site already
+        has as many prefetches loading as its concurrency limit allows.
+        Loaded pages no longer count against the limit; pages nobody takes
+        have to be closed with release_prefetched().
+
+        Args:
+            site (str): Site name, e.g. "geizhals"
+            url (str): URL the scraper will request later
+            timeout (int): Navigation timeout in milliseconds (default: 10000)
+
+        Returns:
+            bool: True if a prefetch was started
+
+        Usage:
+            pool.prefetch("geizhals", next_row_url)
+        """
+        key = (site, normalize_url(url))
+        if key in self._prefetched:
+            return False
+
+        loading = sum(1 for (prefetched_site, _), task in self._prefetched.items()
+                      if prefetched_site == site and not task.done())
+        if loading >= self._site_limit(site):
+            return False
+
+        self._prefetched[key] = asyncio.create_task(self._prefetch_page(site, url, timeout))
+        return True
+
+    async def release_prefetched(self, site, url):
+        """
+        Close the prefetched page of a URL if nobody took it.
+
+        A prefetch still loading is cancelled. Called once a row is done,
+        so its unused prefetches do not keep tabs, contexts and navigation
+        slots for the rest of the run.
+
+        Args:
+            site (str): Site name, e.g. "geizhals"
+            url (str): URL the page was prefetched for
+        """
+        task = self._prefetched.pop((site, normalize_url(url)), None)
+        if task is not None:
+            get_metrics().increment(f"browser.prefetch_unused.{site}")
+            await self._discard_prefetch(task)
+
+    async def discard_prefetched(self):
+        """Cancel pending prefetches and close prefetched pages nobody used."""
+        tasks = list(self._prefetched.values())
+        self._prefetched.clear()
+
+        for task in tasks:
+            await self._discard_prefetch(task)
+
+    async def _discard_prefetch(self, task):
+        if not task.done():
+            task.cancel()
+        try:
+            page = await task
+            await self._close_page(page)
+        except BaseException:
+            pass
+
+    async def _prefetch_page(self, site, url, timeout):
+        page = await self._new_page(site)
+        try:
+            async with self._site_slot(site):
+                await page.goto(url, timeout=timeout, referer=url)
+        except BaseException:
+            await self._close_page(page)
+            raise
+        await self._after_navigation(site)
+        return page
+
+    async def _new_page(self, site):
+        # Open a tab in the site's context, replacing the context first if one of its tabs crashed
+        if site in self._crashed_sites:
+            self._crashed_sites.discard(site)
+            await self._recycle_context(site, "tab crashed")
+
+        context = await self.context(site)
+        page = await context.new_page()
+        self._open_pages[context] = self._open_pages.get(context, 0) + 1
+        page.on("crash", lambda _page, site=site: self._on_page_crash(site))
+        return page
+
+    async def _close_page(self, page):
+        # Close a tab; a retired context is closed together with its last tab
+        context = page.context
+        try:
+            await page.close()
+        except Exception:
+            pass  # Tab of a crashed or already closed browser
+
+        if context in self._open_pages:
+            self._open_pages[context] -= 1
+            if self._open_pages[context] <= 0:
+                del self._open_pages[context]
+                if context in self._retiring:
+                    await self._close_context(context)
+
+    async def _after_navigation(self, site):
+        # Count the navigation and recycle the context or browser once a limit is exceeded
+        self._navigations[site] = self._navigations.get(site, 0) + 1
+        self._total_navigations += 1
+        get_metrics().increment("browser.navigations")
+
+        if self._navigations[site] >= get_setting("CONTEXT_MAX_NAVIGATIONS", 250):
+            await self._recycle_context(site, f"{self._navigations[site]} navigations")
+
+        if self._total_navigations % get_setting("BROWSER_HEALTH_INTERVAL", 25) == 0:
+            rss = await asyncio.to_thread(chromium_rss)
+            if rss is None:
+                return
+
+            rss_mb = rss / (1024 * 1024)
+            metrics = get_metrics()
+            metrics.set("browser.rss_mb", round(rss_mb, 1))
+            metrics.set("browser.rss_mb_peak", max(metrics.get("browser.rss_mb_peak"), round(rss_mb, 1)))
+            if rss_mb > get_setting("BROWSER_MAX_RSS_MB", 1536):
+                await self._recycle_browser(f"{rss_mb:.0f} MB RSS")
+
+    async def _recycle_context(self, site, reason):
+        # Replace a site's context, the old one is closed once its open tabs are done
+        async with self._lock:
+            context = self._contexts.pop(site, None)
+            self._navigations.pop(site, None)
+        if context is None:
+            return
+
+        print(f"[{get_timestamp()}]     {Colors.YELLOW}Recycling {site} browser context ({reason}){Colors.END}")
+        get_metrics().increment("browser.context_recycles")
+        if not _replaying():
+            await self._save_context_state(site, context)
+        await self._retire(context)
+
+    async def _recycle_browser(self, reason):
+        # Launch a fresh browser for new pages, the old one is closed once its open tabs are done
+        async with self._lock:
+            browser, self._browser = self._browser, None
+            contexts = dict(self._contexts)
+            self._contexts.clear()
+            self._navigations.clear()
+        if browser is None:
+            return
+
+        print(f"[{get_timestamp()}] {Colors.YELLOW}Recycling browser ({reason}){Colors.END}")
+        get_metrics().increment("browser.recycles")
+        for site, context in contexts.items():
+            if not _replaying():
+                await self._save_context_state(site, context)
+            await self._retire(context)
+
+        if not browser.contexts:
+            await _close_quietly(browser)
+
+    async def _retire(self, context):
+        self._retiring.add(context)
+        if not self._open_pages.get(context):
+            await self._close_context(context)
+
+    async def _close_context(self, context):
+        self._retiring.discard(context)
+        browser = context.browser
+        await _close_quietly(context)
+
+        # A recycled browser goes away with its last context
+        if browser is not None and browser is not self._browser and not browser.contexts:
+            await _close_quietly(browser)
+
+    async def _save_context_state(self, site, context):
+        os.makedirs(self.state_dir, exist_ok=True)
+        try:
+            await context.storage_state(path=self._state_path(site))
+        except Exception as e:
+            print(f"[{get_timestamp()}] {Colors.RED}Error saving browser state for {site}: {e}{Colors.END}")
+
+    def _on_page_crash(self, site):
+        print(f"[{get_timestamp()}]     {Colors.RED}Browser tab for {site} crashed{Colors.END}")
+        get_metrics().increment("browser.page_crashes")
+        self._crashed_sites.add(site)
+
+    def _on_disconnected(self, browser):
+        # Recycled and closed browsers are no longer the pool's browser, only a crash gets here
+        if browser is not self._browser:
+            return
+
+        print(f"[{get_timestamp()}] {Colors.RED}Browser disconnected, relaunching on next use{Colors.END}")
+        get_metrics().increment("browser.crashes")
+        self._browser = None
+        self._contexts.clear()
+        self._navigations.clear()
+        self._open_pages.clear()
+        self._retiring.clear()
+
+    async def _take_prefetched(self, site, url):
+        # Hand out a prefetched page, waiting for it if it is still loading
+        task = self._prefetched.pop((site, normalize_url(url)), None)
+        if task is None:
+            return None
+
+        try:
+            return await task
+        except Exception as e:
+            print(f"[{get_timestamp()}]     {Colors.YELLOW}Prefetch of {url} failed, loading again: {type(e).__name__}{Colors.END}")
+            return None
+
+    def _site_limit(self, site):
+        limit = get_setting("HOST_CONCURRENCY", 2)
+        if isinstance(limit, dict):
+            return limit.get(site, 2)
+        return limit
+
+    def _site_slot(self, site):
+        # Semaphore bounding concurrent navigations (including prefetches) per site
+        if site not in self._site_slots:
+            self._site_slots[site] = asyncio.Semaphore(self._site_limit(site))
+        return self._site_slots[site]
+
+    async def _ensure_browser(self):
+        async with self._lock:
+            if self._browser is not None and not self._browser.is_connected():
+                # Disconnected without the event reaching us
+                self._on_disconnected(self._browser)
+
+            if self._browser is None:
+                if self._playwright is None:
+                    # Imported here so that closing an unused pool never loads Playwright
+                    from playwright.async_api import async_playwright
+
+                    self._playwright = await async_playwright().start()
+
+                browser = await self._playwright.chromium.launch(headless=self.headless)
+                browser.on("disconnected", self._on_disconnected)
+                self._browser = browser
+                print(f"[{get_timestamp()}] {Colors.YELLOW}Browser pool started{Colors.END}")
+
+    async def _accept_consent(self, site):
+        # Visit the site once, click the first matching consent button and store the result
+        homepage = SITE_HOMEPAGES.get(site)
+        if not homepage:
+            return
+
+        try:
+            async with self.page(site, homepage, timeout=15000) as page:
+                for selector in get_setting("CONSENT_SELECTORS", CONSENT_SELECTORS).get(site, []):
+                    try:
+                        await page.click(selector, timeout=3000)
+                        await page.wait_for_load_state("networkidle", timeout=5000)
+                        print(f"[{get_timestamp()}] {Colors.GREEN}Accepted cookie consent for {site}{Colors.END}")
+                        break
+                    except Exception:
+                        continue
+
+            os.makedirs(self.state_dir, exist_ok=True)
+            await self._contexts[site].storage_state(path=self._state_path(site))
+        except Exception as e:
+            print(f"[{get_timestamp()}] {Colors.RED}Consent step failed for {site}: {e}{Colors.END}")
+
+    def _state_path(self, site):
+        return os.path.join(self.state_dir, f"{site}.json")
+
+
+async def record_page(url, page):
+    """
+    Store the rendered HTML of a page in the snapshot archive (--record).
+
+    Args:
+        url (str): URL the page was requested with
+        page (playwright.async_api.Page): Loaded page
+    """
+    archive = get_snapshot_archive()
+    if archive is not None and archive.recording:
+        archive.put("html", url, await page.content())
+
+
+async def wait_for_outcome(page, outcomes, timeout=10000):
+    """
+    Wait until the first of several terminal page states appears.
+
+    All selectors are evaluated together in a single in-page function,
+    polled every 50 ms, so an unavailable or removed product returns as
+    soon as its banner shows instead of after the price selector's timeout.
+    The outcome is added to the current span as "page_state".
+
+    Args:
+        page (playwright.async_api.Page): Loaded page
+        outcomes (dict): Outcome name -> CSS selector, in priority order; the
+            first outcome with a visible matching element wins
+        timeout (int): Timeout in milliseconds (default: 10000), capped to
+            the remaining time of the current row deadline
+
+    Returns:
+        tuple: (outcome name, inner text of the matched element), or
+        (EMPTY_PAGE, "") for pages that finished loading without any text
+
+    Raises:
+        playwright.async_api.TimeoutError: If no outcome appears in time
+
+    Usage:
+        state, text = await wait_for_outcome(page, {"price": ".price", "not_found": "body.cms-noroute-index"})
+    """
+    handle = await page.wait_for_function(
+        _OUTCOME_SCRIPT, arg=[list(outcomes.items()), EMPTY_PAGE],
+        timeout=page_timeout(timeout), polling=_OUTCOME_POLLING
+    )
+    state, text = await handle.json_value()
+    current_span().set(page_state=state)
+    return state, text
+
+
+def chromium_rss():
+    """
+    Return the memory used by the Chromium processes of this process.
+
+    Sums the resident set size of all Chromium processes started (directly
+    or through the Playwright driver) by the current process. Memory shared
+    between these processes is counted once per process, so the value is an
+    upper bound.
+
+    Returns:
+        int | None: RSS in bytes, None if process information is not available
+    """
+    if psutil is not None:
+        total = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                if _is_chromium(child.name()):
+                    total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    if not os.path.isdir("/proc"):
+        return None
+
+    # Build the process tree from /proc/<pid>/stat, the parent PID follows the command name
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        name = stat[stat.find("(") + 1:stat.rfind(")")]
+        parent = int(stat[stat.rfind(")") + 2:].split()[1])
+        children.setdefault(parent, []).append((int(entry), name))
+
+    total = 0
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    stack = [os.getpid()]
+    while stack:
+        for pid, name in children.get(stack.pop(), []):
+            stack.append(pid)
+            if not _is_chromium(name):
+                continue
+            try:
+                with open(f"/proc/{pid}/statm", "r") as f:
+                    total += int(f.read().split()[1]) * page_size
+            except (OSError, ValueError, IndexError):
+                continue
+    return total
+
+
+def _is_chromium(process_name):
+    name = process_name.lower()
+    return "chrom" in name or "headless_shell" in name
+
+
+async def _close_quietly(target):
+    # Close a context or browser that may already be gone
+    try:
+        await target.close()
+    except Exception:
+        pass
+
+
+def _replaying():
+    archive = get_snapshot_archive()
+    return archive is not None and archive.replaying
+
+
+async def _replay_route(route):
+    # Fulfill document requests from the archive, block scripts, images and everything else
+    request = route.request
+    body = get_snapshot_archive().get("html", request.url) if request.resource_type == "document" else None
+    if body is None:
+        if request.resource_type == "document":
+            print(f"[{get_timestamp()}]     {Colors.YELLOW}No snapshot recorded for {request.url}{Colors.END}")
+        await route.abort()
+        return
+
+    await route.fulfill(status=200, content_type="text/html; charset=utf-8", body=body)
+
+
+# Browser pool shared by all scrapers of the current process
+_pool = None
+
+def get_browser_pool():
+    """
+    Return the browser pool shared by all scrapers.
+
+    Returns:
+        BrowserPool: Shared pool, the browser is launched on first use
+    """
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+    return _pool
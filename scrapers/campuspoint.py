@@ -3,28 +3,53 @@ Campuspoint educational technology retailer scraper module.
 
 Provides asynchronous web scraping functionality for extracting product prices
 from Campuspoint, an Austrian educational technology e-commerce platform.
-Uses Playwright for browser automation with proper availability detection
-and anti-bot measures.
+Uses Playwright through the shared browser pool with proper availability
+detection and persisted cookies per session.
+
+Besides per-product scraping, configured category and search listing pages
+can be crawled once per run. Prices found there are indexed by product URL
+and SKU, so rows only fall back to loading their product page on a miss.
 """
 
+from urllib.parse import urljoin
 from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
-from utils import Colors, get_timestamp, standardize_price_format, get_random_headers
+from utils import Colors, get_timestamp, to_price, get_setting, normalize_url
+from .browser import get_browser_pool, record_page, wait_for_outcome, EMPTY_PAGE
+
+# Terminal states of a product page, in priority order: an availability warning wins over a shown price
+PRODUCT_PAGE_OUTCOMES = {
+    "not_available": "div.warning.message.flex.items-center",
+    "not_found": "body.cms-noroute-index",  # Magento 404 page
+    "price": ".price-box span.price--current"
+}
+
+# Selectors for product tiles on category and search listing pages. Alternatives are
+# tried one after another, since a selector list matches in document order (e.g. the
+# strikethrough price or a wishlist link before the current price and product link)
+LISTING_ITEM_SELECTOR = ".product-item"
+LISTING_LINK_SELECTORS = ("a.product-item-link", "a.product-item-photo")
+LISTING_PRICE_SELECTORS = (".price-box span.price--current",)
+LISTING_SKU_SELECTORS = ("[data-sku]", "[itemprop='sku']")
+LISTING_NEXT_SELECTORS = ("a.action.next", "a[rel='next']", "link[rel='next']")
+
+# Listing prices of the current run, keyed by normalized URL and by SKU
+_listing_index = {}
 
 async def get_price_from_campuspoint(url, semaphore):
     """
     Scrape product price from Campuspoint using browser automation.
     
     Extracts current product price from Campuspoint product pages with
-    automatic detection of product availability. Handles out-of-stock
-    scenarios and implements anti-detection measures.
+    automatic detection of product availability. Returns as soon as the
+    price, the not-available warning or a 404 page appears, so unavailable
+    products do not wait for the price selector's timeout.
     
     Args:
         url (str): Campuspoint product URL to scrape, or "-" for no URL
         semaphore (asyncio.Semaphore): Rate limiting semaphore for concurrent requests
         
     Returns:
-        str: Standardized price text (€ format) or availability status
+        Price | str: Parsed price or availability status
         
     Usage:
         price = await get_price_from_campuspoint(url, semaphore)
@@ -35,27 +60,142 @@ async def get_price_from_campuspoint(url, semaphore):
 
     async with semaphore:
         try:
-            async with async_playwright() as pw:
-                # Launch browser with anti-detection headers
-                browser = await pw.chromium.launch(headless=True)
-                context = await browser.new_context(extra_http_headers=get_random_headers(referer=url))
-                page = await context.new_page()
-                await page.goto(url, timeout=10000)
-                
-                # Check for product availability warnings
-                product_not_available = await page.query_selector('div.warning.message.flex.items-center')
-                if product_not_available:
-                    print(f"[{get_timestamp()}]     {Colors.YELLOW}No Campuspoint listings found{Colors.END}")
+            # Load the page in the shared Campuspoint browser context
+            async with get_browser_pool().page("campuspoint", url, timeout=10000) as page:
+                # Wait for whichever comes first: availability warning, 404 page or current price
+                state, text = await wait_for_outcome(page, PRODUCT_PAGE_OUTCOMES, timeout=10_000)
+
+                if state in ("not_available", "not_found"):
+                    print(f"[{get_timestamp()}]     {Colors.YELLOW}No Campuspoint listings found ({state}){Colors.END}")
                     return "No listings"
-                    
-                # Extract current price from product page
-                price_handle = await page.wait_for_selector(".price-box span.price--current", state="visible", timeout=10_000)
-                price = await price_handle.inner_text()
-                await browser.close()
+                if state == EMPTY_PAGE:
+                    print(f"[{get_timestamp()}]     {Colors.RED}Campuspoint returned an empty page for {url}{Colors.END}")
+                    return "Error get_price_from_campuspoint()"
 
                 print(f"[{get_timestamp()}]     {Colors.GREEN}Campuspoint scrape completed{Colors.END}")
 
-                return standardize_price_format(price)
+                return to_price(text)
         except Exception as e:
             print(f"[{get_timestamp()}]     {Colors.RED}Error getting Campuspoint price for {url}: {e}{Colors.END}")
             return "Error get_price_from_campuspoint()"
+
+
+async def load_campuspoint_listings(semaphore, listing_urls=None):
+    """
+    Crawl Campuspoint listing pages once and index the prices found.
+    
+    Visits every configured category or search listing page, follows its
+    pagination up to CAMPUSPOINT_LISTING_MAX_PAGES pages and stores each
+    product tile's price under its normalized URL and SKU. Uses a single
+    page of the shared browser pool for the whole crawl.
+    
+    Args:
+        semaphore (asyncio.Semaphore): Rate limiting semaphore for concurrent requests
+        listing_urls (list, optional): Listing pages to crawl, defaults to CAMPUSPOINT_LISTING_URLS setting
+        
+    Returns:
+        dict: The listing index mapping normalized URLs and SKUs to prices
+        
+    Usage:
+        await load_campuspoint_listings(semaphore)
+        price = lookup_campuspoint_listing(url, sku)
+    """
+    listing_urls = listing_urls if listing_urls is not None else get_setting("CAMPUSPOINT_LISTING_URLS", [])
+    max_pages = get_setting("CAMPUSPOINT_LISTING_MAX_PAGES", 20)
+
+    _listing_index.clear()
+    if not listing_urls:
+        return _listing_index
+
+    async with semaphore:
+        try:
+            async with get_browser_pool().page("campuspoint") as page:
+                for listing_url in listing_urls:
+                    next_url = listing_url
+                    visited = set()
+
+                    # Follow pagination until there is no next page or the page limit is reached
+                    while next_url and next_url not in visited and len(visited) < max_pages:
+                        visited.add(next_url)
+                        try:
+                            await page.goto(next_url, timeout=10000)
+                            html = await page.content()
+                            await record_page(next_url, page)
+                        except Exception as e:
+                            print(f"[{get_timestamp()}]     {Colors.RED}Error loading Campuspoint listing {next_url}: {e}{Colors.END}")
+                            break
+
+                        found, next_url = parse_listing_page(html, next_url)
+                        _listing_index.update(found)
+        except Exception as e:
+            print(f"[{get_timestamp()}] {Colors.RED}Error crawling Campuspoint listings: {e}{Colors.END}")
+
+    print(f"[{get_timestamp()}] {Colors.GREEN}Campuspoint listings indexed: {len(_listing_index)} keys from {len(listing_urls)} listings{Colors.END}")
+
+    return _listing_index
+
+
+def parse_listing_page(html, page_url):
+    """
+    Extract product prices and the next-page link from a listing page.
+    
+    Args:
+        html (str): Rendered HTML of a Campuspoint listing page
+        page_url (str): URL of the page, used to resolve relative links
+        
+    Returns:
+        tuple: (dict mapping normalized URLs and SKUs to prices, next page URL or None)
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    found = {}
+    for item in soup.select(LISTING_ITEM_SELECTOR):
+        price = _select_first(item, LISTING_PRICE_SELECTORS)
+        if price is None:
+            continue
+        price_text = to_price(price.get_text(strip=True))
+
+        link = _select_first(item, LISTING_LINK_SELECTORS)
+        if link is not None and link.get("href"):
+            found[normalize_url(urljoin(page_url, link["href"]))] = price_text
+
+        # The SKU may sit on the tile itself or on one of its children
+        sku = item if item.has_attr("data-sku") else _select_first(item, LISTING_SKU_SELECTORS)
+        if sku is not None:
+            sku_text = sku.get("data-sku") or sku.get("content") or sku.get_text(strip=True)
+            if sku_text:
+                found[sku_text.strip().upper()] = price_text
+
+    next_link = _select_first(soup, LISTING_NEXT_SELECTORS)
+    next_url = urljoin(page_url, next_link["href"]) if next_link is not None and next_link.get("href") else None
+
+    return found, next_url
+
+
+def _select_first(tag, selectors):
+    # First element matching the most specific selector that matches at all
+    for selector in selectors:
+        element = tag.select_one(selector)
+        if element is not None:
+            return element
+    return None
+
+
+def lookup_campuspoint_listing(url, sku=None):
+    """
+    Look up a product price in the listing index of the current run.
+    
+    Args:
+        url (str): Campuspoint product URL from the spreadsheet
+        sku (str, optional): Product SKU used if the URL is not indexed
+        
+    Returns:
+        str | None: Indexed price, or None if the product was not found
+    """
+    if not _listing_index:
+        return None
+
+    price = _listing_index.get(normalize_url(url))
+    if price is None and sku:
+        price = _listing_index.get(sku.strip().upper())
+    return price
@@ -5,11 +5,34 @@ Provides asynchronous web scraping functionality for extracting both product
 prices and stock availability from edustore, an Austrian educational products
 e-commerce platform. Implements dual functionality for price and inventory
 monitoring with robust error handling.
+
+Both scrapers race the terminal states of a product page with a single
+in-page check (wait_for_outcome), so out-of-stock and removed products
+return as soon as their state shows.
 """
 
 from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
-from utils import Colors, get_timestamp, standardize_price_format, get_random_headers
+from utils import Colors, get_timestamp, to_price
+from .browser import get_browser_pool, wait_for_outcome, EMPTY_PAGE
+
+# Magento 404 page of removed products
+NOT_FOUND_SELECTOR = "body.cms-noroute-index"
+
+# Terminal states of the price section
+PRICE_OUTCOMES = {
+    "not_found": NOT_FOUND_SELECTOR,
+    "price": ".price-wrapper"
+}
+
+# Terminal states of the stock section, in priority order, and the cell value of each
+STOCK_OUTCOMES = {
+    "available": ".product-info-stock-sku .stock.available",
+    "unavailable": ".product-info-stock-sku .stock.unavailable",
+    "preorderable": ".product-info-stock-sku .stock.lagerstatus.lagerstatus-green, .product-info-stock-sku .stock.lagerstatus.lagerstatus-orange",
+    "unknown": ".product-info-stock-sku",
+    "not_found": NOT_FOUND_SELECTOR
+}
+STOCK_VALUES = {"available": "Ja", "unavailable": "Nein", "preorderable": "Vorbestellbar", "unknown": "?", "not_found": "?"}
 
 async def get_price_from_edustore(url, semaphore):
     """
@@ -24,7 +47,7 @@ async def get_price_from_edustore(url, semaphore):
         semaphore (asyncio.Semaphore): Rate limiting semaphore for concurrent requests
         
     Returns:
-        str: Standardized price text (€ format) or error status
+        Price | str: Parsed price or error status
         
     Usage:
         price = await get_price_from_edustore(url, semaphore)
@@ -35,26 +58,25 @@ async def get_price_from_edustore(url, semaphore):
 
     async with semaphore:
         try:
-            async with async_playwright() as pw:
-                # Launch browser with anti-detection headers
-                browser = await pw.chromium.launch(headless=True)
-                context = await browser.new_context(extra_http_headers=get_random_headers(referer=url))
-                page = await context.new_page()
-                await page.goto(url, timeout=10000)
-                
-                # Wait for price wrapper to ensure content is loaded
-                await page.wait_for_selector('.price-wrapper', timeout=10000)
+            # Load the page in the shared edustore browser context
+            async with get_browser_pool().page("edustore", url, timeout=10000) as page:
+                # Wait for the price wrapper or a 404 page, whichever comes first
+                state, _ = await wait_for_outcome(page, PRICE_OUTCOMES, timeout=10000)
+                if state == "not_found":
+                    print(f"[{get_timestamp()}]     {Colors.YELLOW}edustore product not found: {url}{Colors.END}")
+                    return "No listings"
+                if state == EMPTY_PAGE:
+                    raise RuntimeError("empty page")
+
                 html = await page.content()
                 
                 # Extract price using BeautifulSoup
                 soup = BeautifulSoup(html, "html.parser")
                 price_text = soup.find(class_="price").text
-                
-                await browser.close()
 
                 print(f"[{get_timestamp()}]     {Colors.GREEN}edustore scrape completed{Colors.END}")
 
-                return standardize_price_format(price_text)
+                return to_price(price_text)
         except Exception as e:
             print(f"[{get_timestamp()}]     {Colors.RED}Error getting Edustore price for {url}: {e}{Colors.END}")
             raise e 
@@ -83,34 +105,16 @@ async def get_stock_from_edustore(url, semaphore):
     
     async with semaphore:
         try: 
-            async with async_playwright() as pw:
-                # Launch browser and navigate to product page
-                browser = await pw.chromium.launch(headless=True)
-                page = await browser.new_page()
-                await page.goto(url, timeout=10000)
-                
-                # Wait for stock information section to load
-                await page.wait_for_selector('.product-info-stock-sku', timeout=10000)
-                
-                # Check for different stock status indicators
-                available_element = await page.query_selector('.product-info-stock-sku .stock.available')
-                preoderable_element_green = await page.query_selector('.product-info-stock-sku .stock.lagerstatus.lagerstatus-green')
-                preoderable_element_orange = await page.query_selector('.product-info-stock-sku .stock.lagerstatus.lagerstatus-orange')
-                unavailable_element = await page.query_selector('.product-info-stock-sku .stock.unavailable')
+            # Navigate to product page in the shared edustore browser context
+            async with get_browser_pool().page("edustore", url, timeout=10000) as page:
+                # Check all stock status indicators in one in-page call, as soon as the section or a 404 page shows
+                state, _ = await wait_for_outcome(page, STOCK_OUTCOMES, timeout=10000)
+                if state == EMPTY_PAGE:
+                    raise RuntimeError("empty page")
 
-                await browser.close()
+                print(f"[{get_timestamp()}]     {Colors.GREEN}edustore availability scrape completed ({state}){Colors.END}")
 
-                print(f"[{get_timestamp()}]     {Colors.GREEN}edustore availability scrape completed{Colors.END}")
-                
-                # Determine stock status based on available elements
-                if available_element:
-                    return "Ja"
-                elif unavailable_element:
-                    return "Nein"
-                elif preoderable_element_green or preoderable_element_orange:
-                    return "Vorbestellbar"
-                else:
-                    return "?"
+                return STOCK_VALUES[state]
         except Exception as e: 
             print(f"[{get_timestamp()}]     {Colors.RED}Error getting Edustore stock for {url}: {e}{Colors.END}")
             raise e 
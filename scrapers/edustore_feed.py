@@ -0,0 +1,171 @@
+"""
+edustore catalog feed ingestion module.
+
+Reads a bulk product export of our own edustore shop in a single pass and
+indexes it by product URL and SKU, so that price and stock of most products
+are available from memory instead of two browser page loads per product.
+
+Supported sources (EDUSTORE_FEED setting):
+- Local file path or HTTP(S) URL
+- CSV exports (delimiter is detected automatically)
+- XML feeds such as Google Shopping RSS/Atom feeds or plain <product> lists
+
+Products missing from the feed fall back to the browser scrapers, products
+without a known availability value fall back to the stock scraper.
+"""
+
+import io
+import csv
+import xml.etree.ElementTree as ET
+import requests
+from utils import Colors, get_timestamp, to_price, get_setting, normalize_url, get_snapshot_archive
+
+# Candidate field names per value, first match wins (case-insensitive).
+# "id" is not a SKU candidate: in Google Shopping feeds it is the shop's own item id
+FEED_FIELDS = {
+    "sku": ("sku", "mpn", "artikelnummer"),
+    "url": ("link", "url", "product_url"),
+    "price": ("sale_price", "price", "final_price", "preis"),
+    "availability": ("availability", "is_in_stock", "stock_status", "verfuegbar")
+}
+
+# Feed availability values mapped to the values used in the "Verfügbar" column
+AVAILABILITY_MAP = {
+    "in stock": "Ja", "in_stock": "Ja", "instock": "Ja", "1": "Ja", "true": "Ja", "ja": "Ja",
+    "out of stock": "Nein", "out_of_stock": "Nein", "outofstock": "Nein", "0": "Nein", "false": "Nein", "nein": "Nein",
+    "preorder": "Vorbestellbar", "backorder": "Vorbestellbar", "vorbestellbar": "Vorbestellbar"
+}
+
+# Feed entries of the current run, keyed by normalized URL and by SKU
+_feed_index = {}
+
+def load_edustore_feed(source=None):
+    """
+    Load the edustore catalog feed and build the in-memory index.
+    
+    Args:
+        source (str, optional): File path or URL of the feed, defaults to EDUSTORE_FEED setting
+        
+    Returns:
+        dict: The feed index mapping normalized URLs and SKUs to entries
+              of the form {"price": Price, "availability": "Ja"}; availability
+              is None if the feed has no or an unknown value
+        
+    Usage:
+        load_edustore_feed("exports/catalog.csv")
+        entry = lookup_edustore_feed(url, sku)
+    """
+    source = source if source is not None else get_setting("EDUSTORE_FEED")
+
+    _feed_index.clear()
+    if not source:
+        return _feed_index
+
+    try:
+        content = _read_source(source)
+        if content.lstrip().startswith(b"<"):
+            records = _parse_xml(content)
+        else:
+            records = _parse_csv(content)
+
+        for record in records:
+            _add_record(record)
+
+        print(f"[{get_timestamp()}] {Colors.GREEN}edustore feed indexed: {len(_feed_index)} keys from {source}{Colors.END}")
+    except Exception as e:
+        print(f"[{get_timestamp()}] {Colors.RED}Error loading edustore feed {source}: {e}{Colors.END}")
+        _feed_index.clear()
+
+    return _feed_index
+
+
+def lookup_edustore_feed(url, sku=None):
+    """
+    Look up a product in the edustore feed index.
+    
+    Args:
+        url (str): edustore product URL from the spreadsheet
+        sku (str, optional): Product SKU used if the URL is not indexed
+        
+    Returns:
+        dict | None: Feed entry with "price" and "availability", or None if missing
+    """
+    if not _feed_index:
+        return None
+
+    entry = _feed_index.get(normalize_url(url))
+    if entry is None and sku:
+        entry = _feed_index.get(sku.strip().upper())
+    return entry
+
+
+def _read_source(source):
+    # Download URLs, read everything else from the local file system
+    if source.startswith(("http://", "https://")):
+        archive = get_snapshot_archive()
+        if archive is not None and archive.replaying:
+            return archive.require("feed", source)
+
+        ret = requests.get(source, timeout=60)
+        ret.raise_for_status()
+        if archive is not None:
+            archive.put("feed", source, ret.content)
+        return ret.content
+
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def _parse_csv(content):
+    text = content.decode("utf-8-sig", errors="replace")
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+
+    for row in csv.DictReader(io.StringIO(text), dialect=dialect):
+        yield {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+
+
+def _parse_xml(content):
+    # Stream over <item>, <entry> or <product> elements, ignoring namespaces
+    for _, element in ET.iterparse(io.BytesIO(content)):
+        tag = element.tag.rsplit("}", 1)[-1].lower()
+        if tag not in ("item", "entry", "product"):
+            continue
+
+        record = {}
+        for child in element:
+            name = child.tag.rsplit("}", 1)[-1].lower()
+            record[name] = (child.text or child.get("href") or "").strip()
+        element.clear()
+        yield record
+
+
+def _field(record, name):
+    for candidate in FEED_FIELDS[name]:
+        value = record.get(candidate)
+        if value:
+            return value
+    return ""
+
+
+def _add_record(record):
+    price = _field(record, "price")
+    if not price:
+        return
+
+    availability = _field(record, "availability")
+    entry = {
+        "price": to_price(price),
+        # Missing or unknown values are scraped from the product page instead
+        "availability": AVAILABILITY_MAP.get(availability.lower())
+    }
+
+    url = _field(record, "url")
+    if url:
+        _feed_index[normalize_url(url)] = entry
+
+    sku = _field(record, "sku")
+    if sku:
+        _feed_index[sku.upper()] = entry
@@ -3,31 +3,49 @@ Geizhals.at price comparison platform scraper module.
 
 Provides asynchronous web scraping functionality for extracting product prices
 from Geizhals.at, Austria's leading price comparison website. Uses Playwright
-for browser automation with anti-bot detection measures including randomized
-headers and proper user agent rotation.
+for browser automation through the shared browser pool, with persisted
+cookies and a stable header identity per session.
+
+A single page load parses the complete offer list into structured offer
+records (shop, price, shipping, availability), from which the cheapest offer,
+the number of offers, our own position and selected competitor prices are
+derived.
 """
 
+from decimal import Decimal
 from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
-from utils import Colors, get_timestamp, standardize_price_format, get_random_headers
+from utils import Colors, get_timestamp, Price, to_price, get_setting, current_span
+from .browser import get_browser_pool
 
-async def get_price_from_geizhals(url, semaphore):
+# Sheet columns filled from the Geizhals offer list
+GEIZHALS_PRICE_KEY = "Geizhals Preis"
+GEIZHALS_OFFER_COUNT_KEY = "Geizhals Angebote"
+GEIZHALS_POSITION_KEY = "Geizhals Position"
+
+# Selectors for offer rows and their fields, most specific first
+OFFER_ROW_SELECTOR = "section#offerlist .offer"
+OFFER_PRICE_SELECTOR = "span.gh_price"
+OFFER_SHOP_SELECTORS = (".merchant__logo-caption", ".offer__merchant a", ".merchant__name", "img.merchant__logo-img")
+OFFER_SHIPPING_SELECTORS = (".offer__delivery-cost", ".offer__shipping", ".offer__price-shipping")
+OFFER_AVAILABILITY_SELECTORS = (".offer__delivery-time", ".delivery__text", ".offer__availability")
+
+async def get_offers_from_geizhals(url, semaphore):
     """
-    Scrape product price from Geizhals.at using browser automation.
+    Scrape the complete Geizhals offer list using browser automation.
     
-    Extracts the lowest available price from Geizhals product listings using
-    Playwright browser automation. Implements rate limiting via semaphore and
-    anti-detection measures including randomized headers and referer spoofing.
+    Loads the product page once and parses every offer in the offer list.
+    Implements rate limiting via semaphore and reuses the Geizhals browser
+    context of the shared pool.
     
     Args:
         url (str): Geizhals product URL to scrape, or "-" for no URL
         semaphore (asyncio.Semaphore): Rate limiting semaphore for concurrent requests
         
     Returns:
-        str: Standardized price text (€ format) or error message
+        dict | str: Offer summary (see summarize_offers) or status/error message
         
     Usage:
-        price = await get_price_from_geizhals(url, semaphore)
+        offers = await get_offers_from_geizhals(url, semaphore)
     """
     # Handle cases where no URL is provided
     if url == "-":
@@ -35,32 +53,173 @@ async def get_price_from_geizhals(url, semaphore):
 
     async with semaphore:
         try:
-            async with async_playwright() as pw:
-                # Launch headless browser with anti-detection measures
-                browser = await pw.chromium.launch(headless=True)
-                context = await browser.new_context(extra_http_headers=get_random_headers(referer=url))
-                page = await context.new_page()
-
-                try: 
-                    await page.goto(url, timeout=10000)
-                    html = await page.content()
-
-                    # Parse HTML and extract price from offer listings
-                    soup = BeautifulSoup(html, "html.parser")
-                    price = soup.select_one("section#offerlist span.gh_price")
-                    if price is None:
-                        print(f"[{get_timestamp()}]     {Colors.YELLOW}No Geizhals listings found{Colors.END}")
-                        return "No listings"
-                    else:
-                        price_text = price.text    
-                finally:
-                    await browser.close()
-
-            
-                # Debug line
-                print(f"[{get_timestamp()}]     {Colors.GREEN}Geizhals scrape completed{Colors.END}")
-
-                return standardize_price_format(price_text)
+            # Load the page in the shared Geizhals browser context
+            async with get_browser_pool().page("geizhals", url, timeout=10000) as page:
+                html = await page.content()
+                current_span().set(bytes=len(html))
+
+            # Parse HTML and extract all offer listings
+            offers = parse_offer_list(html)
+            if not offers:
+                print(f"[{get_timestamp()}]     {Colors.YELLOW}No Geizhals listings found{Colors.END}")
+                return "No listings"
+
+            # Debug line
+            print(f"[{get_timestamp()}]     {Colors.GREEN}Geizhals scrape completed ({len(offers)} offers){Colors.END}")
+
+            return summarize_offers(offers)
         except Exception as e:
             print(f"[{get_timestamp()}]     {Colors.RED}Error getting Geizhals price for {url}: {e}{Colors.END}")
             return "Error in get_price_from_geizhals()"
+
+
+async def get_price_from_geizhals(url, semaphore):
+    """
+    Scrape the lowest product price from Geizhals.at.
+    
+    Convenience wrapper around get_offers_from_geizhals() for callers that
+    only need the cheapest price.
+    
+    Args:
+        url (str): Geizhals product URL to scrape, or "-" for no URL
+        semaphore (asyncio.Semaphore): Rate limiting semaphore for concurrent requests
+        
+    Returns:
+        Price | str: Cheapest parsed price or status/error message
+        
+    Usage:
+        price = await get_price_from_geizhals(url, semaphore)
+    """
+    result = await get_offers_from_geizhals(url, semaphore)
+    if isinstance(result, dict):
+        return result["cheapest"]["price"]
+    return result
+
+
+def parse_offer_list(html):
+    """
+    Parse the Geizhals offer list into structured offer records.
+    
+    Falls back to a single price-only offer if the page has a price but no
+    recognizable offer rows.
+    
+    Args:
+        html (str): Rendered HTML of a Geizhals product page
+        
+    Returns:
+        list[dict]: Offers in page order with shop, price, shipping and availability
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    offers = []
+    for row in soup.select(OFFER_ROW_SELECTOR):
+        price = row.select_one(OFFER_PRICE_SELECTOR)
+        if price is None:
+            continue
+
+        offers.append({
+            "shop": _first_text(row, OFFER_SHOP_SELECTORS),
+            "price": to_price(price.text),
+            "shipping": _first_text(row, OFFER_SHIPPING_SELECTORS),
+            "availability": _first_text(row, OFFER_AVAILABILITY_SELECTORS)
+        })
+
+    if not offers:
+        price = soup.select_one(f"section#offerlist {OFFER_PRICE_SELECTOR}")
+        if price is not None:
+            offers.append({"shop": "", "price": to_price(price.text), "shipping": "", "availability": ""})
+
+    return offers
+
+
+def summarize_offers(offers, own_shop=None, competitors=None):
+    """
+    Summarize parsed offers for the spreadsheet.
+    
+    Args:
+        offers (list[dict]): Offers as returned by parse_offer_list()
+        own_shop (str, optional): Name of our own shop, defaults to GEIZHALS_OWN_SHOP setting
+        competitors (list, optional): Competitor shop names, defaults to GEIZHALS_COMPETITORS setting
+        
+    Returns:
+        dict: Cheapest offer, offer count, own 1-based position (or None),
+              competitor prices by name and the full offer list
+    """
+    own_shop = own_shop if own_shop is not None else get_setting("GEIZHALS_OWN_SHOP", "edustore")
+    competitors = competitors if competitors is not None else get_setting("GEIZHALS_COMPETITORS", [])
+
+    # Keep page order for equal prices so the listing order decides ties
+    cheapest = min(offers, key=lambda offer: _amount(offer["price"]))
+
+    own_position = None
+    for position, offer in enumerate(offers, start=1):
+        if _shop_matches(offer["shop"], own_shop):
+            own_position = position
+            break
+
+    competitor_prices = {}
+    for name in competitors:
+        matching = [offer for offer in offers if _shop_matches(offer["shop"], name)]
+        if matching:
+            competitor_prices[name] = min(matching, key=lambda offer: _amount(offer["price"]))["price"]
+
+    return {
+        "cheapest": cheapest,
+        "offer_count": len(offers),
+        "own_position": own_position,
+        "competitors": competitor_prices,
+        "offers": offers
+    }
+
+
+def geizhals_offer_columns(result, competitors=None):
+    """
+    Convert a Geizhals scrape result into spreadsheet column values.
+    
+    Status and error messages are written to the price column only, so
+    the extra offer columns keep their previous values.
+    
+    Args:
+        result (dict | str): Result of get_offers_from_geizhals()
+        competitors (list, optional): Competitor shop names, defaults to GEIZHALS_COMPETITORS setting
+        
+    Returns:
+        dict: Mapping of column keys to cell values
+    """
+    if not isinstance(result, dict):
+        return {GEIZHALS_PRICE_KEY: result}
+
+    competitors = competitors if competitors is not None else get_setting("GEIZHALS_COMPETITORS", [])
+
+    columns = {
+        GEIZHALS_PRICE_KEY: result["cheapest"]["price"],
+        GEIZHALS_OFFER_COUNT_KEY: result["offer_count"],
+        GEIZHALS_POSITION_KEY: result["own_position"] if result["own_position"] is not None else "-"
+    }
+    for name in competitors:
+        columns[f"Geizhals {name}"] = result["competitors"].get(name, "-")
+
+    return columns
+
+
+def _first_text(element, selectors):
+    # Return the text (or image alt text) of the first matching selector
+    for selector in selectors:
+        match = element.select_one(selector)
+        if match is None:
+            continue
+        text = match.get_text(" ", strip=True) or match.get("alt", "")
+        if text:
+            return text
+    return ""
+
+
+def _shop_matches(shop, name):
+    return bool(shop) and bool(name) and name.lower() in shop.lower()
+
+
+def _amount(price):
+    # Numeric value of an offer price, unparseable prices sort last
+    if isinstance(price, Price):
+        return price.amount
+    return Decimal("Infinity")
@@ -6,14 +6,36 @@ This package provides common utilities used throughout the price bot application
 - Formatters: Price and availability data formatting functions
 - Timing: Timestamp utilities for logging and debugging
 - Error handling: Retry mechanisms for robust network operations
-- Headers: Random user agent generation for web scraping
+- Headers: Random user agent generation and stable session identities for web scraping
+- Settings: Optional configuration lookups with defaults
+- Checkpoint: Run progress persistence for resuming interrupted runs
+- URLs: Product URL normalization for cross-source lookups
+- Prices: Numeric price model and batch price normalization
+- Snapshots: Record and replay archive of scraped pages and API responses
+- Metrics: Run counters printed as a run report
+- Single flight: Coalescing of duplicate scraper requests within a run
+- Deadlines: Per-row and per-source time budgets for scraping
+- Result cache: Persistent stale-while-revalidate cache of shop scraper results
+- Profiler: Sampling profiler with event loop blocking detection (--profile)
+- Tracing: Per-row trace spans exported as OpenTelemetry JSON (--trace)
 """
 
 from .colors import Colors
-from .formatters import standardize_price_format, format_availability_column, format_itscope_availability_columns
-from .timing import get_timestamp
+from .formatters import standardize_price_format, format_availability_column, format_itscope_availability_columns, column_letter_to_index, price_column_format_requests, availability_format_request, itscope_availability_format_request, cell_background_request, cell_note_request
+from .timing import get_timestamp, LAST_UPDATED_KEY
 from .error_retry import retry_after_timeout
-from .headers import get_random_headers
+from .headers import get_random_headers, get_session_headers
+from .settings import get_setting
+from .checkpoint import RunCheckpoint
+from .urls import normalize_url
+from .snapshots import SnapshotArchive, SnapshotMissing, open_snapshot_archive, get_snapshot_archive, close_snapshot_archive
+from .metrics import RunMetrics, get_metrics
+from .single_flight import SingleFlight, get_single_flight
+from .deadline import Deadline, TIMEOUT_RESULT, row_deadline, source_budget, current_deadline, deadline_scope, page_timeout
+from .result_cache import ResultCache, CachedResult, CELL_NOTES_KEY, is_failure_result, open_result_cache, get_result_cache, close_result_cache
+from .profiler import AsyncProfiler, run_profiled
+from .tracing import Span, Tracer, span, current_span, open_tracer, close_tracer, SPAN_KIND_CLIENT
+from .prices import Price, PriceResult, parse_price, to_price, format_price, normalize_price, normalize_price_batch, normalize_prices, price_keys
 
 __all__ = [
     # Terminal color formatting
@@ -21,13 +43,83 @@ __all__ = [
     
     # Timestamp utilities
     "get_timestamp", 
+    "LAST_UPDATED_KEY",                  # Column holding the time of a row's last refresh
     
     # Price and data formatting
     "standardize_price_format",          # Standardizes price format to '€ XXXX,XX'
     "format_availability_column",        # Formats availability data in Google Sheets
     "format_itscope_availability_columns", # Formats ITScope availability data with colors
+    "column_letter_to_index",            # Converts column letters to 0-based indexes
+    "price_column_format_requests",      # Builds number format requests for price columns
+    "availability_format_request",       # Builds the color request of an availability cell
+    "itscope_availability_format_request", # Builds the color request of an ITScope cell
+    "cell_background_request",           # Builds a centered background color request for one cell
+    "cell_note_request",                 # Builds a request setting the note of one cell
+
+    # Numeric price model
+    "Price",                             # Decimal amount plus currency
+    "PriceResult",                       # Normalized price with separate status field
+    "parse_price",                       # Parses scraped price text into a Price
+    "to_price",                          # Parses price text, keeping unparseable text
+    "format_price",                      # Formats a Price as '€ 1.234,56'
+    "normalize_price",                   # Normalizes a single scrape result
+    "normalize_price_batch",             # Normalizes many scrape results at once
+    "normalize_prices",                  # Normalizes the price columns of a result dict
+    "price_keys",                        # Result keys that hold prices
     
     # Network utilities
     "get_random_headers",               # Generates random headers for web scraping
-    "retry_after_timeout"               # Async retry mechanism for failed operations
+    "get_session_headers",              # Stable per-site header identity for a session
+    "retry_after_timeout",              # Async retry mechanism for failed operations
+
+    # Configuration and run state
+    "get_setting",                      # Reads optional settings from config with defaults
+    "RunCheckpoint",                    # Persists run progress for --resume
+
+    # URL utilities
+    "normalize_url",                    # Canonical product URL form for lookups
+
+    # Record and replay
+    "SnapshotArchive",                  # Zip archive of recorded pages and API responses
+    "SnapshotMissing",                  # Raised when replaying a request that was not recorded
+    "open_snapshot_archive",            # Opens the process-wide archive for --record / --replay
+    "get_snapshot_archive",             # Returns the open archive, None for live runs
+    "close_snapshot_archive",           # Finishes and closes the archive
+
+    # Run metrics and request coalescing
+    "RunMetrics",                       # Counters and gauges of a run
+    "get_metrics",                      # Returns the process-wide run metrics
+    "SingleFlight",                     # Shares one fetch among requests for the same URL
+    "get_single_flight",                # Returns the coalescing group of the scrapers
+
+    # Deadline budgets
+    "Deadline",                         # Point in time by which a row or source has to finish
+    "TIMEOUT_RESULT",                   # Cell text of sources that ran out of time
+    "row_deadline",                     # Creates a row deadline from the ROW_DEADLINE setting
+    "source_budget",                    # Budget in seconds of one source of a row
+    "current_deadline",                 # Deadline of the running row or source, if any
+    "deadline_scope",                   # Makes a deadline current for a task and its children
+    "page_timeout",                     # Caps a Playwright timeout to the current deadline
+
+    # Persistent result cache
+    "ResultCache",                      # Stale-while-revalidate cache of shop scraper results
+    "CachedResult",                     # Result value with cache state and scrape time
+    "CELL_NOTES_KEY",                   # Key of the cell notes in process_sku() results
+    "is_failure_result",                # Whether a scraper result is an error, retry failure or timeout
+    "open_result_cache",                # Loads the process-wide result cache
+    "get_result_cache",                 # Returns the open result cache, None if disabled
+    "close_result_cache",               # Finishes background refreshes and saves the cache
+
+    # Profiling
+    "AsyncProfiler",                    # Sampling profiler attributing loop time to tasks
+    "run_profiled",                     # Runs a coroutine under the profiler (--profile)
+
+    # Tracing
+    "Span",                             # Timed operation with attributes within a row trace
+    "Tracer",                           # Writes finished spans as OTLP JSON lines
+    "span",                             # Traces a block as child of the current span
+    "current_span",                     # Span of the running block, for adding attributes
+    "open_tracer",                      # Starts tracing to a file (--trace)
+    "close_tracer",                     # Writes remaining spans and stops tracing
+    "SPAN_KIND_CLIENT"                  # Span kind of outgoing requests
 ]
@@ -0,0 +1,144 @@
+"""
+Run checkpoint utilities for resuming interrupted price bot runs.
+
+Persists a compact progress record of the current run to a local JSON file:
+- Rows that have been fully processed, by update key (SKU, worksheet and row)
+- Spreadsheet updates that were prepared but not yet written
+- The cached prices of the last processed row (SKU variant cache)
+
+A run started with --resume skips completed rows and flushes any pending
+updates that never reached the spreadsheet before it died.
+
+Rewriting the whole file after every row would write O(n²) bytes over a
+large catalog, so progress is saved at most every CHECKPOINT_INTERVAL
+seconds (default 5) and once more when the run ends or is interrupted.
+A crash loses at most the rows of the last interval, which a resume
+processes again.
+"""
+
+import os
+import json
+import time
+from .colors import Colors
+from .timing import get_timestamp
+from .settings import get_setting
+
+class RunCheckpoint:
+    """
+    Progress checkpoint of a single price bot run.
+
+    The checkpoint is rewritten atomically (temporary file + rename) on every
+    save, so a crash during saving never leaves a truncated file behind.
+    save_if_due() limits how often that happens during a run.
+
+    Attributes:
+        path (str): Location of the checkpoint file
+        completed (set): Update keys of rows that have been fully processed
+        pending (dict): Mapping of update key (SKU, worksheet and row) to batch update data not yet written
+        last_prices (dict): Cached prices of the last processed row
+    """
+
+    def __init__(self, path):
+        """Create an empty checkpoint stored at the given path."""
+        self.path = path
+        self.completed = set()
+        self.pending = {}
+        self.last_prices = {}
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a checkpoint from disk.
+
+        Returns an empty checkpoint if the file does not exist or cannot be
+        read, so a resume without previous progress behaves like a fresh run.
+
+        Args:
+            path (str): Location of the checkpoint file
+
+        Returns:
+            RunCheckpoint: Restored checkpoint
+
+        Usage:
+            checkpoint = RunCheckpoint.load("price_bot_checkpoint.json")
+        """
+        checkpoint = cls(path)
+        if not os.path.exists(path):
+            return checkpoint
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            checkpoint.completed = set(data.get("completed", []))
+            checkpoint.pending = data.get("pending", {})
+            checkpoint.last_prices = data.get("last_prices", {})
+            print(f"[{get_timestamp()}] {Colors.YELLOW}Resuming from checkpoint: {len(checkpoint.completed)} rows done, {len(checkpoint.pending)} pending writes{Colors.END}")
+        except (OSError, ValueError) as e:
+            print(f"[{get_timestamp()}] {Colors.RED}Could not read checkpoint {path}: {e}{Colors.END}")
+
+        return checkpoint
+
+    def is_completed(self, key):
+        """Return True if the row with the given update key was already processed."""
+        return key in self.completed
+
+    def mark_pending(self, sku, batch_data):
+        """Record a prepared spreadsheet update before it is sent."""
+        self.pending[sku] = batch_data
+        self._dirty = True
+
+    def mark_written(self, sku):
+        """Remove a spreadsheet update once it was written successfully."""
+        if self.pending.pop(sku, None) is not None:
+            self._dirty = True
+
+    def mark_completed(self, key, last_prices):
+        """Record a fully processed row and the current SKU variant cache."""
+        self.completed.add(key)
+        self.last_prices = last_prices
+        self._dirty = True
+
+    def save_if_due(self, interval=None):
+        """
+        Save the checkpoint if it changed and the last save is interval seconds ago.
+
+        Args:
+            interval (float, optional): Minimum seconds between saves,
+                defaults to the CHECKPOINT_INTERVAL setting (5)
+        """
+        interval = interval if interval is not None else get_setting("CHECKPOINT_INTERVAL", 5)
+        if self._dirty and time.monotonic() - self._saved_at >= interval:
+            self.save()
+
+    def flush(self):
+        """Save the checkpoint if it changed since the last save, e.g. when the run ends."""
+        if self._dirty:
+            self.save()
+
+    def save(self):
+        """Atomically write the checkpoint to disk."""
+        data = {
+            "completed": sorted(self.completed),
+            "pending": self.pending,
+            "last_prices": self.last_prices
+        }
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"), default=str)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        except OSError as e:
+            print(f"[{get_timestamp()}]     {Colors.RED}Could not save checkpoint {self.path}: {e}{Colors.END}")
+
+    def clear(self):
+        """Delete the checkpoint file after a completed run."""
+        self._dirty = False
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
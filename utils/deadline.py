@@ -0,0 +1,103 @@
+"""
+Deadline budgets for rows and sources.
+
+A row may only spend ROW_DEADLINE seconds on scraping, and each source of
+the row at most its entry of SOURCE_DEADLINES. The active deadline is kept
+in a context variable, so it is passed down through tasks started for the
+row without changing scraper signatures:
+- Playwright timeouts are capped to the remaining budget (page_timeout)
+- The retry helper does not start attempts the budget cannot cover
+- process_sku cancels sources whose budget ran out and marks them "Timeout"
+"""
+
+import time
+import contextvars
+from contextlib import contextmanager
+from .settings import get_setting
+
+# Text written to the cells of sources that ran out of time
+TIMEOUT_RESULT = "Timeout"
+
+# Default budgets in seconds, one retry round of a scraper fits into a source budget
+DEFAULT_ROW_DEADLINE = 90
+DEFAULT_SOURCE_DEADLINES = {"geizhals": 45, "campuspoint": 45, "edustore": 45, "itscope": 30}
+
+_current = contextvars.ContextVar("deadline", default=None)
+
+class Deadline:
+    """
+    Point in time by which some work has to be finished.
+
+    Attributes:
+        expires_at (float): time.monotonic() value of the deadline
+    """
+
+    def __init__(self, seconds, parent=None):
+        """Create a deadline seconds from now, never later than the parent deadline."""
+        self.expires_at = time.monotonic() + seconds
+        if parent is not None:
+            self.expires_at = min(self.expires_at, parent.expires_at)
+
+    def remaining(self):
+        """Seconds left until the deadline, 0 once it has passed."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def child(self, seconds):
+        """Return a deadline seconds from now that ends no later than this one."""
+        return Deadline(seconds, parent=self)
+
+    def cap(self, seconds):
+        """Return seconds, shortened to the remaining time."""
+        return min(seconds, self.remaining())
+
+
+def row_deadline():
+    """Create the deadline of a row from the ROW_DEADLINE setting."""
+    return Deadline(get_setting("ROW_DEADLINE", DEFAULT_ROW_DEADLINE))
+
+
+def source_budget(source):
+    """Return the budget in seconds of a source from the SOURCE_DEADLINES setting."""
+    budgets = {**DEFAULT_SOURCE_DEADLINES, **get_setting("SOURCE_DEADLINES", {})}
+    return budgets.get(source, get_setting("ROW_DEADLINE", DEFAULT_ROW_DEADLINE))
+
+
+def current_deadline():
+    """Return the deadline of the running row or source, None outside of rows."""
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline):
+    """
+    Make deadline the current deadline of this task and the tasks it starts.
+
+    Usage:
+        with deadline_scope(row.child(source_budget("geizhals"))):
+            await scrape()
+    """
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def page_timeout(timeout):
+    """
+    Cap a Playwright timeout to the current deadline.
+
+    Args:
+        timeout (int): Timeout in milliseconds used without a deadline
+
+    Returns:
+        int: Timeout in milliseconds, at least 1 so Playwright does not wait forever
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return timeout
+    return max(1, int(deadline.cap(timeout / 1000) * 1000))
@@ -7,10 +7,10 @@ Implements exponential backoff and comprehensive error logging.
 """
 
 import asyncio
-import random
-from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from .colors import Colors
 from .timing import get_timestamp
+from .deadline import current_deadline, TIMEOUT_RESULT
+from .tracing import span
 
 async def retry_after_timeout(func, *args, retries=3, delay=2):
     """
@@ -19,6 +19,9 @@ async def retry_after_timeout(func, *args, retries=3, delay=2):
     Retries the provided async function up to the specified number of times
     if Playwright timeouts, asyncio timeouts, or other exceptions occur.
     Implements colored logging for retry attempts and final failure states.
+    Every attempt is traced as an "attempt" span.
+    Within a row deadline, no retry is started once the remaining budget
+    does not cover the delay.
     
     Args:
         func: Async function to execute
@@ -27,7 +30,8 @@ async def retry_after_timeout(func, *args, retries=3, delay=2):
         delay (int): Delay in seconds between retry attempts (default: 2)
         
     Returns:
-        Result of successful function execution or error message string
+        Result of successful function execution, error message string, or
+        "Timeout" if the deadline ran out before the next attempt
         
     Usage:
         result = await retry_after_timeout(scrape_function, url, semaphore)
@@ -35,10 +39,17 @@ async def retry_after_timeout(func, *args, retries=3, delay=2):
     last_exc = None
     for attempt in range(1, retries + 1):
         try:
-            return await func(*args)
-        except (PlaywrightTimeoutError, asyncio.TimeoutError, Exception) as e:
+            # A failing attempt marks its span as failed
+            with span("attempt", function=func.__name__, attempt=attempt):
+                return await func(*args)
+        # Covers Playwright timeouts, asyncio timeouts and other errors without importing Playwright
+        except Exception as e:
             last_exc = e
             print(f"[{get_timestamp()}]     {Colors.YELLOW}[Attempt {attempt}/{retries}] Error: {type(e).__name__}, retrying in {delay}s…{Colors.END}")
+            deadline = current_deadline()
+            if attempt < retries and deadline is not None and deadline.remaining() <= delay:
+                print(f"[{get_timestamp()}]     {Colors.RED}[Attempt {attempt}/{retries}] Deadline reached, not retrying.{Colors.END}")
+                return TIMEOUT_RESULT
             if attempt < retries:
                 await asyncio.sleep(delay)
             else:
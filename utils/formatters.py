@@ -3,16 +3,33 @@ Data formatting utilities for price standardization and Google Sheets styling.
 
 Provides comprehensive formatting functions for:
 - Price text standardization to consistent EUR format
+- Number formatting of price columns
 - Google Sheets cell formatting with conditional colors
 - Availability data styling and color coding
 - ITScope distributor data formatting with visual indicators
 
+The batchUpdate request bodies are built by pure functions (no worksheet
+access), so they can be benchmarked and reused for batched formatting.
+
 All functions handle edge cases and provide error recovery for robust operation.
 """
 
 import re
 from .colors import Colors
 from .timing import get_timestamp
+from .prices import parse_price, format_price
+
+# Background colors of availability cells
+GREEN = {"red": 0.69, "green": 1.0, "blue": 0.686}
+LIGHT_GREEN = {"red": 0.808, "green": 1.0, "blue": 0.804}
+LIGHT_RED = {"red": 1.0, "green": 0.604, "blue": 0.604}
+LIGHT_YELLOW = {"red": 1.0, "green": 0.812, "blue": 0.55}
+
+# Fields written by the availability formatting requests
+_AVAILABILITY_FIELDS = "userEnteredFormat.backgroundColor,userEnteredFormat.horizontalAlignment,userEnteredFormat.textFormat.bold"
+
+# Availability dates from ITScope, e.g. "24/12/25"
+_ITSCOPE_DATE_PATTERN = re.compile(r'\d{2}/\d{2}/\d{2}')
 
 def standardize_price_format(price_text):
     """
@@ -36,32 +53,56 @@ def standardize_price_format(price_text):
     if not price_text or price_text in ["N/A", "Error in get_price_from_geizhals()", "Error get_price_from_campuspoint()", "Error get_price_from_edustore()", "The product above is not related to this one!"]:
         return price_text
     
-    # Removes any whitespace and non-breaking spaces
-    price_text = price_text.replace('\xa0', ' ').strip()
-    
-    # Extract numbers and decimal separators
-    # Matches patterns like: €867,22 | € 867,22 | 867,22€ | 1.039,00€ | €879,00
-    price_match = re.search(r'[\d.,]+', price_text)
-    
-    if not price_match:
-        return price_text
-    
-    price_number = price_match.group()
+    # Parsing uses the precompiled patterns of the numeric price model
+    price = parse_price(price_text)
+    if price is None:
+        return price_text.replace('\xa0', ' ').strip()
+
+    return format_price(price)
+
+def price_column_format_requests(sheet_id, column_letters):
+    """
+    Build the repeatCell requests applying the euro number format to price columns.
     
-    # Handles thousands separator (dot) and decimal separator (comma)
-    if ',' in price_number and '.' in price_number:
-        # Format like 1.039,00 - dot is thousands separator
-        price_number = price_number.replace('.', '').replace(',', '.')
-    elif ',' in price_number:
-        # Format like 867,22 - comma is decimal separator
-        price_number = price_number.replace(',', '.')
+    Args:
+        sheet_id (int): Worksheet ID
+        column_letters (iterable): Column letters of the price columns
+        
+    Returns:
+        list[dict]: batchUpdate requests, one per column
+    """
+    requests = []
+    for letter in column_letters:
+        column_index = column_letter_to_index(letter)
+        requests.append({
+            "repeatCell": {
+                "range": {
+                    "sheetId": sheet_id,
+                    "startRowIndex": 1,  # Skip header row
+                    "startColumnIndex": column_index,
+                    "endColumnIndex": column_index + 1
+                },
+                "cell": {
+                    "userEnteredFormat": {
+                        "numberFormat": {"type": "CURRENCY", "pattern": '"€" #,##0.00'}
+                    }
+                },
+                "fields": "userEnteredFormat.numberFormat"
+            }
+        })
+    return requests
+
+def column_letter_to_index(letter):
+    """
+    Convert a column letter to a 0-based column index.
     
-    try:
-        # Converts to float and back to standardized format
-        price_float = float(price_number)
-        return f"€ {price_float:,.2f}".replace(',', 'TEMP').replace('.', ',').replace('TEMP', '.')
-    except ValueError:
-        return price_text
+    Examples:
+        "A" -> 0, "F" -> 5, "AA" -> 26
+    """
+    index = 0
+    for char in letter.upper():
+        index = index * 26 + (ord(char) - ord('A') + 1)
+    return index - 1
 
 def format_availability_column(worksheet, row_index, availability_value):
     """
@@ -82,41 +123,8 @@ def format_availability_column(worksheet, row_index, availability_value):
         format_availability_column(worksheet, 5, "Ja")
     """
     try:
-        
-        # Determine the background color based on availability
-        if availability_value == "Ja":
-            background_color = {"red": 0.69, "green": 1.0, "blue": 0.686}  # Green
-
-        elif availability_value == "Vorbestellbar":
-            background_color = {"red": 0.808, "green": 1.0, "blue": 0.804}  # Light green
-
-        elif availability_value == "Nein":
-            background_color = {"red": 1.0, "green": 0.604, "blue": 0.604}  # Light red
-
-        else:
-            background_color = {"red": 1.0, "green": 0.812, "blue": 0.55}  # Light yellow
-        
-        # Create the formatting request
-        requests = [{
-            "repeatCell": {
-                "range": {
-                    "sheetId": worksheet.id,
-                    "startRowIndex": row_index - 1,
-                    "endRowIndex": row_index,
-                    "startColumnIndex": 2,  # Column C (0-indexed, so C = 2)
-                    "endColumnIndex": 3
-                },
-                "cell": {
-                    "userEnteredFormat": {
-                        "backgroundColor": background_color,
-                        "horizontalAlignment": "CENTER"
-                    }
-                },
-                "fields": "userEnteredFormat.backgroundColor,userEnteredFormat.horizontalAlignment,userEnteredFormat.textFormat.bold"
-            }
-        }]
-        
-        body = {"requests": requests}
+        # Column C (0-indexed, so C = 2)
+        body = {"requests": [availability_format_request(worksheet.id, row_index, availability_value, 2)]}
         worksheet.spreadsheet.batch_update(body)
         
     except Exception as e:
@@ -142,42 +150,132 @@ def format_itscope_availability_columns(worksheet, row_index, availability_value
         format_itscope_availability_columns(worksheet, 5, "126 auf Lager", 4)
     """
     try:
+        body = {"requests": [itscope_availability_format_request(worksheet.id, row_index, availability_value, startColumnIndex)]}
+        worksheet.spreadsheet.batch_update(body)
         
-        # Determine the background color based on availability
-        if "auf Lager" in availability_value:
-            background_color = {"red": 0.69, "green": 1.0, "blue": 0.686}  # Green
+    except Exception as e:
+        print(f"[{get_timestamp()}]     {Colors.RED}Error formatting availability cell: {e}{Colors.END}")
 
-        elif re.match(r'\d{2}/\d{2}/\d{2}', availability_value):
-            background_color = {"red": 0.808, "green": 1.0, "blue": 0.804}  # Light green
+def availability_color(availability_value):
+    """
+    Return the background color of an edustore availability value.
+    
+    - Green: In stock ("Ja")
+    - Light Green: Pre-orderable ("Vorbestellbar")
+    - Light Red: Out of stock ("Nein")
+    - Light Yellow: Other status (dates, custom text)
+    """
+    if availability_value == "Ja":
+        return GREEN
+    if availability_value == "Vorbestellbar":
+        return LIGHT_GREEN
+    if availability_value == "Nein":
+        return LIGHT_RED
+    return LIGHT_YELLOW
 
-        elif availability_value == "nicht verfügbar" or availability_value == "no data":
-            background_color = {"red": 1.0, "green": 0.604, "blue": 0.604}  # Light red
+def itscope_availability_color(availability_value):
+    """
+    Return the background color of an ITScope availability value.
+    
+    - Green: In stock (contains "auf Lager")
+    - Light Green: Available on date (DD/MM/YY format)
+    - Light Red: Not available ("nicht verfügbar", "no data")
+    - Light Yellow: Other status (unknown, pending, etc.)
+    """
+    if "auf Lager" in availability_value:
+        return GREEN
+    if _ITSCOPE_DATE_PATTERN.match(availability_value):
+        return LIGHT_GREEN
+    if availability_value == "nicht verfügbar" or availability_value == "no data":
+        return LIGHT_RED
+    return LIGHT_YELLOW
 
-        else:
-            background_color = {"red": 1.0, "green": 0.812, "blue": 0.55}  # Light yellow
+def availability_format_request(sheet_id, row_index, availability_value, column_index):
+    """
+    Build the repeatCell request coloring an edustore availability cell.
+    
+    Args:
+        sheet_id (int): Worksheet ID
+        row_index (int): Row number in the spreadsheet
+        availability_value (str): Stock availability status text
+        column_index (int): 0-based column index of the cell
         
-        # Create the formatting request
-        requests = [{
-            "repeatCell": {
-                "range": {
-                    "sheetId": worksheet.id,
-                    "startRowIndex": row_index - 1,
-                    "endRowIndex": row_index,
-                    "startColumnIndex": startColumnIndex,
-                    "endColumnIndex": startColumnIndex + 1
-                },
-                "cell": {
-                    "userEnteredFormat": {
-                        "backgroundColor": background_color,
-                        "horizontalAlignment": "CENTER"
-                    }
-                },
-                "fields": "userEnteredFormat.backgroundColor,userEnteredFormat.horizontalAlignment,userEnteredFormat.textFormat.bold"
-            }
-        }]
+    Returns:
+        dict: batchUpdate request
+    """
+    return cell_background_request(sheet_id, row_index, column_index, availability_color(availability_value))
+
+def itscope_availability_format_request(sheet_id, row_index, availability_value, column_index):
+    """
+    Build the repeatCell request coloring an ITScope availability cell.
+    
+    Args:
+        sheet_id (int): Worksheet ID
+        row_index (int): Row number in the spreadsheet
+        availability_value (str): Stock availability status from ITScope
+        column_index (int): 0-based column index of the cell
         
-        body = {"requests": requests}
-        worksheet.spreadsheet.batch_update(body)
+    Returns:
+        dict: batchUpdate request
+    """
+    return cell_background_request(sheet_id, row_index, column_index, itscope_availability_color(availability_value))
+
+def cell_background_request(sheet_id, row_index, column_index, background_color):
+    """
+    Build a repeatCell request setting the centered background color of one cell.
+    
+    Args:
+        sheet_id (int): Worksheet ID
+        row_index (int): Row number in the spreadsheet (1-based)
+        column_index (int): 0-based column index
+        background_color (dict): RGB color with "red", "green" and "blue" from 0 to 1
         
-    except Exception as e:
-        print(f"[{get_timestamp()}]     {Colors.RED}Error formatting availability cell: {e}{Colors.END}")
\ No newline at end of file
+    Returns:
+        dict: batchUpdate request
+    """
+    return {
+        "repeatCell": {
+            "range": {
+                "sheetId": sheet_id,
+                "startRowIndex": row_index - 1,
+                "endRowIndex": row_index,
+                "startColumnIndex": column_index,
+                "endColumnIndex": column_index + 1
+            },
+            "cell": {
+                "userEnteredFormat": {
+                    "backgroundColor": background_color,
+                    "horizontalAlignment": "CENTER"
+                }
+            },
+            "fields": _AVAILABILITY_FIELDS
+        }
+    }
+
+
+def cell_note_request(sheet_id, row_index, column_index, note):
+    """
+    Build a repeatCell request setting the note of one cell.
+
+    Args:
+        sheet_id (int): Worksheet ID
+        row_index (int): Row number in the spreadsheet (1-based)
+        column_index (int): 0-based column index
+        note (str): Note text, "" removes the note
+
+    Returns:
+        dict: batchUpdate request
+    """
+    return {
+        "repeatCell": {
+            "range": {
+                "sheetId": sheet_id,
+                "startRowIndex": row_index - 1,
+                "endRowIndex": row_index,
+                "startColumnIndex": column_index,
+                "endColumnIndex": column_index + 1
+            },
+            "cell": {"note": note},
+            "fields": "note"
+        }
+    }
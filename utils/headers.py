@@ -3,12 +3,23 @@ HTTP header generation utilities for web scraping operations.
 
 Provides realistic browser header generation to avoid bot detection
 and ensure successful web scraping across different e-commerce platforms.
-Includes randomized user agents and browser-like request headers.
+Includes randomized user agents and browser-like request headers, and a
+stable per-site header identity that is kept for a whole session.
 """
 
 import random
 from config import USER_AGENTS
 
+# Accept-Language values a session identity is chosen from
+ACCEPT_LANGUAGES = [
+    'en-US,en;q=0.9',
+    'de-DE,de;q=0.9,en;q=0.8',
+    'en-GB,en;q=0.9'
+]
+
+# Header identity per site, chosen once per session
+_session_headers = {}
+
 def get_random_headers(referer=None):
     """
     Generate randomized HTTP headers that mimic real browser requests.
@@ -30,11 +41,7 @@ def get_random_headers(referer=None):
     headers = {
         'User-Agent': random.choice(USER_AGENTS),
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-        'Accept-Language': random.choice([
-            'en-US,en;q=0.9',
-            'de-DE,de;q=0.9,en;q=0.8',
-            'en-GB,en;q=0.9'
-        ]),
+        'Accept-Language': random.choice(ACCEPT_LANGUAGES),
         'Accept-Encoding': 'gzip, deflate, br',
         'Connection': 'keep-alive',
         'Upgrade-Insecure-Requests': '1',
@@ -47,4 +54,27 @@ def get_random_headers(referer=None):
     if referer:
         headers['Referer'] = referer
         
-    return headers
\ No newline at end of file
+    return headers
+
+
+def get_session_headers(site):
+    """
+    Return the stable HTTP header identity of a site for this session.
+    
+    The user agent and language are chosen randomly once per site and then
+    reused for every request, so that consecutive visits look like the same
+    browser instead of a new visitor each time.
+    
+    Args:
+        site (str): Site name, e.g. "geizhals"
+        
+    Returns:
+        dict: HTTP headers without Referer (a copy, safe to modify)
+        
+    Usage:
+        headers = get_session_headers("geizhals")
+        context = await browser.new_context(user_agent=headers["User-Agent"])
+    """
+    if site not in _session_headers:
+        _session_headers[site] = get_random_headers()
+    return dict(_session_headers[site])
@@ -0,0 +1,42 @@
+"""
+Lazy export utilities for package __init__ modules.
+
+Packages that wrap heavy third-party libraries (Playwright, BeautifulSoup,
+gspread, google-auth, requests) export their public names lazily: the
+submodule defining a name is only imported when the name is first used.
+Runs that only need some subsystems therefore start without importing the
+others.
+"""
+
+import importlib
+
+def lazy_exports(package, exports):
+    """
+    Create module-level __getattr__ and __dir__ functions for lazy exports.
+    
+    Args:
+        package (str): Name of the package, usually __name__
+        exports (dict): Mapping of exported names to relative submodule names
+        
+    Returns:
+        tuple: (__getattr__, __dir__) functions to assign in the package
+        
+    Usage:
+        __getattr__, __dir__ = lazy_exports(__name__, {"ITscopeClient": ".client"})
+    """
+    def __getattr__(name):
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+        module = importlib.import_module(module_name, package)
+        value = getattr(module, name)
+
+        # Cache on the package so later lookups bypass __getattr__
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(importlib.import_module(package))) | set(exports))
+
+    return __getattr__, __dir__
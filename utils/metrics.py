@@ -0,0 +1,79 @@
+"""
+Run metrics collected across all modules and printed as a run report.
+
+Modules count events of interest (shared fetches, cache hits, browser
+restarts, ...) under dotted names like "coalescing.geizhals.shared". At the
+end of a run the counters are printed grouped by their first name part.
+"""
+
+from collections import defaultdict
+from .colors import Colors
+from .timing import get_timestamp
+
+class RunMetrics:
+    """
+    Counters and gauges of the current run.
+
+    Attributes:
+        counters (dict): Mapping of metric name to its current value
+    """
+
+    def __init__(self):
+        """Create an empty metrics registry."""
+        self.counters = defaultdict(int)
+
+    def increment(self, name, amount=1):
+        """Add amount to the counter name."""
+        self.counters[name] += amount
+
+    def set(self, name, value):
+        """Set the gauge name to value, replacing the previous value."""
+        self.counters[name] = value
+
+    def get(self, name, default=0):
+        """Return the current value of a metric."""
+        return self.counters.get(name, default)
+
+    def report(self):
+        """
+        Print all metrics grouped by the first part of their name.
+
+        Usage:
+            get_metrics().report()
+        """
+        if not self.counters:
+            return
+
+        print(f"[{get_timestamp()}] {Colors.YELLOW}Run report:{Colors.END}")
+        groups = defaultdict(list)
+        for name in sorted(self.counters):
+            group, _, rest = name.partition(".")
+            groups[group].append((rest or group, self.counters[name]))
+
+        for group, values in groups.items():
+            details = ", ".join(f"{name}={_format_value(value)}" for name, value in values)
+            print(f"[{get_timestamp()}]     {Colors.CYAN}{group}: {details}{Colors.END}")
+
+    def reset(self):
+        """Remove all metrics."""
+        self.counters.clear()
+
+
+def _format_value(value):
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+
+# Metrics of the current process
+_metrics = RunMetrics()
+
+def get_metrics():
+    """
+    Return the metrics registry shared by all modules.
+
+    Returns:
+        RunMetrics: Process-wide metrics
+
+    Usage:
+        get_metrics().increment("coalescing.geizhals.fetches")
+    """
+    return _metrics
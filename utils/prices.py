@@ -0,0 +1,277 @@
+"""
+Numeric price model and price normalization utilities.
+
+Scraped prices are represented internally as a Decimal amount plus currency
+instead of preformatted display strings. Status and error outcomes (no URL,
+no listings, scraper errors) are kept in a separate status field rather than
+being mixed into the price values as magic strings.
+
+Provides:
+- Price: Decimal amount and currency of a parsed price
+- PriceResult: Normalized price with status, ready for the spreadsheet
+- parse_price / to_price: Precompiled parsing of scraped price text
+- normalize_price_batch / normalize_prices: Batch normalization of results
+
+Rows are written as soon as they are scraped, so results are normalized per
+row; identical texts (status messages, prices shared by SKU variants) are
+parsed once per run through a bounded memo instead.
+"""
+
+import re
+from functools import lru_cache
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+from .settings import get_setting
+
+# Precompiled patterns shared by all parsing calls
+_NUMBER_PATTERN = re.compile(r'\d[\d.,]*')
+_DASH_CENTS_PATTERN = re.compile(r'(?<=\d)[.,]\s?[-–]+')
+_THOUSANDS_PATTERN = re.compile(r'^[1-9]\d{0,2}[.,]\d{3}$')
+_CURRENCY_PATTERN = re.compile(r'€|EUR|CHF|£|GBP|\$|USD')
+_CURRENCY_CODES = {"€": "EUR", "£": "GBP", "$": "USD"}
+_CENT = Decimal("0.01")
+
+# Result status values
+STATUS_OK = "ok"
+STATUS_NO_URL = "no_url"
+STATUS_NOT_APPLICABLE = "not_applicable"
+STATUS_NO_LISTINGS = "no_listings"
+STATUS_UNPARSEABLE = "unparseable"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+
+# Text shown in the spreadsheet for results without a price
+STATUS_LABELS = {
+    STATUS_NO_URL: "No valid URL",
+    STATUS_NOT_APPLICABLE: "N/A",
+    STATUS_NO_LISTINGS: "No listings",
+    STATUS_ERROR: "Error",
+    STATUS_TIMEOUT: "Timeout"
+}
+
+# Legacy status strings returned by scrapers and the retry helper
+_STATUS_STRINGS = {
+    "No valid URL": STATUS_NO_URL,
+    "N/A": STATUS_NOT_APPLICABLE,
+    "No listings": STATUS_NO_LISTINGS,
+    "Timeout": STATUS_TIMEOUT
+}
+_ERROR_PREFIXES = ("Error", "Failed after")
+
+# Columns holding prices, Geizhals competitor columns are added from config
+PRICE_KEYS = ("Geizhals Preis", "Campuspoint Preis", "edustore VK")
+
+
+@dataclass(frozen=True)
+class Price:
+    """
+    Parsed price with Decimal amount and ISO currency code.
+
+    Attributes:
+        amount (Decimal): Price amount rounded to cents
+        currency (str): ISO 4217 currency code (default: EUR)
+    """
+    amount: Decimal
+    currency: str = "EUR"
+
+    def __str__(self):
+        return format_price(self)
+
+
+@dataclass(frozen=True)
+class PriceResult:
+    """
+    Normalized scrape result for a price column.
+
+    Attributes:
+        price (Price | None): Parsed price, None unless status is STATUS_OK
+        status (str): One of the STATUS_* values
+        detail (str): Original text for unparseable values or error details
+    """
+    price: Optional[Price]
+    status: str
+    detail: str = ""
+
+    @property
+    def ok(self):
+        return self.status == STATUS_OK
+
+    def cell_value(self):
+        """
+        Value to write to the spreadsheet: a number for euro prices, text otherwise.
+
+        Price columns are formatted as euro amounts, so prices in other
+        currencies are written as text with their currency code instead.
+        """
+        if self.ok:
+            if self.price.currency != "EUR":
+                return format_price(self.price)
+            return float(self.price.amount)
+        return STATUS_LABELS.get(self.status, self.detail)
+
+
+def parse_price(price_text) -> Optional[Price]:
+    """
+    Parse scraped price text into a Price.
+
+    Handles German (1.039,00) and English (1,039.00) separators; the last
+    separator followed by digits is treated as the decimal separator when
+    both occur. Whole-euro prices written with a dash for the cents
+    (2.499,-) and a single separator after a non-zero group and followed
+    by exactly three digits (1.039, 1,039) are read as thousands; 0.999
+    stays a decimal.
+
+    Args:
+        price_text (str): Raw price text from web scraping
+
+    Returns:
+        Price | None: Parsed price, or None if no number was found
+
+    Examples:
+        "867,22€" -> Price(Decimal("867.22"), "EUR")
+        "€ 1.039,00" -> Price(Decimal("1039.00"), "EUR")
+        "1039.00 EUR" -> Price(Decimal("1039.00"), "EUR")
+        "ab € 1.299,-" -> Price(Decimal("1299.00"), "EUR")
+    """
+    if not price_text:
+        return None
+
+    # ",-" marks a whole-euro price and must not leave a trailing separator behind
+    price_text = _DASH_CENTS_PATTERN.sub('', price_text.replace('\xa0', ' '))
+    match = _NUMBER_PATTERN.search(price_text)
+    if not match:
+        return None
+
+    number = match.group().rstrip('.,')
+    if ',' in number and '.' in number:
+        if number.rfind(',') > number.rfind('.'):
+            # Format like 1.039,00 - dot is thousands separator
+            number = number.replace('.', '').replace(',', '.')
+        else:
+            # Format like 1,039.00 - comma is thousands separator
+            number = number.replace(',', '')
+    elif number.count(',') > 1 or number.count('.') > 1 or _THOUSANDS_PATTERN.match(number):
+        # Format like 1.039.000, 1.039 or 1,039 - separators are thousands separators
+        number = number.replace('.', '').replace(',', '')
+    elif ',' in number:
+        # Format like 867,22 - comma is decimal separator
+        number = number.replace(',', '.')
+
+    try:
+        amount = Decimal(number).quantize(_CENT)
+    except InvalidOperation:
+        return None
+
+    currency = _CURRENCY_PATTERN.search(price_text)
+    code = _CURRENCY_CODES.get(currency.group(), currency.group()) if currency else "EUR"
+
+    return Price(amount, code)
+
+
+def to_price(price_text):
+    """
+    Convert scraped price text to a Price, keeping the text if it cannot be parsed.
+
+    Args:
+        price_text (str): Raw price text from web scraping
+
+    Returns:
+        Price | str: Parsed price or the stripped original text
+    """
+    price = parse_price(price_text)
+    if price is None:
+        return (price_text or "").replace('\xa0', ' ').strip()
+    return price
+
+
+def format_price(price: Price) -> str:
+    """
+    Format a Price for display as '€ 1.234,56'.
+
+    Args:
+        price (Price): Price to format
+
+    Returns:
+        str: Price with currency symbol, dot thousands and comma decimal separators
+    """
+    number = f"{price.amount:,.2f}".replace(',', 'TEMP').replace('.', ',').replace('TEMP', '.')
+    symbol = "€" if price.currency == "EUR" else price.currency
+    return f"{symbol} {number}"
+
+
+def normalize_price(value) -> PriceResult:
+    """
+    Normalize a single scrape result into a PriceResult.
+
+    Accepts Price objects, numbers, price text and the legacy status
+    strings returned by scrapers ("N/A", "No listings", "Error ...").
+
+    Args:
+        value: Raw scrape result
+
+    Returns:
+        PriceResult: Normalized result with status
+    """
+    if isinstance(value, PriceResult):
+        return value
+    if isinstance(value, Price):
+        return PriceResult(value, STATUS_OK)
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return PriceResult(Price(Decimal(str(value)).quantize(_CENT)), STATUS_OK)
+    if value is None:
+        return PriceResult(None, STATUS_ERROR, "no result")
+    return _normalize_text(str(value).strip())
+
+
+@lru_cache(maxsize=4096)
+def _normalize_text(text):
+    # Results are immutable, so one instance per distinct text serves the whole run
+    if text in _STATUS_STRINGS:
+        return PriceResult(None, _STATUS_STRINGS[text], text)
+    if text.startswith(_ERROR_PREFIXES):
+        return PriceResult(None, STATUS_ERROR, text)
+
+    price = parse_price(text)
+    if price is None:
+        return PriceResult(None, STATUS_UNPARSEABLE, text)
+    return PriceResult(price, STATUS_OK)
+
+
+def normalize_price_batch(values) -> list:
+    """
+    Normalize many scrape results at once.
+
+    Identical raw strings (status messages, repeated prices of SKU variants)
+    are parsed only once per run.
+
+    Args:
+        values (iterable): Raw scrape results
+
+    Returns:
+        list[PriceResult]: Normalized results in input order
+    """
+    return [normalize_price(value) for value in values]
+
+
+def price_keys() -> tuple:
+    """Return the result keys that hold prices, including configured Geizhals competitors."""
+    return PRICE_KEYS + tuple(f"Geizhals {name}" for name in get_setting("GEIZHALS_COMPETITORS", []))
+
+
+def normalize_prices(prices: dict) -> dict:
+    """
+    Normalize the price columns of collected results.
+
+    Args:
+        prices (dict): Collected results keyed by column name
+
+    Returns:
+        dict: Mapping of price column names to PriceResult
+
+    Usage:
+        normalized = normalize_prices(prices)
+        value = normalized["Geizhals Preis"].cell_value()
+    """
+    keys = [key for key in price_keys() if key in prices]
+    return dict(zip(keys, normalize_price_batch(prices[key] for key in keys)))
@@ -0,0 +1,310 @@
+"""
+Sampling profiler for the asyncio based price bot (--profile).
+
+cProfile attributes the time of suspended coroutines to whatever resumes
+them and hides where the event loop is blocked. This profiler instead
+samples the stacks of all threads from a background thread at a fixed
+interval and writes:
+- <prefix>.txt: a report with the hottest functions (self and total time),
+  the event loop time per asyncio task and per thread
+- <prefix>.folded: folded stacks ("a;b;c count"), readable by flamegraph.pl,
+  speedscope and other flamegraph viewers
+
+Event loop blocking is flagged automatically: stretches in which the loop
+thread does not get back to its selector for at least the slow-callback
+threshold (PROFILE_SLOW_CALLBACK, default 0.1 s) are listed with the code
+that was running, e.g. sync requests or gspread calls. The loop runs in
+asyncio debug mode with the same slow_callback_duration, so asyncio's own
+slow-callback warnings are collected in the report as well.
+
+Usage:
+    python main.py --profile
+    python main.py --profile runs/profile
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter, defaultdict
+from .colors import Colors
+from .timing import get_timestamp
+from .settings import get_setting
+
+# Repository root, frames below it are shown with relative paths and count as our own code
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Deepest stack recorded per sample
+_MAX_DEPTH = 128
+
+class AsyncProfiler:
+    """
+    Samples all thread stacks and attributes event loop time to asyncio tasks.
+
+    Attributes:
+        interval (float): Seconds between samples
+        slow_callback (float): Seconds the loop may run without yielding before it counts as blocked
+    """
+
+    def __init__(self, interval=None, slow_callback=None):
+        """Create a stopped profiler, defaults come from PROFILE_INTERVAL and PROFILE_SLOW_CALLBACK."""
+        self.interval = interval or get_setting("PROFILE_INTERVAL", 0.005)
+        self.slow_callback = slow_callback or get_setting("PROFILE_SLOW_CALLBACK", 0.1)
+
+        self.samples = 0
+        self.stacks = Counter()            # (thread name, stack) -> samples
+        self.tasks = Counter()             # task name -> busy loop samples
+        self.loop_busy = 0
+        self.loop_idle = 0
+        self.blocks = []                   # (seconds, stack) of blocked loop stretches
+        self.slow_callbacks = []           # asyncio debug messages
+        self.own_labels = set()            # Stack labels of repository code
+
+        self._loop = None
+        self._loop_thread = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._busy_since = None
+        self._busy_stacks = Counter()
+        self._started = None
+        self._elapsed = 0.0
+        self._log_handler = None
+
+    def start(self, loop):
+        """
+        Start sampling; must be called from the thread running the loop.
+
+        Args:
+            loop (asyncio.AbstractEventLoop): Loop whose tasks and blocking are tracked
+        """
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+
+        # asyncio reports callbacks slower than the threshold in debug mode
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.slow_callback
+        self._log_handler = _SlowCallbackHandler(self.slow_callbacks)
+        logging.getLogger("asyncio").addHandler(self._log_handler)
+
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and restore the loop settings."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._elapsed = time.perf_counter() - self._started
+        self._end_busy_streak(time.perf_counter())
+
+        logging.getLogger("asyncio").removeHandler(self._log_handler)
+        self._loop.set_debug(False)
+
+    def write(self, prefix):
+        """
+        Write the text report and the folded stacks.
+
+        Args:
+            prefix (str): Output path without extension
+
+        Returns:
+            tuple: Paths of the report and the folded stacks file
+        """
+        report_path, folded_path = f"{prefix}.txt", f"{prefix}.folded"
+        directory = os.path.dirname(report_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(self.report())
+        with open(folded_path, "w", encoding="utf-8") as f:
+            for (thread_name, stack), count in sorted(self.stacks.items()):
+                f.write(";".join((thread_name,) + stack) + f" {count}\n")
+
+        print(f"[{get_timestamp()}] {Colors.YELLOW}Profile written to {report_path} and {folded_path}{Colors.END}")
+        return report_path, folded_path
+
+    def report(self):
+        """Return the profile report as text."""
+        # Sampling is slower than the interval while the GIL is busy, so time per sample is measured
+        ms = self._elapsed * 1000 / self.samples if self.samples else self.interval * 1000
+        lines = [f"Profile of {self._elapsed:.1f}s, {self.samples} samples, {ms:.1f} ms per sample", ""]
+
+        loop_samples = self.loop_busy + self.loop_idle
+        if loop_samples:
+            lines.append(f"Event loop: busy {self.loop_busy / loop_samples:.1%}, idle {self.loop_idle / loop_samples:.1%}")
+        lines.append("")
+
+        blocked = defaultdict(lambda: [0, 0.0])
+        for seconds, stack in self.blocks:
+            culprit = _culprit(stack, self.own_labels)
+            blocked[culprit][0] += 1
+            blocked[culprit][1] += seconds
+        lines.append(f"Event loop blocked for >= {self.slow_callback * 1000:g} ms ({len(self.blocks)} times, "
+                     f"{sum(seconds for seconds, _ in self.blocks):.2f}s in total):")
+        for culprit, (count, seconds) in sorted(blocked.items(), key=lambda item: -item[1][1])[:20]:
+            lines.append(f"  {seconds:8.2f}s {count:5d}x  {culprit}")
+        lines.append("")
+
+        if self.slow_callbacks:
+            lines.append(f"Slow callbacks reported by asyncio ({len(self.slow_callbacks)}):")
+            for message, count in Counter(self.slow_callbacks).most_common(20):
+                lines.append(f"  {count:5d}x  {message}")
+            lines.append("")
+
+        own, total = Counter(), Counter()
+        for (_, stack), count in self.stacks.items():
+            if stack[-1] == "<idle>":
+                continue
+            own[stack[-1]] += count
+            for function in set(stack):
+                total[function] += count
+        lines.append("Functions by own time (all threads, waiting excluded):")
+        lines.append(f"  {'own ms':>10} {'total ms':>10}  function")
+        for function, count in own.most_common(40):
+            lines.append(f"  {count * ms:10.0f} {total[function] * ms:10.0f}  {function}")
+        lines.append("")
+
+        lines.append("Event loop time by task:")
+        for task_name, count in self.tasks.most_common(40):
+            lines.append(f"  {count * ms:10.0f} ms  {task_name}")
+        lines.append("")
+
+        threads = Counter()
+        for (thread_name, _), count in self.stacks.items():
+            threads[thread_name] += count
+        lines.append("Samples by thread:")
+        for thread_name, count in threads.most_common():
+            lines.append(f"  {count * ms:10.0f} ms  {thread_name}")
+
+        return "\n".join(lines) + "\n"
+
+    def _run(self):
+        sampler = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(sampler)
+
+    def _sample(self, sampler):
+        now = time.perf_counter()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        self.samples += 1
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == sampler:
+                continue
+            stack = _stack(frame, self.own_labels)
+
+            if thread_id == self._loop_thread:
+                thread_name = "event-loop"
+                if _is_idle(frame):
+                    stack = stack + ("<idle>",)
+                    self.loop_idle += 1
+                    self._end_busy_streak(now)
+                else:
+                    self.loop_busy += 1
+                    task = asyncio.current_task(self._loop)
+                    self.tasks[task.get_name() if task is not None else "<callbacks>"] += 1
+                    if self._busy_since is None:
+                        self._busy_since = now
+                    self._busy_stacks[stack] += 1
+            else:
+                thread_name = names.get(thread_id, f"thread-{thread_id}")
+                if _is_waiting(frame):
+                    stack = stack + ("<idle>",)
+
+            self.stacks[(thread_name, stack)] += 1
+
+    def _end_busy_streak(self, now):
+        # A busy stretch of the loop thread ended, keep it if it blocked the loop
+        if self._busy_since is not None and now - self._busy_since >= self.slow_callback:
+            stack, _ = self._busy_stacks.most_common(1)[0]
+            self.blocks.append((now - self._busy_since, stack))
+        self._busy_since = None
+        self._busy_stacks.clear()
+
+
+class _SlowCallbackHandler(logging.Handler):
+    # Collects asyncio's "Executing <Handle ...> took 0.250 seconds" warnings
+
+    def __init__(self, messages):
+        super().__init__(logging.WARNING)
+        self.messages = messages
+
+    def emit(self, record):
+        message = record.getMessage()
+        if message.startswith("Executing"):
+            # Group the same callback: drop the duration at the end and the long future details
+            self.messages.append(message.rsplit(" took ", 1)[0].split(" wait_for=", 1)[0][:200])
+
+
+def _stack(frame, own_labels):
+    # Function labels from the outermost to the innermost frame, labels of repository code are added to own_labels
+    stack = []
+    while frame is not None and len(stack) < _MAX_DEPTH:
+        code = frame.f_code
+        filename = code.co_filename
+        if filename.startswith(_ROOT + os.sep) and "site-packages" not in filename:
+            label = f"{code.co_name} ({os.path.relpath(filename, _ROOT)}:{code.co_firstlineno})"
+            own_labels.add(label)
+        else:
+            label = f"{code.co_name} ({_library_path(filename)}:{code.co_firstlineno})"
+        stack.append(label)
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+def _library_path(filename):
+    # Path of library code below site-packages or the stdlib directory, e.g. "requests/api.py"
+    parts = filename.split(os.sep)
+    for index in range(len(parts) - 1, -1, -1):
+        if parts[index] == "site-packages" or parts[index].startswith("python3"):
+            return "/".join(parts[index + 1:])
+    return os.path.basename(filename)
+
+
+def _is_idle(frame):
+    # The loop thread waits for I/O in the selector (selectors.py) when nothing is ready
+    return os.path.basename(frame.f_code.co_filename) == "selectors.py"
+
+
+def _is_waiting(frame):
+    # Worker threads waiting for work or a lock (e.g. the sheet writer's queue)
+    return os.path.basename(frame.f_code.co_filename) in ("selectors.py", "threading.py", "queue.py")
+
+
+def _culprit(stack, own_labels):
+    # Innermost frame overall (e.g. the blocking library call) and the innermost frame of our code calling it
+    leaf = stack[-1]
+    own = next((label for label in reversed(stack) if label in own_labels), None)
+    if own is None or own == leaf:
+        return leaf
+    return f"{leaf} <- {own}"
+
+
+async def run_profiled(coro, prefix):
+    """
+    Run a coroutine under the sampling profiler and write the profile.
+
+    Args:
+        coro: Coroutine to run, e.g. main_async()
+        prefix (str): Output path without extension
+
+    Returns:
+        The result of the coroutine
+
+    Usage:
+        asyncio.run(run_profiled(main_async(), "price_bot_profile"))
+    """
+    asyncio.current_task().set_name("main")
+    profiler = AsyncProfiler()
+    profiler.start(asyncio.get_running_loop())
+    try:
+        return await coro
+    finally:
+        profiler.stop()
+        profiler.write(prefix)
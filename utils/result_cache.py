@@ -0,0 +1,313 @@
+"""
+Persistent stale-while-revalidate cache of shop scraper results.
+
+Good results of the shop scrapers are kept per source and normalized URL
+in a local JSON file across runs, so a slow or failing shop never replaces
+a good price in the spreadsheet with an error string:
+- Hard failures (error, retry and timeout results) fall back to the last
+  good value, however old, with an age marker
+- Fresh hits (younger than RESULT_CACHE_FRESH_TTL) are used directly
+- Stale hits (younger than RESULT_CACHE_STALE_TTL) are served at once and
+  refreshed in the background for later rows and runs
+
+Both TTLs default to 0, so every run scrapes all shop results again and the
+cache only stands in for failed scrapes. Runs with --refresh ignore
+configured TTLs the same way.
+
+Served cached values carry a note text that is written as cell note next
+to the value; live results carry an empty note, which removes old markers.
+The cache also remembers the note last written to each cell, so a note is
+only sent to the spreadsheet when it changes.
+Entries older than RESULT_CACHE_MAX_AGE are dropped when the cache is loaded.
+Hits, refreshes and fallbacks are counted in the run metrics under
+"result_cache.<source>".
+"""
+
+import os
+import json
+import time
+import asyncio
+from datetime import datetime
+from typing import Any, NamedTuple, Optional
+from .colors import Colors
+from .timing import get_timestamp
+from .urls import normalize_url
+from .metrics import get_metrics
+from .settings import get_setting
+from .deadline import deadline_scope
+
+# Result prefixes of scrapers, the retry helper and deadlines that mark a hard failure
+_FAILURE_PREFIXES = ("Error", "Failed after", "Timeout")
+
+# Key of the cell notes in the result dict of process_sku()
+CELL_NOTES_KEY = "_notes"
+
+class CachedResult(NamedTuple):
+    """
+    Result of ResultCache.fetch().
+
+    Attributes:
+        value: Scrape result (possibly from the cache)
+        state (str): "live", "fresh", "stale", "fallback" or "failed"
+        fetched_at (float | None): Unix time the value was scraped, None for failures
+    """
+    value: Any
+    state: str
+    fetched_at: Optional[float] = None
+
+    @property
+    def note(self):
+        """Cell note marking values older than this run, "" for live and fresh values."""
+        if self.state not in ("stale", "fallback"):
+            return ""
+        scraped = datetime.fromtimestamp(self.fetched_at).strftime("%Y-%m-%d %H:%M")
+        if self.state == "fallback":
+            return f"Letzter gültiger Wert vom {scraped}, aktueller Abruf fehlgeschlagen"
+        return f"Zwischengespeicherter Wert vom {scraped}, wird aktualisiert"
+
+
+class ResultCache:
+    """
+    Per-URL cache of shop scraper results with freshness and stale TTLs.
+
+    Attributes:
+        path (str): Location of the JSON cache file
+        fresh_ttl (float): Seconds a result is used without scraping again
+        stale_ttl (float): Seconds a result is served while it is refreshed
+    """
+
+    def __init__(self, path, fresh_ttl=0, stale_ttl=0):
+        """Create an empty cache stored at the given path."""
+        self.path = path
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self._entries = {}
+        # Note last written per spreadsheet cell, cells without a note are not listed
+        self._notes = {}
+        self._refreshing = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path, fresh_ttl=0, stale_ttl=0, max_age=30 * 86400):
+        """
+        Load a cache from disk, dropping entries older than max_age seconds.
+
+        Returns an empty cache if the file does not exist, cannot be read
+        or holds no JSON object; malformed entries are skipped.
+
+        Usage:
+            cache = ResultCache.load("price_bot_results.json")
+        """
+        cache = cls(path, fresh_ttl, stale_ttl)
+        if not os.path.exists(path):
+            return cache
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[{get_timestamp()}] {Colors.RED}Could not read result cache {path}: {e}{Colors.END}")
+            return cache
+
+        if not isinstance(data, dict):
+            print(f"[{get_timestamp()}] {Colors.RED}Ignoring result cache {path}: not a JSON object{Colors.END}")
+            return cache
+
+        # Files written before cell notes were tracked hold the results only
+        entries = data.get("results") if isinstance(data.get("results"), dict) else data
+        notes = data.get("notes") if isinstance(data.get("notes"), dict) else {}
+        cache._notes = {cell: note for cell, note in notes.items() if isinstance(note, str) and note}
+
+        oldest = time.time() - max_age
+        cache._entries = {key: entry for key, entry in entries.items() if _valid_entry(entry) and entry["fetched_at"] >= oldest}
+        cache._dirty = len(cache._entries) != len(entries)
+        print(f"[{get_timestamp()}] {Colors.YELLOW}Loaded {len(cache._entries)} cached scrape results{Colors.END}")
+        return cache
+
+    def fresh(self, source, url):
+        """Return True if a result younger than the freshness TTL is cached."""
+        entry = self._entries.get(_key(source, url))
+        return entry is not None and time.time() - entry["fetched_at"] <= self.fresh_ttl
+
+    def note_changed(self, cell, note):
+        """
+        Record the note written to a cell, returning whether it differs from the last one.
+
+        Args:
+            cell (str): Cell identifier, e.g. "Preisliste/Notebooks!D5"
+            note (str): Note of the cell's new value, "" for none
+
+        Returns:
+            bool: True if the note has to be written (or removed) in the spreadsheet
+        """
+        if self._notes.get(cell, "") == note:
+            return False
+        if note:
+            self._notes[cell] = note
+        else:
+            self._notes.pop(cell, None)
+        self._dirty = True
+        return True
+
+    async def fetch(self, source, url, fetch):
+        """
+        Return the result for a URL, from the cache or by scraping it.
+
+        Args:
+            source (str): Source name, part of the key and the metric name
+            url (str): URL the result is for
+            fetch: Zero-argument callable returning an awaitable scrape result
+
+        Returns:
+            CachedResult: The result, its cache state and its scrape time
+
+        Usage:
+            result = await cache.fetch("geizhals", url, lambda: flight.do("geizhals", url, ...))
+        """
+        key = _key(source, url)
+        metrics = get_metrics()
+        entry = self._entries.get(key)
+        age = time.time() - entry["fetched_at"] if entry is not None else None
+
+        if entry is not None and age <= self.fresh_ttl:
+            metrics.increment(f"result_cache.{source}.fresh")
+            return CachedResult(entry["value"], "fresh", entry["fetched_at"])
+
+        if entry is not None and age <= self.stale_ttl:
+            # Serve the stale value now, later rows and runs get the refreshed one
+            metrics.increment(f"result_cache.{source}.stale")
+            if key not in self._refreshing:
+                self._refreshing[key] = asyncio.create_task(self._refresh(key, source, fetch))
+            return CachedResult(entry["value"], "stale", entry["fetched_at"])
+
+        result = await fetch()
+        if not is_failure_result(result):
+            self._store(key, result)
+            metrics.increment(f"result_cache.{source}.misses")
+            return CachedResult(result, "live", self._entries[key]["fetched_at"])
+
+        return self.fallback(source, url) or CachedResult(result, "failed")
+
+    def fallback(self, source, url):
+        """
+        Return the last good result of a URL after its scrape failed or timed out.
+
+        Returns:
+            CachedResult | None: Cached value in state "fallback", None if nothing is cached
+        """
+        entry = self._entries.get(_key(source, url))
+        if entry is None:
+            get_metrics().increment(f"result_cache.{source}.failures")
+            return None
+
+        age = time.time() - entry["fetched_at"]
+        print(f"[{get_timestamp()}]     {Colors.YELLOW}Using last good {source} result from {age / 3600:.1f}h ago for {url}{Colors.END}")
+        get_metrics().increment(f"result_cache.{source}.fallbacks")
+        return CachedResult(entry["value"], "fallback", entry["fetched_at"])
+
+    async def close(self, timeout=60):
+        """
+        Wait for background refreshes, at most timeout seconds, and save the cache.
+
+        Usage:
+            await get_result_cache().close()
+        """
+        tasks = list(self._refreshing.values())
+        if tasks:
+            print(f"[{get_timestamp()}] {Colors.YELLOW}Waiting for {len(tasks)} background refreshes{Colors.END}")
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+        self.save()
+
+    def save(self):
+        """Atomically write the cache to disk if it changed."""
+        if not self._dirty:
+            return
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"results": self._entries, "notes": self._notes}, f, ensure_ascii=False, separators=(",", ":"), default=str)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"[{get_timestamp()}] {Colors.RED}Could not save result cache {self.path}: {e}{Colors.END}")
+
+    async def _refresh(self, key, source, fetch):
+        try:
+            # Background work is not bound to the deadline of the row that started it
+            with deadline_scope(None):
+                result = await fetch()
+            if is_failure_result(result):
+                get_metrics().increment(f"result_cache.{source}.refresh_failures")
+            else:
+                self._store(key, result)
+                get_metrics().increment(f"result_cache.{source}.refreshes")
+        except Exception as e:
+            print(f"[{get_timestamp()}]     {Colors.RED}Background refresh of {key} failed: {e}{Colors.END}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    def _store(self, key, value):
+        # Values go through JSON like the run checkpoint, so Price objects become price text
+        self._entries[key] = {"value": json.loads(json.dumps(value, default=str)), "fetched_at": time.time()}
+        self._dirty = True
+
+
+def _key(source, url):
+    return f"{source} {normalize_url(url)}"
+
+
+def _valid_entry(entry):
+    # Entries of hand-edited or older cache files may lack fields or have other types
+    return (isinstance(entry, dict) and "value" in entry
+            and isinstance(entry.get("fetched_at"), (int, float)) and not isinstance(entry["fetched_at"], bool))
+
+
+def is_failure_result(result):
+    """Whether a scraper result is a failure (error, exhausted retries or timeout) rather than a value."""
+    return isinstance(result, str) and result.startswith(_FAILURE_PREFIXES)
+
+
+# Cache of the current process, None when results are not cached (e.g. --replay)
+_cache = None
+
+def open_result_cache(path=None, refresh=False):
+    """
+    Load the result cache used by the scrapers of this process.
+
+    Args:
+        path (str, optional): Cache file, defaults to the RESULT_CACHE_FILE setting
+        refresh (bool): Scrape every result again, ignoring the configured TTLs;
+            cached values are still used when a scrape fails
+
+    Returns:
+        ResultCache: The loaded cache
+
+    Usage:
+        open_result_cache()
+    """
+    global _cache
+    _cache = ResultCache.load(
+        path or get_setting("RESULT_CACHE_FILE", "price_bot_results.json"),
+        fresh_ttl=0 if refresh else get_setting("RESULT_CACHE_FRESH_TTL", 0),
+        stale_ttl=0 if refresh else get_setting("RESULT_CACHE_STALE_TTL", 0),
+        max_age=get_setting("RESULT_CACHE_MAX_AGE", 30 * 86400)
+    )
+    return _cache
+
+
+def get_result_cache():
+    """Return the open result cache, or None if results are not cached."""
+    return _cache
+
+
+async def close_result_cache():
+    """Finish background refreshes and save the result cache of this process, if any."""
+    global _cache
+    if _cache is not None:
+        await _cache.close()
+        _cache = None
@@ -0,0 +1,26 @@
+"""
+Optional configuration lookup utilities.
+
+Provides access to optional settings in the local config module. Core
+settings (COLUMN_MAP, SEMAPHORE_LIMIT, GOOGLE_SHEETS_CONFIG, USER_AGENTS)
+are imported directly; newer optional features read their settings through
+get_setting() so that existing config files keep working unchanged.
+"""
+
+import config
+
+def get_setting(name, default=None):
+    """
+    Read an optional setting from the config module.
+
+    Args:
+        name (str): Name of the setting in config.py
+        default: Value returned when the setting is not defined
+
+    Returns:
+        The configured value, or the default if the setting is missing
+
+    Usage:
+        path = get_setting("CHECKPOINT_FILE", "price_bot_checkpoint.json")
+    """
+    return getattr(config, name, default)
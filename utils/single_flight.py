@@ -0,0 +1,139 @@
+"""
+Single-flight request coalescing for scrapers.
+
+Several spreadsheet rows can point at the same product page (bundles and
+variants that map to one listing). Requests are keyed by source and
+normalized URL (ITScope lookups by base SKU), so within a run:
+- Concurrent requests for the same key share one in-flight fetch
+- Repeated requests reuse the result of the earlier fetch, as long as it
+  is among the COALESCING_RESULTS (default 256) most recently used ones
+
+Rows are processed in base-SKU order, so duplicates are usually close to
+each other; keeping only recent results bounds memory for large catalogs.
+
+Failed fetches (exceptions, error or timeout results) are shared with
+requests that were already waiting for them, but are not kept, so a later
+row tries again. A fetch is cancelled once every request waiting for it was
+cancelled, e.g. because their row deadlines ran out.
+Fetches, shared in-flight joins and reused results are counted in the run
+metrics under "coalescing.<source>", and every request is traced as a
+"scrape" span with its source, URL, coalescing role and outcome.
+"""
+
+import asyncio
+from collections import OrderedDict
+from .settings import get_setting
+from .urls import normalize_url
+from .metrics import get_metrics
+from .tracing import span
+from .result_cache import is_failure_result
+
+class SingleFlight:
+    """
+    Coalesces async fetches with the same key.
+
+    Attributes:
+        name (str): Metric group of the counters ("coalescing")
+        max_results (int): Number of finished results kept for reuse
+    """
+
+    def __init__(self, name="coalescing", max_results=None):
+        """Create an empty coalescing group, max_results defaults to the COALESCING_RESULTS setting (256)."""
+        self.name = name
+        self.max_results = max_results if max_results is not None else get_setting("COALESCING_RESULTS", 256)
+        self._inflight = {}
+        # Finished results, least recently used first
+        self._results = OrderedDict()
+        # Number of requests waiting for each in-flight fetch
+        self._waiters = {}
+
+    async def do(self, source, url, func, *args):
+        """
+        Run func(*args) once per (source, normalized URL) and share its result.
+
+        Args:
+            source (str): Source name, part of the key and the metric name
+            url (str): URL the fetch is for
+            func: Async function performing the fetch
+            *args: Arguments passed to func
+
+        Returns:
+            The result of the (possibly shared) fetch
+
+        Usage:
+            offers = await flight.do("geizhals", url, retry_after_timeout, get_offers_from_geizhals, url, semaphore)
+        """
+        key = (source, normalize_url(url))
+        metrics = get_metrics()
+
+        with span("scrape", source=source, url=url) as current:
+            if key in self._results:
+                self._results.move_to_end(key)
+                metrics.increment(f"{self.name}.{source}.reused")
+                current.set(coalescing="reused", outcome=_outcome(self._results[key]))
+                return self._results[key]
+
+            future = self._inflight.get(key)
+            if future is not None:
+                metrics.increment(f"{self.name}.{source}.shared")
+                current.set(coalescing="shared")
+            else:
+                metrics.increment(f"{self.name}.{source}.fetches")
+                current.set(coalescing="fetch")
+                # Started inside the span, so retry attempts and page loads become its children
+                future = asyncio.ensure_future(func(*args))
+                self._inflight[key] = future
+                future.add_done_callback(lambda done, key=key: self._complete(key, done))
+
+            result = await self._wait(key, future)
+            current.set(outcome=_outcome(result))
+            return result
+
+    def seen(self, source, url):
+        """Return True if the URL is being fetched or its result is already available."""
+        key = (source, normalize_url(url))
+        return key in self._results or key in self._inflight
+
+    def clear(self):
+        """Forget all results, e.g. between runs of a long-lived process."""
+        self._results.clear()
+
+    async def _wait(self, key, future):
+        # Shielded so that a cancelled waiter does not cancel the fetch of the others
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                # The last waiter gave up, nobody needs the fetch anymore
+                if not future.done():
+                    future.cancel()
+
+    def _complete(self, key, future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled() and future.exception() is None and not is_failure_result(future.result()):
+            self._results[key] = future.result()
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+
+def _outcome(result):
+    # Trace attribute of a scrape result: "ok", "timeout", "error" or the status text
+    if not isinstance(result, str):
+        return "ok"
+    if result.startswith("Timeout"):
+        return "timeout"
+    if is_failure_result(result):
+        return "error"
+    return result if len(result) <= 20 else "ok"
+
+
+# Coalescing group shared by all scrapers of the current process
+_flight = SingleFlight()
+
+def get_single_flight():
+    """Return the coalescing group shared by all scrapers of this process."""
+    return _flight
@@ -0,0 +1,313 @@
+"""
+Record and replay archive for scraped pages and API responses.
+
+A run started with --record stores every fetched page and ITScope response
+in a compressed zip archive; a run started with --replay serves those
+snapshots to the same scrapers without touching the network. Parser
+performance and correctness can then be measured on a frozen, real-world
+corpus instead of live sites that change from run to run.
+
+Archive layout:
+- html/<key>.html: Rendered HTML of a browser page, as the scraper saw it
+- json/<key>.json: Raw ITScope API response bytes
+- feed/<key>: Raw catalog feed downloads
+- rows/<key>.json: Spreadsheet rows read by the run, replayed instead of
+  reading the live sheets
+- index.json: Manifest mapping every entry to its URL and kind
+
+Keys are hashes of the normalized request URL, so lookups do not depend on
+tracking parameters or letter case of the links in the spreadsheet.
+
+Entries are flushed to disk as they are recorded and carry their kind and
+URL in their local zip header. An archive whose recording run was killed
+(no central directory, no manifest) is repaired when it is opened for
+replay, keeping every entry written completely.
+"""
+
+import os
+import json
+import time
+import zlib
+import struct
+import hashlib
+import zipfile
+import threading
+from .colors import Colors
+from .timing import get_timestamp
+from .urls import normalize_url
+
+# Snapshot kinds and the file extension of their archive entries
+SNAPSHOT_KINDS = {"html": ".html", "json": ".json", "feed": "", "rows": ".json"}
+
+MANIFEST_NAME = "index.json"
+
+# Zip extra field holding the kind and URL of an entry in its local header
+_EXTRA_ID = 0x5053
+
+# Fixed part of a local zip file header
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+
+class SnapshotMissing(LookupError):
+    """Raised in replay mode when a request has no recorded snapshot."""
+
+
+class SnapshotArchive:
+    """
+    Zip archive of recorded responses, opened for recording or replaying.
+
+    Recorded entries are written and flushed to the archive as they
+    arrive; the manifest is added by close(). Archives of runs that died
+    before close() are repaired when they are opened for replay. The
+    first snapshot of a URL wins, later fetches of the same URL are
+    served from (or ignored by) the archive.
+
+    Attributes:
+        path (str): Location of the zip archive
+        mode (str): "record" or "replay"
+    """
+
+    def __init__(self, path, mode):
+        """Open the archive at path for recording ("record") or replaying ("replay")."""
+        if mode not in ("record", "replay"):
+            raise ValueError(f"invalid snapshot mode: {mode!r}")
+
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+
+        if mode == "record":
+            self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6)
+            self._manifest = {}
+        else:
+            try:
+                self._zip = zipfile.ZipFile(path, "r")
+            except zipfile.BadZipFile:
+                # The recording run was killed before the central directory was written
+                repair_archive(path)
+                self._zip = zipfile.ZipFile(path, "r")
+            try:
+                self._manifest = json.loads(self._zip.read(MANIFEST_NAME))
+            except KeyError:
+                self._manifest = {}
+
+        print(f"[{get_timestamp()}] {Colors.YELLOW}Snapshot archive opened for {mode}: {path} ({len(self._manifest)} entries){Colors.END}")
+
+    @property
+    def recording(self):
+        return self.mode == "record"
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def put(self, kind, url, data):
+        """
+        Store a response in the archive (record mode only).
+
+        Args:
+            kind (str): Snapshot kind, one of SNAPSHOT_KINDS
+            url (str): Request URL the response belongs to
+            data (bytes | str): Response body, text is stored as UTF-8
+        """
+        if not self.recording:
+            return
+
+        name = entry_name(kind, url)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        with self._lock:
+            if name in self._manifest:
+                return
+            _write_entry(self._zip, name, kind, url, data)
+            self._manifest[name] = {"kind": kind, "url": url, "size": len(data)}
+
+            # Written through, so a killed run leaves every finished entry behind
+            self._zip.fp.flush()
+
+    def get(self, kind, url):
+        """
+        Return the recorded response for a URL.
+
+        Args:
+            kind (str): Snapshot kind, one of SNAPSHOT_KINDS
+            url (str): Request URL
+
+        Returns:
+            bytes | None: Recorded response body, or None if nothing was recorded
+        """
+        name = entry_name(kind, url)
+        with self._lock:
+            if name not in self._manifest:
+                return None
+            return self._zip.read(name)
+
+    def require(self, kind, url):
+        """
+        Return the recorded response for a URL, failing if it is missing.
+
+        Raises:
+            SnapshotMissing: If the URL was not recorded
+        """
+        data = self.get(kind, url)
+        if data is None:
+            raise SnapshotMissing(f"no {kind} snapshot recorded for {url}")
+        return data
+
+    def entries(self, kind=None):
+        """
+        List recorded entries.
+
+        Args:
+            kind (str, optional): Only entries of this snapshot kind
+
+        Returns:
+            list[tuple]: (entry name, url) pairs in recording order
+        """
+        return [(name, entry["url"]) for name, entry in self._manifest.items()
+                if kind is None or entry["kind"] == kind]
+
+    def read(self, name):
+        """Return the bytes of an archive entry listed by entries()."""
+        with self._lock:
+            return self._zip.read(name)
+
+    def close(self):
+        """Write the manifest (record mode) and close the archive."""
+        with self._lock:
+            if self._zip is None:
+                return
+            if self.recording:
+                self._zip.writestr(MANIFEST_NAME, json.dumps(self._manifest, ensure_ascii=False, indent=1))
+                print(f"[{get_timestamp()}] {Colors.GREEN}Recorded {len(self._manifest)} snapshots to {self.path}{Colors.END}")
+            self._zip.close()
+            self._zip = None
+
+
+def repair_archive(path):
+    """
+    Rebuild an archive whose recording run died before it was closed.
+
+    Reads the local entry headers from the start of the file, keeps every
+    entry that was written completely and writes the central directory
+    and the manifest.
+
+    Args:
+        path (str): Location of the damaged zip archive
+
+    Returns:
+        int: Number of recovered entries
+    """
+    manifest = {}
+    tmp_path = f"{path}.tmp"
+    with open(path, "rb") as source, zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as target:
+        while True:
+            header = source.read(_LOCAL_HEADER.size)
+            if len(header) < _LOCAL_HEADER.size:
+                break
+            signature, _, _, method, _, _, crc, compressed_size, _, name_length, extra_length = _LOCAL_HEADER.unpack(header)
+            if signature != _LOCAL_SIGNATURE:
+                break
+
+            name = source.read(name_length).decode("utf-8", "replace")
+            extra = source.read(extra_length)
+            data = source.read(compressed_size)
+
+            # The header of the entry being written when the run died has no sizes yet
+            if compressed_size == 0 or len(data) < compressed_size:
+                break
+            try:
+                if method == zipfile.ZIP_DEFLATED:
+                    data = zlib.decompress(data, -15)
+            except zlib.error:
+                break
+            if zlib.crc32(data) != crc:
+                break
+
+            metadata = _read_extra(extra)
+            if metadata is None or name == MANIFEST_NAME:
+                continue
+            kind, url = metadata
+            _write_entry(target, name, kind, url, data)
+            manifest[name] = {"kind": kind, "url": url, "size": len(data)}
+
+        target.writestr(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=1))
+
+    os.replace(tmp_path, path)
+    print(f"[{get_timestamp()}] {Colors.YELLOW}Repaired unfinished snapshot archive {path}: {len(manifest)} entries recovered{Colors.END}")
+    return len(manifest)
+
+
+def _write_entry(archive, name, kind, url, data):
+    # Store an entry with its kind and URL in the extra field of its local header
+    info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED
+    payload = json.dumps([kind, url], ensure_ascii=False).encode("utf-8")
+    info.extra = struct.pack("<HH", _EXTRA_ID, len(payload)) + payload
+    archive.writestr(info, data, compresslevel=6)
+
+
+def _read_extra(extra):
+    # (kind, url) stored by _write_entry(), None for entries without it
+    while len(extra) >= 4:
+        field_id, size = struct.unpack("<HH", extra[:4])
+        if field_id == _EXTRA_ID:
+            try:
+                kind, url = json.loads(extra[4:4 + size].decode("utf-8"))
+                return kind, url
+            except ValueError:
+                return None
+        extra = extra[4 + size:]
+    return None
+
+
+def entry_name(kind, url):
+    """
+    Return the archive entry name of a URL.
+
+    Args:
+        kind (str): Snapshot kind, one of SNAPSHOT_KINDS
+        url (str): Request URL
+
+    Returns:
+        str: Entry name like "html/3f2a9c0e1b7d4a55.html"
+    """
+    digest = hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()[:16]
+    return f"{kind}/{digest}{SNAPSHOT_KINDS[kind]}"
+
+
+# Archive of the current process, None unless --record or --replay is used
+_archive = None
+
+def open_snapshot_archive(path, mode):
+    """
+    Open the snapshot archive used by all scrapers of this process.
+
+    Args:
+        path (str): Location of the zip archive
+        mode (str): "record" or "replay"
+
+    Returns:
+        SnapshotArchive: The opened archive
+
+    Usage:
+        open_snapshot_archive("run.zip", "record")
+    """
+    global _archive
+    close_snapshot_archive()
+    _archive = SnapshotArchive(path, mode)
+    return _archive
+
+
+def get_snapshot_archive():
+    """Return the open snapshot archive, or None for normal live runs."""
+    return _archive
+
+
+def close_snapshot_archive():
+    """Finish and close the snapshot archive of this process, if any."""
+    global _archive
+    if _archive is not None:
+        _archive.close()
+        _archive = None
@@ -2,11 +2,15 @@
 Timestamp utilities for logging and debugging operations.
 
 Provides standardized timestamp formatting for consistent logging
-across the price bot application.
+across the price bot application. The same format is written to the
+spreadsheet as the time of a row's last refresh.
 """
 
 from datetime import datetime
 
+# Column holding the get_timestamp() of a row's last refresh (written if mapped in COLUMN_MAP)
+LAST_UPDATED_KEY = "Zuletzt aktualisiert"
+
 def get_timestamp():
     """
     Generate a standardized timestamp string for logging purposes.
@@ -0,0 +1,239 @@
+"""
+Span based tracing of single rows, exported as OpenTelemetry JSON (--trace).
+
+Run metrics and profiles show aggregates; a trace shows why one particular
+SKU was slow. Every row gets a root span with child spans for its scraper
+calls, retry attempts, browser page loads, ITScope requests and sheet
+writes, with attributes such as URL, source, outcome and bytes.
+
+Spans are written as OTLP JSON lines (one ExportTraceServiceRequest per
+line, the format of the OpenTelemetry Collector file exporter), so the file
+can be opened offline in OTLP aware viewers or sent to a collector later.
+Without an open trace file, span() does nothing and costs next to nothing.
+
+Usage:
+    with span("scrape", source="geizhals", url=url) as current:
+        result = await scrape(url)
+        current.set(outcome="ok")
+"""
+
+import os
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from .colors import Colors
+from .timing import get_timestamp
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Finished spans written per line at most, roots are written immediately
+_BATCH_SIZE = 100
+
+_current = contextvars.ContextVar("span", default=None)
+
+class Span:
+    """
+    Timed operation within a trace.
+
+    Attributes:
+        name (str): Operation name, e.g. "scrape"
+        trace_id (str): 32 hex digits shared by all spans of a row
+        span_id (str): 16 hex digits
+        parent_id (str | None): Span ID of the parent, None for root spans
+        attributes (dict): Attribute values (str, int, float or bool)
+    """
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start", "end", "attributes", "status", "message")
+
+    def __init__(self, name, parent=None, kind=SPAN_KIND_INTERNAL, attributes=None):
+        """Start a span, as child of parent if given."""
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start = time.time_ns()
+        self.end = None
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_OK
+        self.message = ""
+
+    def set(self, **attributes):
+        """Add or replace attributes; None values are skipped."""
+        self.attributes.update((key, value) for key, value in attributes.items() if value is not None)
+
+    def fail(self, message):
+        """Mark the span as failed."""
+        self.status = STATUS_ERROR
+        self.message = str(message)
+
+    def to_otlp(self):
+        """Return the span in OTLP JSON form."""
+        data = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end or time.time_ns()),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": self.status, "message": self.message} if self.message else {"code": self.status}
+        }
+        if self.parent_id:
+            data["parentSpanId"] = self.parent_id
+        return data
+
+
+class _NoopSpan:
+    # Stand-in yielded by span() while tracing is off
+
+    def set(self, **attributes):
+        pass
+
+    def fail(self, message):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Collects finished spans and appends them to an OTLP JSON lines file.
+
+    Attributes:
+        path (str): Location of the trace file
+        service (str): service.name resource attribute
+    """
+
+    def __init__(self, path, service="price-bot"):
+        """Create a tracer appending to path."""
+        self.path = path
+        self.service = service
+        self.spans = 0
+        self._finished = []
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span):
+        """Queue a finished span, writing the queue once a root span ends or it is full."""
+        with self._lock:
+            if self._file.closed:
+                return  # Span of a background task that outlived the run
+            self._finished.append(span)
+            self.spans += 1
+            if span.parent_id is None or len(self._finished) >= _BATCH_SIZE:
+                self._write()
+
+    def close(self):
+        """Write all queued spans and close the file."""
+        with self._lock:
+            self._write()
+            self._file.close()
+
+    def _write(self):
+        if not self._finished:
+            return
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service}}]},
+                "scopeSpans": [{
+                    "scope": {"name": "price_bot"},
+                    "spans": [span.to_otlp() for span in self._finished]
+                }]
+            }]
+        }
+        self._file.write(json.dumps(request, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._finished.clear()
+
+
+@contextmanager
+def span(name, kind=SPAN_KIND_INTERNAL, **attributes):
+    """
+    Trace the enclosed block as a child of the current span.
+
+    Exceptions (including cancellation) mark the span as failed and are
+    re-raised. Works across awaits: the current span is kept per task and
+    inherited by tasks and worker threads started inside the block.
+
+    Args:
+        name (str): Operation name
+        kind (int): SPAN_KIND_INTERNAL or SPAN_KIND_CLIENT for outgoing requests
+        **attributes: Initial span attributes
+
+    Yields:
+        Span: The started span (a no-op stand-in while tracing is off)
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield _NOOP_SPAN
+        return
+
+    current = Span(name, _current.get(), kind, attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(f"{type(e).__name__}: {e}" if str(e) else type(e).__name__)
+        raise
+    finally:
+        _current.reset(token)
+        current.end = time.time_ns()
+        tracer.export(current)
+
+
+def current_span():
+    """Return the span of the running block, a no-op stand-in if there is none."""
+    return _current.get() or _NOOP_SPAN
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+# Tracer of the current process, None unless --trace is used
+_tracer = None
+
+def open_tracer(path):
+    """
+    Start tracing to an OTLP JSON lines file.
+
+    Args:
+        path (str): Trace file, spans are appended
+
+    Returns:
+        Tracer: The opened tracer
+
+    Usage:
+        open_tracer("price_bot_trace.jsonl")
+    """
+    global _tracer
+    close_tracer()
+    _tracer = Tracer(path)
+    return _tracer
+
+
+def close_tracer():
+    """Write the remaining spans and stop tracing, if a trace file is open."""
+    global _tracer
+    if _tracer is not None:
+        tracer, _tracer = _tracer, None
+        tracer.close()
+        print(f"[{get_timestamp()}] {Colors.YELLOW}Wrote {tracer.spans} trace spans to {tracer.path}{Colors.END}")
@@ -0,0 +1,45 @@
+"""
+URL normalization utilities for matching product links across sources.
+
+Provides a canonical form for product URLs so that links copied from the
+spreadsheet, found on listing pages or read from catalog feeds can be used
+as dictionary keys regardless of letter case, "www." prefixes, fragments,
+tracking parameters or trailing slashes.
+"""
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that never change the product a URL points to
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "ref", "source"}
+
+def normalize_url(url):
+    """
+    Normalize a product URL for use as a lookup key.
+    
+    Lowercases scheme and host, strips "www.", fragments, tracking
+    parameters and trailing slashes, and sorts the remaining query
+    parameters.
+    
+    Args:
+        url (str): Product URL
+        
+    Returns:
+        str: Normalized URL, or an empty string for empty input
+        
+    Examples:
+        "https://www.Shop.at/produkt/?utm_source=x#top" -> "https://shop.at/produkt"
+    """
+    if not url:
+        return ""
+
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+
+    return urlunsplit((parts.scheme.lower() or "https", host, parts.path.rstrip("/"), urlencode(query), ""))